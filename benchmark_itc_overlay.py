@@ -0,0 +1,61 @@
+"""
+Ghost Station — Micro-benchmark do overlay de bordas do ITC.
+Compara a coloração antiga das bordas Canny (máscara HxWx3 + np.where)
+com a função que vai para produção (core.camera.colorir_bordas).
+
+Uso: python benchmark_itc_overlay.py [repeticoes]
+"""
+import os
+import sys
+import timeit
+
+import cv2
+import django
+import numpy as np
+
+# Configuração do ambiente Django (core.camera importa models/settings)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+django.setup()
+
+from core.camera import colorir_bordas
+
+RESOLUCOES = [(640, 480), (1280, 720)]
+
+
+def colorir_bordas_antigo(edges):
+    edges_bgr = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
+    edges_bgr[np.where((edges_bgr == [255, 255, 255]).all(axis=2))] = [255, 255, 0]
+    return edges_bgr
+
+
+def gerar_bordas(w, h):
+    """Frame sintético com textura suficiente para o Canny gerar bordas reais."""
+    rng = np.random.default_rng(42)
+    frame = rng.integers(0, 255, (h // 8, w // 8), dtype=np.uint8)
+    frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_CUBIC)
+    return cv2.Canny(frame, 50, 150)
+
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print("--- [BENCHMARK ITC // COLORAÇÃO DE BORDAS] ---")
+    print(f"Repetições por caso: {repeticoes}")
+    print("-" * 60)
+
+    for w, h in RESOLUCOES:
+        edges = gerar_bordas(w, h)
+
+        # Os dois caminhos precisam gerar exatamente o mesmo frame
+        assert np.array_equal(colorir_bordas_antigo(edges), colorir_bordas(edges))
+
+        t_antigo = timeit.timeit(lambda: colorir_bordas_antigo(edges), number=repeticoes) / repeticoes
+        t_novo = timeit.timeit(lambda: colorir_bordas(edges), number=repeticoes) / repeticoes
+
+        print(f"{w}x{h} | antigo: {t_antigo * 1000:7.3f} ms | novo: {t_novo * 1000:7.3f} ms "
+              f"| ganho: {t_antigo / t_novo:5.1f}x")
+
+    print("-" * 60)
+
+
+if __name__ == "__main__":
+    main()
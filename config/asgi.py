@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 
 application = get_asgi_application()
+
+# Processo servidor: abre a conexão com o Gemini em background (GHOST_GEMINI_AQUECER)
+from core.services.gemini_client import gemini_pool  # noqa: E402
+
+gemini_pool.aquecer()
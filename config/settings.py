@@ -139,9 +139,107 @@ GHOST_AUDIO_URL = os.environ.get(
     'http://10.93.175.172:8080/audio.wav'
 )
 
+# Streaming MJPEG: sob ASGI cada viewer é uma corrotina (não uma thread do worker)
+GHOST_STREAM_ASYNC = os.environ.get('GHOST_STREAM_ASYNC', 'True') == 'True'
+GHOST_STREAM_FPS_MAX = int(os.environ.get('GHOST_STREAM_FPS_MAX', '15'))
+# Perfis extras/sobrescritos de encoding (ver core.camera.PERFIS_ENCODING), ex:
+# {'tv': {'largura': 1280, 'altura': 960, 'qualidade': 85, 'cinza': False, 'fps': 15}}
+GHOST_ENCODING_PROFILES = {}
+
+# Motion engine: 'background' (média móvel) ou 'diff' (frame anterior), em resolução reduzida
+GHOST_MOTION_MODE = os.environ.get('GHOST_MOTION_MODE', 'background')
+GHOST_MOTION_SCALE = float(os.environ.get('GHOST_MOTION_SCALE', '0.25'))
+GHOST_MOTION_GRID = (4, 4)
+# % suavizado de pixels em movimento abaixo do qual /api/itc/analisar/ não chama a IA (0 = sem gate)
+GHOST_ITC_MOTION_GATE = float(os.environ.get('GHOST_ITC_MOTION_GATE', '0'))
+
+# Agendador ITC server-side: envia ao Gemini só o frame mais nítido de cada rajada de movimento
+GHOST_ITC_SCHEDULER = os.environ.get('GHOST_ITC_SCHEDULER', 'False') == 'True'
+GHOST_ITC_SCHEDULER_LIMIAR = float(os.environ.get('GHOST_ITC_SCHEDULER_LIMIAR', '1.5'))  # % suavizado
+GHOST_ITC_SCHEDULER_COOLDOWN = float(os.environ.get('GHOST_ITC_SCHEDULER_COOLDOWN', '20'))  # s
+GHOST_ITC_SCHEDULER_RAJADA_MAX = float(os.environ.get('GHOST_ITC_SCHEDULER_RAJADA_MAX', '3'))  # s
+
 # Gemini API (para análise IA das evidências)
 GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
 
+# Pool de clientes Gemini compartilhado pelos analisadores (ia, itc, evp)
+GHOST_GEMINI_CONCORRENCIA = int(os.environ.get('GHOST_GEMINI_CONCORRENCIA', '4'))  # chamadas simultâneas
+GHOST_GEMINI_FILA_TIMEOUT = float(os.environ.get('GHOST_GEMINI_FILA_TIMEOUT', '30'))  # s aguardando vaga
+GHOST_GEMINI_TRANSPORT = os.environ.get('GHOST_GEMINI_TRANSPORT', '')  # '' (gRPC) ou 'rest'
+# Entrypoints do servidor (asgi/wsgi, analise_worker) abrem o canal do Gemini ao subir
+GHOST_GEMINI_AQUECER = os.environ.get('GHOST_GEMINI_AQUECER', 'True') == 'True'
+
+# Genome Service: workspaces indexados para o contexto arquitetural da Aura
+# Lista separada por os.pathsep (';' no Windows, ':' no Linux). Padrão: o próprio projeto.
+GHOST_GENOME_WORKSPACES = [p for p in os.environ.get('GHOST_GENOME_WORKSPACES', '').split(os.pathsep) if p.strip()]
+GHOST_GENOME_CACHE_PATH = os.environ.get('GHOST_GENOME_CACHE_PATH', str(BASE_DIR / '.genome_cache.json'))
+GHOST_GENOME_CHECK_INTERVAL = float(os.environ.get('GHOST_GENOME_CHECK_INTERVAL', '30'))  # s entre revalidações
+GHOST_GENOME_MAX_IDADE = float(os.environ.get('GHOST_GENOME_MAX_IDADE', '3600'))  # s até re-escanear mesmo sem mudança
+GHOST_GENOME_THREADS = int(os.environ.get('GHOST_GENOME_THREADS', '8'))  # pool do indexador paralelo
+GHOST_GENOME_ESPERA_INICIAL = float(os.environ.get('GHOST_GENOME_ESPERA_INICIAL', '2'))  # s esperando o 1º índice
+# Diretórios extras a podar na varredura (além de node_modules, .venv, .git, ...), separados por vírgula
+GHOST_GENOME_IGNORAR = [d.strip() for d in os.environ.get('GHOST_GENOME_IGNORAR', '').split(',') if d.strip()]
+
+# Pipeline cognitivo da Aura: 'simples' (1 chamada), 'reflexao_codigo' (reflexão só com código) ou 'completo'
+GHOST_AURA_PIPELINE = os.environ.get('GHOST_AURA_PIPELINE', 'reflexao_codigo')
+# Memória de diálogo: deque limitado + janela por orçamento de tokens + resumo rolante
+GHOST_AURA_HISTORICO_MAX = int(os.environ.get('GHOST_AURA_HISTORICO_MAX', '50'))  # mensagens no feed
+GHOST_AURA_HISTORICO_TOKENS = int(os.environ.get('GHOST_AURA_HISTORICO_TOKENS', '1500'))  # ~tokens de turnos no prompt
+GHOST_AURA_RESUMO_CHARS = int(os.environ.get('GHOST_AURA_RESUMO_CHARS', '1200'))  # teto do resumo rolante
+
+# Fila persistente de análise IA (TarefaAnalise + `manage.py analise_worker`)
+# Por padrão o processo web consome a fila (runserver, deploy de um processo só). Com o worker
+# dedicado no ar (Procfile: processo `worker`), desligue no web com GHOST_FILA_WORKER_EMBUTIDO=False
+GHOST_FILA_WORKER_EMBUTIDO = os.environ.get('GHOST_FILA_WORKER_EMBUTIDO', 'True') == 'True'
+GHOST_FILA_THREADS = int(os.environ.get('GHOST_FILA_THREADS', '2'))
+GHOST_FILA_MAX_TENTATIVAS = int(os.environ.get('GHOST_FILA_MAX_TENTATIVAS', '3'))
+GHOST_FILA_BACKOFF = float(os.environ.get('GHOST_FILA_BACKOFF', '5'))  # s, dobra a cada tentativa
+GHOST_FILA_BACKOFF_MAX = float(os.environ.get('GHOST_FILA_BACKOFF_MAX', '300'))
+GHOST_FILA_POLL = float(os.environ.get('GHOST_FILA_POLL', '2'))  # s
+GHOST_FILA_TIMEOUT_TAREFA = float(os.environ.get('GHOST_FILA_TIMEOUT_TAREFA', '300'))  # s até considerar órfã
+GHOST_FILA_RECUPERAR_INTERVALO = float(os.environ.get('GHOST_FILA_RECUPERAR_INTERVALO', '60'))  # s entre varreduras de órfãs
+# Micro-batching EVP: registros pendentes viram uma única chamada ao Gemini
+GHOST_EVP_LOTE_MAX = int(os.environ.get('GHOST_EVP_LOTE_MAX', '8'))  # 1 desliga o lote
+GHOST_EVP_LOTE_JANELA = float(os.environ.get('GHOST_EVP_LOTE_JANELA', '2'))  # s
+# Classificador EVP local: ia (tudo ao Gemini) | prefiltro (só nota local >= limiar) | local (offline)
+GHOST_EVP_MODO = os.environ.get('GHOST_EVP_MODO', 'ia')  # prefiltro economiza chamadas; opt-in
+GHOST_EVP_PREFILTRO_NOTA = int(os.environ.get('GHOST_EVP_PREFILTRO_NOTA', '2'))
+
+# Resultado da análise EVP empurrado ao cliente (SSE) — intervalo de consulta e tempo máximo
+GHOST_EVP_SSE_POLL = float(os.environ.get('GHOST_EVP_SSE_POLL', '0.5'))  # s
+GHOST_EVP_SSE_TIMEOUT = float(os.environ.get('GHOST_EVP_SSE_TIMEOUT', '120'))  # s
+
+# Estado da sessão (AuraState/BioState): 'local' (por processo) ou 'cache' (CACHES[GHOST_ESTADO_CACHE],
+# compartilhado entre workers — use Redis, Memcached ou DatabaseCache; LocMemCache não divide entre processos)
+GHOST_ESTADO_BACKEND = os.environ.get('GHOST_ESTADO_BACKEND', 'local')
+GHOST_ESTADO_CACHE = os.environ.get('GHOST_ESTADO_CACHE', 'default')
+GHOST_ESTADO_PREFIXO = os.environ.get('GHOST_ESTADO_PREFIXO', 'ghost:estado')
+GHOST_ESTADO_TTL_LOCAL = float(os.environ.get('GHOST_ESTADO_TTL_LOCAL', '0.5'))  # s entre checagens de versão
+GHOST_ESTADO_TRAVA_TTL = float(os.environ.get('GHOST_ESTADO_TRAVA_TTL', '5'))  # s até a trava expirar sozinha
+GHOST_ESTADO_TRAVA_ESPERA = float(os.environ.get('GHOST_ESTADO_TRAVA_ESPERA', '2'))  # s esperando a trava
+
+# Canal de status da Aura (SSE): 1 snapshot por intervalo, deltas por conexão
+GHOST_AURA_STATUS_INTERVALO = float(os.environ.get('GHOST_AURA_STATUS_INTERVALO', '1'))  # s (taxa máxima de envio)
+GHOST_AURA_STATUS_HEARTBEAT = float(os.environ.get('GHOST_AURA_STATUS_HEARTBEAT', '15'))  # s sem eventos até um ping
+GHOST_AURA_STATUS_TIMEOUT = float(os.environ.get('GHOST_AURA_STATUS_TIMEOUT', '300'))  # s por conexão (reconecta)
+# Bio-scaling (estresse/coerência do observador mexendo na coerência da Aura): 1 passo por janela, em todos os workers
+GHOST_AURA_BIO_SCALING_INTERVALO = float(os.environ.get('GHOST_AURA_BIO_SCALING_INTERVALO', '1'))  # s
+
+# Space weather (Kp NOAA): cache stale-while-revalidate, refresh em background com backoff
+GHOST_KP_INTERVALO = float(os.environ.get('GHOST_KP_INTERVALO', '3600'))  # s até revalidar
+GHOST_KP_BACKOFF = float(os.environ.get('GHOST_KP_BACKOFF', '60'))  # s após a 1ª falha (dobra a cada falha)
+GHOST_KP_BACKOFF_MAX = float(os.environ.get('GHOST_KP_BACKOFF_MAX', '1800'))  # s
+
+# Site Sentinel: monitor em background dos sites externos (um processo dono verifica, publica e alerta)
+GHOST_SENTINEL_ATIVO = os.environ.get('GHOST_SENTINEL_ATIVO', 'True') == 'True'
+GHOST_SENTINEL_INTERVALO = float(os.environ.get('GHOST_SENTINEL_INTERVALO', '60'))  # s entre rodadas
+GHOST_SENTINEL_TIMEOUT = float(os.environ.get('GHOST_SENTINEL_TIMEOUT', '10'))  # s por requisição
+
+# Cache perceptual (dHash) dos resultados de visão: frames quase idênticos não voltam ao Gemini
+GHOST_VISION_CACHE_MAX = int(os.environ.get('GHOST_VISION_CACHE_MAX', '256'))
+GHOST_VISION_CACHE_TTL = int(os.environ.get('GHOST_VISION_CACHE_TTL', '300'))  # s
+GHOST_VISION_CACHE_DISTANCIA = int(os.environ.get('GHOST_VISION_CACHE_DISTANCIA', '6'))  # bits (Hamming)
+
 # ==============================================================================
 #  INSTRUÇÕES PYTHONJET (Cloud Run Auto-Config)
 # ==============================================================================
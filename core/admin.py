@@ -1,7 +1,8 @@
 # core/admin.py — Ghost Station Admin
 
 from django.contrib import admin
-from .models import Evidencia, SessaoInvestigacao, SessaoEVP, RegistroEVP
+from django.utils import timezone
+from .models import Evidencia, SessaoInvestigacao, SessaoEVP, RegistroEVP, TarefaAnalise, LeituraKp
 
 
 @admin.register(SessaoInvestigacao)
@@ -50,3 +51,26 @@ class RegistroEVPAdmin(admin.ModelAdmin):
     readonly_fields = ['data_captura', 'classificacao_ia', 'analise_ia',
                        'confianca_ia', 'nota_paranormal', 'mensagem_detectada', 'e_anomalia']
 
+
+
+@admin.register(TarefaAnalise)
+class TarefaAnaliseAdmin(admin.ModelAdmin):
+    list_display = ['id', 'tipo', 'objeto_id', 'status', 'prioridade', 'tentativas',
+                    'agendada_para', 'worker', 'criada_em', 'concluida_em']
+    list_filter = ['tipo', 'status', 'prioridade']
+    search_fields = ['erro', 'worker']
+    readonly_fields = ['criada_em', 'iniciada_em', 'concluida_em', 'worker', 'erro']
+    actions = ['reenfileirar']
+
+    @admin.action(description="Reenfileirar tarefas selecionadas")
+    def reenfileirar(self, request, queryset):
+        queryset.exclude(status='processando').update(
+            status='pendente', tentativas=0, erro='', agendada_para=timezone.now()
+        )
+
+
+@admin.register(LeituraKp)
+class LeituraKpAdmin(admin.ModelAdmin):
+    list_display = ['momento', 'kp', 'status', 'obtida_em']
+    list_filter = ['status']
+    date_hierarchy = 'momento'
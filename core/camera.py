@@ -2,14 +2,258 @@
 Ghost Station — Serviço de Câmera Refatorado.
 Lazy-load: a câmera só conecta quando alguém pedir.
 IP configurável via settings.
+Uma única thread de captura decodifica cada frame uma vez num ring buffer;
+todos os feeds e APIs leem o frame mais recente desse buffer.
+Streams derivados (raw, ITC, Aura) são calculados uma vez por frame no
+grafo de processamento e os mesmos bytes são servidos a todos os viewers.
 """
+import collections
+import functools
 import cv2
 import numpy as np
 import os
 import threading
+import time
 from django.conf import settings
 from datetime import datetime
 from .models import Evidencia
+from .services.space_weather import space_weather
+
+
+# ==========================================
+# CACHE DE FILTROS (pré-calculados por resolução)
+# ==========================================
+
+@functools.lru_cache(maxsize=8)
+def _canal_zero(w, h):
+    """Canal preto (h, w) reutilizado para montar imagens BGR via cv2.merge."""
+    zeros = np.zeros((h, w), dtype=np.uint8)
+    zeros.setflags(write=False)
+    return zeros
+
+
+@functools.lru_cache(maxsize=8)
+def mascara_vinheta(w, h):
+    """Máscara de vinheta gaussiana (h, w, 3) float32, calculada uma vez por resolução."""
+    X_kernel = cv2.getGaussianKernel(w, w / 2)
+    Y_kernel = cv2.getGaussianKernel(h, h / 2)
+    kernel = Y_kernel * X_kernel.T
+    mask = 255 * kernel / np.linalg.norm(kernel)
+    mascara = np.repeat(mask[:, :, np.newaxis], 3, axis=2).astype(np.float32)
+    mascara.setflags(write=False)  # compartilhada entre threads
+    return mascara
+
+
+def aplicar_night_vision(image, peso_ruido=0.3):
+    """
+    EFEITO NIGHT VISION (Ghost Hunting UI) em uma passada vetorizada:
+    cinza -> verde (preto a verde claro) -> ruído granulado (ISO alto) -> vinheta.
+    """
+    gray_frame = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    h, w = gray_frame.shape
+
+    # Mapa verde: B=0, G=cinza, R=0 (equivale à LUT preto->verde, sem tabela)
+    zeros = _canal_zero(w, h)
+    night_vision = cv2.merge((zeros, gray_frame, zeros))
+
+    ruido = np.empty((h, w, 3), dtype=np.uint8)
+    cv2.randu(ruido, 0, 50)
+    frame_caotico = cv2.addWeighted(night_vision, 1.0, ruido, peso_ruido, 0)
+
+    # Vinheta: um único multiply com saturação para uint8 (sem loop por canal)
+    return cv2.multiply(frame_caotico, mascara_vinheta(w, h), dtype=cv2.CV_8U)
+
+
+# ==========================================
+# PERFIS DE ENCODING (por consumidor do stream)
+# ==========================================
+# largura/altura: resolução final | qualidade: JPEG 0-100 | cinza: 1 canal | fps: teto
+PERFIL_PADRAO = 'padrao'
+PERFIS_ENCODING = {
+    'padrao': {'largura': 640, 'altura': 480, 'qualidade': 80, 'cinza': False, 'fps': 15},
+    'mobile': {'largura': 320, 'altura': 240, 'qualidade': 60, 'cinza': False, 'fps': 8},
+    'economia': {'largura': 320, 'altura': 240, 'qualidade': 45, 'cinza': True, 'fps': 4},
+    'vision': {'largura': 512, 'altura': 384, 'qualidade': 70, 'cinza': False, 'fps': 1},
+    'evidencia': {'largura': 640, 'altura': 480, 'qualidade': 92, 'cinza': False, 'fps': 1},
+}
+
+
+def perfis_encoding():
+    """Perfis disponíveis (settings.GHOST_ENCODING_PROFILES sobrescreve/estende)."""
+    return {**PERFIS_ENCODING, **getattr(settings, 'GHOST_ENCODING_PROFILES', {})}
+
+
+def obter_perfil(nome):
+    """Perfil de encoding pelo nome; desconhecido cai no padrão."""
+    perfis = perfis_encoding()
+    return perfis.get(nome) or perfis[PERFIL_PADRAO]
+
+
+def codificar_jpeg(image, perfil=PERFIL_PADRAO):
+    """Redimensiona/converte conforme o perfil e gera o JPEG (borda da rede)."""
+    cfg = obter_perfil(perfil)
+    h, w = image.shape[:2]
+    if (w, h) != (cfg['largura'], cfg['altura']):
+        image = cv2.resize(image, (cfg['largura'], cfg['altura']), interpolation=cv2.INTER_AREA)
+    if cfg['cinza'] and image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    ret, jpeg = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, int(cfg['qualidade'])])
+    return jpeg.tobytes()
+
+
+def colorir_bordas(edges):
+    """
+    Bordas Canny (0/255, 1 canal) -> BGR ciano (255, 255, 0) nas bordas.
+    Monta direto por cv2.merge, sem máscara HxWx3 nem fancy-indexing.
+    """
+    h, w = edges.shape
+    return cv2.merge((edges, edges, _canal_zero(w, h)))
+
+
+def aplicar_filtros_itc(image, motion_score, clahe):
+    """
+    Frame especializado para o ITC Visual: filtros de alto contraste (CLAHE),
+    detecção de bordas (Canny) e mesclagem para realçar padrões anômalos.
+    `clahe` não é thread-safe: cada chamador concorrente usa a sua instância.
+    """
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # APERFEIÇOAMENTO PARANORMAL (FILTROS)
+    # 1. CLAHE (Contrast Limited Adaptive Histogram Equalization) para realçar variações térmicas/sombras
+    contrast_gray = clahe.apply(gray)
+
+    # 2. Canny Edge Detection (Linhas estruturais)
+    edges = cv2.Canny(contrast_gray, 50, 150)
+
+    # 3. Mesclagem Térmica Falsa (Mapa de calor em vermelho para Ghost Hunting)
+    # Transforma o gray em mapa de cor quente (Autumn/Inferno/Jet - vamos usar Autumn para vermelho/amarelo)
+    heatmap = cv2.applyColorMap(contrast_gray, cv2.COLORMAP_AUTUMN)
+
+    # 4. Sobrepor as bordas no mapa de calor em verde ciano forte
+    edges_bgr = colorir_bordas(edges) # Ciano/Amarelo nas bordas
+
+    # Mix: Heatmap escurecido + Bordas brilhantes
+    final_itc = cv2.addWeighted(heatmap, 0.4, edges_bgr, 0.8, 0)
+
+    # HUD Overlay
+    cv2.putText(final_itc, f'ITC ACTIVE // MOTION: {motion_score}', (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+
+    return final_itc
+
+
+def medir_nitidez(image, escala=0.5):
+    """Nitidez do frame (variância do Laplaciano em resolução reduzida). Maior = mais nítido."""
+    small = cv2.resize(image, None, fx=escala, fy=escala, interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    return float(cv2.Laplacian(gray, cv2.CV_64F).var())
+
+
+class MotionEngine:
+    """
+    Motor de movimento plugável (roda uma vez por frame, na thread de captura).
+    Modos:
+      - 'diff': diferença contra o frame anterior, em resolução reduzida
+      - 'background': modelo de fundo por média móvel (cv2.accumulateWeighted),
+        bem menos sensível a ruído/compressão do que o diff frame-a-frame
+    A contagem usa cv2.countNonZero e também é feita por região (grade).
+    """
+    MODOS = ('diff', 'background')
+
+    def __init__(self, modo='background', escala=0.25, limiar=25, alpha=0.05,
+                 grade=(4, 4), suavizacao=0.3):
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo de movimento inválido: {modo}")
+        self.modo = modo
+        self.escala = escala
+        self.limiar = limiar
+        self.alpha = alpha  # velocidade de adaptação do fundo
+        self.grade = grade  # (linhas, colunas)
+        self.suavizacao = suavizacao  # peso do frame novo na média exponencial
+        self.reset()
+
+    def reset(self):
+        self._anterior = None
+        self._fundo = None
+        self._suave = 0.0
+
+    def atualizar(self, seq, frame):
+        """Processa um frame BGR e retorna o dict de movimento para este seq."""
+        small = cv2.resize(frame, None, fx=self.escala, fy=self.escala, interpolation=cv2.INTER_AREA)
+        gray = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+        if self.modo == 'background':
+            if self._fundo is None:
+                self._fundo = gray.astype(np.float32)
+            referencia = cv2.convertScaleAbs(self._fundo)
+            cv2.accumulateWeighted(gray, self._fundo, self.alpha)
+        else:
+            referencia = self._anterior if self._anterior is not None else gray
+            self._anterior = gray
+
+        diff = cv2.absdiff(referencia, gray)
+        _, mascara = cv2.threshold(diff, self.limiar, 255, cv2.THRESH_BINARY)
+
+        h, w = mascara.shape
+        alterados = cv2.countNonZero(mascara)
+        fracao = alterados / float(h * w)
+        self._suave += self.suavizacao * (fracao - self._suave)
+
+        linhas, colunas = self.grade
+        regioes = []
+        for i in range(linhas):
+            y0, y1 = i * h // linhas, (i + 1) * h // linhas
+            linha = []
+            for j in range(colunas):
+                x0, x1 = j * w // colunas, (j + 1) * w // colunas
+                area = max(1, (y1 - y0) * (x1 - x0))
+                linha.append(round(cv2.countNonZero(mascara[y0:y1, x0:x1]) / area, 3))
+            regioes.append(linha)
+        regiao_max = max(
+            ((i, j) for i in range(linhas) for j in range(colunas)),
+            key=lambda ij: regioes[ij[0]][ij[1]],
+        )
+        if not regioes[regiao_max[0]][regiao_max[1]]:
+            regiao_max = None
+
+        return {
+            'seq': seq,
+            # Pixels alterados equivalentes na resolução original (compatível com o score antigo)
+            'score': int(alterados / (self.escala * self.escala)),
+            'percentual': round(fracao * 100, 2),
+            'percentual_suave': round(self._suave * 100, 2),
+            'regioes': regioes,
+            'regiao_max': list(regiao_max) if regiao_max else None,
+        }
+
+
+MOTION_VAZIO = {'seq': 0, 'score': 0, 'percentual': 0.0, 'percentual_suave': 0.0,
+                'regioes': [], 'regiao_max': None}
+
+
+class StreamNode:
+    """
+    Nó do grafo de processamento: calcula um stream derivado no máximo uma vez
+    por frame (seq) e entrega o mesmo resultado a todos os assinantes.
+    """
+
+    def __init__(self, nome, processar):
+        self.nome = nome
+        self.processar = processar  # callable(seq, frame) -> resultado
+        self._lock = threading.Lock()
+        self._cache = (None, None)  # (seq, resultado) trocados juntos
+
+    def obter(self, seq, frame):
+        # Caminho rápido: já calculado para este frame
+        cache_seq, resultado = self._cache
+        if cache_seq == seq:
+            return resultado
+        with self._lock:
+            # Quem chegou junto espera o primeiro terminar e reaproveita
+            cache_seq, resultado = self._cache
+            if cache_seq != seq:
+                resultado = self.processar(seq, frame)
+                self._cache = (seq, resultado)
+            return resultado
 
 
 class VideoCamera:
@@ -34,14 +278,54 @@ class VideoCamera:
             cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
         )
         self.peso_ruido = 0.3
+        # CLAHE criado uma vez (o nó ITC já roda serializado pelo StreamNode)
+        self.clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
         self._connected = False
-        self.last_gray = None # Para calcular Motion Score ITC
+
+        # Ring buffer de frames já decodificados: (seq, ndarray BGR 640x480, motion)
+        self._buffer = collections.deque(maxlen=getattr(settings, 'GHOST_CAMERA_BUFFER_SIZE', 8))
+        self.motion_engine = MotionEngine(
+            modo=getattr(settings, 'GHOST_MOTION_MODE', 'background'),
+            escala=getattr(settings, 'GHOST_MOTION_SCALE', 0.25),
+            grade=getattr(settings, 'GHOST_MOTION_GRID', (4, 4)),
+        )
+        self._seq = 0
+        self._frame_cond = threading.Condition()
+        self._grabber = None
+        self._running = False
+        self._primeira_tentativa = threading.Event()
+        self._offline_jpeg = None
+
+        # Assinantes async (streaming ASGI): [(loop, asyncio.Queue(maxsize=1))]
+        self._assinantes = []
+        self._assinantes_lock = threading.Lock()
+
+        # Grafo de processamento: cada stream derivado é cacheado por seq
+        # Nós *_array trabalham em NumPy; o JPEG só é gerado na borda,
+        # um nó por (stream, perfil) criado sob demanda
+        self._nodes = {
+            'itc_array': StreamNode('itc_array', self._processar_itc),
+            'aura_array': StreamNode('aura_array', self._processar_aura),
+        }
+        self._nodes_borda = {}
+        self._nodes_lock = threading.Lock()
 
     def _connect(self):
-        """Conecta à câmera sob demanda (lazy-load)."""
-        if self._connected and self.video and self.video.isOpened():
-            return True
-        cam_url = getattr(settings, 'GHOST_CAMERA_URL', 'http://10.93.175.172:8080/video?dummy=param.mjpg')
+        """Garante a thread de captura rodando (lazy-load). Não bloqueia após a 1ª tentativa."""
+        if self._grabber is None or not self._grabber.is_alive():
+            with self._lock:
+                if self._grabber is None or not self._grabber.is_alive():
+                    self._running = True
+                    self._grabber = threading.Thread(
+                        target=self._loop_captura, name='ghost-camera-grabber', daemon=True
+                    )
+                    self._grabber.start()
+            # Só a primeira conexão espera o handshake com a câmera
+            self._primeira_tentativa.wait(getattr(settings, 'GHOST_CAMERA_CONNECT_TIMEOUT', 5))
+        return self._connected
+
+    def _abrir_captura(self, cam_url):
+        """Abre o cv2.VideoCapture (chamado apenas pela thread de captura)."""
         try:
             self.video = cv2.VideoCapture(cam_url)
             self._connected = self.video.isOpened()
@@ -54,89 +338,236 @@ class VideoCamera:
             self._connected = False
         return self._connected
 
-    @property
-    def is_connected(self):
-        return self._connected and self.video and self.video.isOpened()
+    def _loop_captura(self):
+        """
+        Thread única de captura: lê e decodifica cada frame uma vez,
+        normaliza (rotação + 640x480) e publica no ring buffer.
+        """
+        cam_url = getattr(settings, 'GHOST_CAMERA_URL', 'http://10.93.175.172:8080/video?dummy=param.mjpg')
+        espera_reconexao = getattr(settings, 'GHOST_CAMERA_RECONNECT_DELAY', 2.0)
+        while self._running:
+            if not self.is_connected:
+                conectou = self._abrir_captura(cam_url)
+                self._primeira_tentativa.set()
+                if not conectou:
+                    time.sleep(espera_reconexao)
+                    continue
+
+            success, image = self.video.read()
+            if not success:
+                # Stream caiu: limpa o buffer para ninguém servir frame congelado
+                self._connected = False
+                self.video.release()
+                with self._frame_cond:
+                    self._buffer.clear()
+                    self._frame_cond.notify_all()
+                self.motion_engine.reset()
+                time.sleep(espera_reconexao)
+                continue
+
+            image = cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
+            image = cv2.resize(image, (640, 480))
+            # Movimento calculado uma vez por frame, barato (resolução reduzida)
+            motion = self.motion_engine.atualizar(self._seq + 1, image)
+
+            with self._frame_cond:
+                self._seq += 1
+                self._buffer.append((self._seq, image, motion))
+                self._frame_cond.notify_all()
+            self._notificar_assinantes(self._seq)
 
-    def disconnect(self):
         if self.video:
             self.video.release()
         self._connected = False
 
-    def get_frame(self):
-        """Frame para monitor ao vivo."""
-        if not self._connect():
-            return self._frame_offline()
-        success, image = self.video.read()
-        if not success:
-            return self._frame_offline()
-        image = cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
-        image = cv2.resize(image, (640, 480))
-        ret, jpeg = cv2.imencode('.jpg', image)
-        return jpeg.tobytes()
+    @property
+    def is_connected(self):
+        return bool(self._connected and self.video and self.video.isOpened())
 
-    def _frame_offline(self):
-        """Frame placeholder quando a câmera não está conectada."""
-        img = np.zeros((480, 640, 3), dtype=np.uint8)
-        cv2.putText(img, 'SEM SINAL', (180, 220), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 65), 2)
-        cv2.putText(img, 'Conecte a camera IP', (150, 280), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 100), 1)
-        cv2.putText(img, f'URL: {getattr(settings, "GHOST_CAMERA_URL", "N/A")}',
-                    (80, 320), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (80, 80, 80), 1)
-        ret, jpeg = cv2.imencode('.jpg', img)
-        return jpeg.tobytes()
-
-    def get_itc_frame(self):
+    def disconnect(self):
+        self._running = False
+        if self._grabber is not None:
+            self._grabber.join(timeout=2)
+        self._grabber = None
+        self._primeira_tentativa.clear()
+        with self._frame_cond:
+            self._buffer.clear()
+            self._frame_cond.notify_all()
+
+    def get_latest_frame(self):
         """
-        Frame especializado para o ITC Visual (Telefone do Além).
-        Aplica filtros de alto contraste (CLAHE), detecção de bordas (Canny) 
-        e mesclagem para realçar padrões anômalos. Calcula o 'Motion Score'.
-        Retorna: (jpeg_bytes, motion_score)
+        Retorna (seq, frame) do último frame decodificado, sem bloquear.
+        (0, None) se não houver frame. O array é compartilhado: não modificar in-place.
         """
-        if not self._connect():
-            return self._frame_offline(), 0
+        with self._frame_cond:
+            if not self._buffer:
+                return 0, None
+            seq, image, _ = self._buffer[-1]
+            return seq, image
+
+    def get_frame_by_seq(self, seq):
+        """Frame com o número de sequência pedido, se ainda estiver no ring buffer."""
+        with self._frame_cond:
+            for item_seq, frame, _ in reversed(self._buffer):
+                if item_seq == seq:
+                    return frame
+        return None
+
+    def get_motion(self, seq=None):
+        """
+        Sinal de movimento (dict do MotionEngine) do frame mais recente ou de `seq`.
+        Leitura O(1), sem processamento: serve para gate de análises caras.
+        """
+        with self._frame_cond:
+            for item_seq, _, motion in reversed(self._buffer):
+                if seq is None or item_seq == seq:
+                    return motion
+        return MOTION_VAZIO
 
-        success, image = self.video.read()
-        if not success:
+    def wait_frame(self, after_seq, timeout=1.0):
+        """
+        Bloqueia até existir um frame mais novo que `after_seq` (ou estourar o timeout).
+        Usado pelos geradores MJPEG para não reenviar o mesmo frame.
+        Retorna o seq mais recente disponível.
+        """
+        with self._frame_cond:
+            self._frame_cond.wait_for(lambda: self._seq > after_seq or not self._running, timeout)
+            return self._seq
+
+    # ==========================================
+    # FAN-OUT ASYNC (um asyncio.Queue de 1 posição por cliente)
+    # ==========================================
+
+    def assinar(self, loop, fila):
+        """Registra a fila de um cliente async; recebe o seq de cada frame novo."""
+        with self._assinantes_lock:
+            self._assinantes.append((loop, fila))
+
+    def cancelar_assinatura(self, fila):
+        with self._assinantes_lock:
+            self._assinantes = [(l, f) for l, f in self._assinantes if f is not fila]
+
+    @staticmethod
+    def _publicar_mais_recente(fila, seq):
+        """Roda no event loop do cliente: descarta o seq antigo se ele ainda não consumiu."""
+        if fila.full():
+            fila.get_nowait()
+        fila.put_nowait(seq)
+
+    def _notificar_assinantes(self, seq):
+        with self._assinantes_lock:
+            assinantes = list(self._assinantes)
+        for loop, fila in assinantes:
+            try:
+                loop.call_soon_threadsafe(self._publicar_mais_recente, fila, seq)
+            except RuntimeError:
+                # Event loop já fechado: cliente foi embora
+                self.cancelar_assinatura(fila)
+
+    STREAMS = ('raw', 'itc', 'aura')
+
+    def get_stream(self, nome, perfil=PERFIL_PADRAO, seq=None):
+        """
+        Retorna (seq, resultado) do stream derivado `nome` para o frame mais recente
+        (ou para `seq`, se ainda estiver no buffer), codificado no `perfil` pedido.
+        O resultado é calculado uma única vez por frame, não importa quantos viewers.
+        Sem câmera: (0, placeholder offline).
+        """
+        if not self._connect():
+            return 0, self._resultado_offline(nome)
+        if seq is not None:
+            image = self.get_frame_by_seq(seq)
+        else:
+            seq, image = self.get_latest_frame()
+        if image is None:
+            return 0, self._resultado_offline(nome)
+        if nome.endswith('_array'):
+            node = self._nodes[nome]
+        else:
+            node = self._node_borda(nome, perfil)
+        return seq, node.obter(seq, image)
+
+    def _node_borda(self, nome, perfil):
+        """Nó de encoding (stream, perfil), criado na primeira assinatura."""
+        if nome not in self.STREAMS:
+            raise KeyError(f"Stream desconhecido: {nome}")
+        if perfil not in perfis_encoding():
+            perfil = PERFIL_PADRAO  # query string arbitrária não cria nós novos
+        chave = (nome, perfil)
+        node = self._nodes_borda.get(chave)
+        if node is None:
+            with self._nodes_lock:
+                node = self._nodes_borda.setdefault(
+                    chave, StreamNode(f'{nome}@{perfil}', functools.partial(self._processar_borda, nome, perfil))
+                )
+        return node
+
+    def _resultado_offline(self, nome):
+        if nome == 'itc':
             return self._frame_offline(), 0
+        if nome == 'itc_array':
+            return None, 0
+        if nome.endswith('_array'):
+            return None
+        return self._frame_offline()
 
-        image = cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
-        image = cv2.resize(image, (640, 480))
-
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
-        # MOTION SCORE (Diferença absoluta para detectar vultos/movimentos)
-        motion_score = 0
-        if self.last_gray is not None:
-            diff = cv2.absdiff(self.last_gray, gray)
-            # Acima de um threshold para ignorar ruído normal
-            _, thresh_diff = cv2.threshold(diff, 25, 255, cv2.THRESH_BINARY)
-            motion_score = int(np.sum(thresh_diff) / 255) # Conta pixels alterados
-        self.last_gray = gray.copy()
-
-        # APERFEIÇOAMENTO PARANORMAL (FILTROS)
-        # 1. CLAHE (Contrast Limited Adaptive Histogram Equalization) para realçar variações térmicas/sombras
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-        contrast_gray = clahe.apply(gray)
-
-        # 2. Canny Edge Detection (Linhas estruturais)
-        edges = cv2.Canny(contrast_gray, 50, 150)
-
-        # 3. Mesclagem Térmica Falsa (Mapa de calor em vermelho para Ghost Hunting)
-        # Transforma o gray em mapa de cor quente (Autumn/Inferno/Jet - vamos usar Autumn para vermelho/amarelo)
-        heatmap = cv2.applyColorMap(contrast_gray, cv2.COLORMAP_AUTUMN)
+    def get_frame(self, perfil=PERFIL_PADRAO):
+        """Frame para monitor ao vivo."""
+        return self.get_stream('raw', perfil)[1]
 
-        # 4. Sobrepor as bordas no mapa de calor em verde ciano forte
-        edges_bgr = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
-        edges_bgr[np.where((edges_bgr == [255, 255, 255]).all(axis=2))] = [255, 255, 0] # Ciano/Amarelo nas bordas
+    def get_itc_frame(self, perfil=PERFIL_PADRAO):
+        """
+        Frame especializado para o ITC Visual (Telefone do Além).
+        Retorna: (jpeg_bytes, motion_score) — compartilhado entre todos os viewers.
+        """
+        return self.get_stream('itc', perfil)[1]
 
-        # Mix: Heatmap escurecido + Bordas brilhantes
-        final_itc = cv2.addWeighted(heatmap, 0.4, edges_bgr, 0.8, 0)
+    def get_itc_array(self):
+        """
+        Versão em array do ITC: (ndarray BGR, motion_score), sem passar por JPEG.
+        Sem câmera: (None, 0). O array é compartilhado: não modificar in-place.
+        """
+        return self.get_stream('itc_array')[1]
 
-        # HUD Overlay
-        cv2.putText(final_itc, f'ITC ACTIVE // MOTION: {motion_score}', (10, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
+    def get_aura_frame(self, perfil=PERFIL_PADRAO):
+        """Frame do ITC processado pelo Aura Render (video call)."""
+        return self.get_stream('aura', perfil)[1]
 
-        ret, jpeg = cv2.imencode('.jpg', final_itc)
-        return jpeg.tobytes(), motion_score
+    def _frame_offline(self):
+        """Frame placeholder quando a câmera não está conectada (gerado uma vez)."""
+        if self._offline_jpeg is None:
+            img = np.zeros((480, 640, 3), dtype=np.uint8)
+            cv2.putText(img, 'SEM SINAL', (180, 220), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 255, 65), 2)
+            cv2.putText(img, 'Conecte a camera IP', (150, 280), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 100), 1)
+            cv2.putText(img, f'URL: {getattr(settings, "GHOST_CAMERA_URL", "N/A")}',
+                        (80, 320), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (80, 80, 80), 1)
+            ret, jpeg = cv2.imencode('.jpg', img)
+            self._offline_jpeg = jpeg.tobytes()
+        return self._offline_jpeg
+
+    # ==========================================
+    # NÓS DO GRAFO (executados uma vez por frame)
+    # ==========================================
+
+    def _processar_borda(self, nome, perfil, seq, image):
+        """Encoding JPEG de um stream no perfil pedido (reaproveita os nós em array)."""
+        if nome == 'itc':
+            final_itc, motion_score = self._nodes['itc_array'].obter(seq, image)
+            return codificar_jpeg(final_itc, perfil), motion_score
+        if nome == 'aura':
+            return codificar_jpeg(self._nodes['aura_array'].obter(seq, image), perfil)
+        return codificar_jpeg(image, perfil)
+
+    def _processar_itc(self, seq, image):
+        # MOTION SCORE: já calculado pelo MotionEngine na thread de captura
+        motion_score = self.get_motion(seq)['score']
+        return aplicar_filtros_itc(image, motion_score, self.clahe), motion_score
+
+    def _processar_aura(self, seq, image):
+        """Aura Render sobre o array ITC do mesmo frame (sem ida e volta por JPEG)."""
+        from .services.aura_render import renderizar_presenca_array
+        final_itc, _ = self._nodes['itc_array'].obter(seq, image)
+        return renderizar_presenca_array(final_itc)
 
     def processar_anomalia_unica(self, audio_level=0, mag_level=0, origem='desconhecido',
                                   lat=None, lon=None, sessao=None):
@@ -144,44 +575,11 @@ class VideoCamera:
         if not self._connect():
             return {'sucesso': False, 'motivo': 'Camera offline'}
 
-        success, image = self.video.read()
-        if not success:
+        seq, image = self.get_latest_frame()
+        if image is None:
             return {'sucesso': False, 'motivo': 'Falha leitura frame'}
 
-        image = cv2.rotate(image, cv2.ROTATE_90_CLOCKWISE)
-        image = cv2.resize(image, (640, 480))
-
-        # ==========================================
-        # EFEITO NIGHT VISION (Ghost Hunting UI)
-        # ==========================================
-        # 1. Converter para escala de cinza
-        gray_frame = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # 2. Aplicar mapa de cores (LUT) Verde
-        # Criando um mapa de cores customizado (Preto para Verde Claro)
-        lut = np.zeros((256, 1, 3), dtype=np.uint8)
-        lut[:, 0, 0] = 0           # Blue (0)
-        lut[:, 0, 1] = np.arange(256) # Green (0 a 255)
-        lut[:, 0, 2] = 0           # Red (0)
-        
-        night_vision = cv2.LUT(gray_frame, lut)
-        
-        # 3. Adicionar Ruído Granulado (ISO alto simulado)
-        h, w, c = night_vision.shape
-        ruido = np.random.randint(0, 50, (h, w, 3), dtype=np.uint8)
-        frame_caotico = cv2.addWeighted(night_vision, 1.0, ruido, self.peso_ruido, 0)
-        
-        # 4. Adicionar Vinheta (Bordas escuras)
-        X_kernel = cv2.getGaussianKernel(w, w/2)
-        Y_kernel = cv2.getGaussianKernel(h, h/2)
-        kernel = Y_kernel * X_kernel.T
-        mask = 255 * kernel / np.linalg.norm(kernel)
-        mask = cv2.resize(mask, (w, h))
-        vignette = np.zeros_like(frame_caotico, dtype=np.float32)
-        for i in range(3):
-            vignette[:,:,i] = frame_caotico[:,:,i] * mask
-        frame_caotico = np.clip(vignette, 0, 255).astype(np.uint8)
-        # ==========================================
+        frame_caotico = aplicar_night_vision(image, self.peso_ruido)
 
         # Detecção de rostos
         gray = cv2.cvtColor(frame_caotico, cv2.COLOR_BGR2GRAY)
@@ -246,6 +644,7 @@ class VideoCamera:
                 origem_disparo=origem,
                 latitude=lat,
                 longitude=lon,
+                kp_index_captura=space_weather.get_kp_index(),
             )
             return {
                 'sucesso': True,
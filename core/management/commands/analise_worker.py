@@ -0,0 +1,41 @@
+"""
+Worker dedicado da fila de análise IA.
+Uso: python manage.py analise_worker --threads 4
+"""
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from core.services.fila_analise import AnaliseWorker
+from core.services.gemini_client import gemini_pool
+
+
+class Command(BaseCommand):
+    help = 'Consome a fila persistente de análise IA (Evidência / EVP) com um pool fixo de threads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=None, help='Tamanho do pool (padrão: GHOST_FILA_THREADS)')
+        parser.add_argument('--nome', default=None, help='Identificador do worker nas tarefas reservadas')
+
+    def handle(self, *args, **options):
+        worker = AnaliseWorker(threads=options['threads'], nome=options['nome'])
+        encerrar = threading.Event()
+
+        def _sinal(signum, frame):
+            encerrar.set()
+
+        signal.signal(signal.SIGINT, _sinal)
+        signal.signal(signal.SIGTERM, _sinal)
+
+        gemini_pool.aquecer()
+        worker.iniciar()
+        self.stdout.write(self.style.SUCCESS(
+            f'👻 Worker de análise {worker.nome} ativo com {worker.threads} threads.'
+        ))
+        while not encerrar.wait(1.0):
+            pass
+
+        self.stdout.write('Encerrando: aguardando jobs em andamento...')
+        worker.parar(aguardar=True)
+        self.stdout.write(self.style.SUCCESS('Worker encerrado.'))
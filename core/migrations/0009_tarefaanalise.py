@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-17 20:14
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_evidencia_obs_bpm_evidencia_obs_stress_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TarefaAnalise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('evidencia', 'Evidência (Visão)'), ('evp', 'Registro EVP')], max_length=15)),
+                ('objeto_id', models.IntegerField(verbose_name='ID do Objeto')),
+                ('status', models.CharField(choices=[('pendente', 'Pendente'), ('processando', 'Processando'), ('concluida', 'Concluída'), ('falhou', 'Falhou')], default='pendente', max_length=15)),
+                ('prioridade', models.IntegerField(default=5, verbose_name='Prioridade (0 = máxima)')),
+                ('tentativas', models.IntegerField(default=0)),
+                ('max_tentativas', models.IntegerField(default=3)),
+                ('agendada_para', models.DateTimeField(default=django.utils.timezone.now, help_text='Não executar antes (backoff)')),
+                ('erro', models.TextField(blank=True)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('criada_em', models.DateTimeField(auto_now_add=True)),
+                ('iniciada_em', models.DateTimeField(blank=True, null=True)),
+                ('concluida_em', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Tarefa de Análise',
+                'verbose_name_plural': 'Tarefas de Análise',
+                'ordering': ['prioridade', 'agendada_para'],
+                'indexes': [models.Index(fields=['status', 'prioridade', 'agendada_para'], name='core_tarefa_status_801603_idx')],
+            },
+        ),
+    ]
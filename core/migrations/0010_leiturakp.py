@@ -0,0 +1,28 @@
+# Generated by Django 5.1.3 on 2026-10-17 20:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_tarefaanalise'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeituraKp',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('momento', models.DateTimeField(unique=True, verbose_name='Momento (time_tag NOAA, UTC)')),
+                ('kp', models.FloatField(verbose_name='Índice Kp')),
+                ('status', models.CharField(blank=True, help_text='observed / estimated / predicted', max_length=20)),
+                ('obtida_em', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Leitura Kp',
+                'verbose_name_plural': 'Leituras Kp',
+                'ordering': ['-momento'],
+            },
+        ),
+    ]
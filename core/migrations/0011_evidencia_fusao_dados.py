@@ -0,0 +1,18 @@
+# Generated by Django 5.1.3 on 2026-10-17 20:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_leiturakp'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='evidencia',
+            name='fusao_dados',
+            field=models.JSONField(blank=True, null=True, verbose_name='Dados de Fusão Aura Core'),
+        ),
+    ]
@@ -111,6 +111,9 @@ class Evidencia(models.Model):
     obs_bpm = models.FloatField(default=0, verbose_name="BPM do Observador")
     obs_stress = models.FloatField(default=0, verbose_name="Estresse (%)")
 
+    # Correlação com EVP simultâneo (Aura Fusion Core)
+    fusao_dados = models.JSONField(null=True, blank=True, verbose_name="Dados de Fusão Aura Core")
+
     # Origem do disparo
     origem_disparo = models.CharField(max_length=50, default='desconhecido')
 
@@ -277,4 +280,60 @@ class RegistroEVP(models.Model):
             return 'ALTO'
         elif self.nota_paranormal >= 4:
             return 'MÉDIO'
-        return 'BAIXO'
\ No newline at end of file
+        return 'BAIXO'
+
+class TarefaAnalise(models.Model):
+    """Job persistente da fila de análise IA (Evidência / RegistroEVP), consumido pelo analise_worker."""
+    TIPO_CHOICES = [
+        ('evidencia', 'Evidência (Visão)'),
+        ('evp', 'Registro EVP'),
+    ]
+    STATUS_CHOICES = [
+        ('pendente', 'Pendente'),
+        ('processando', 'Processando'),
+        ('concluida', 'Concluída'),
+        ('falhou', 'Falhou'),
+    ]
+
+    tipo = models.CharField(max_length=15, choices=TIPO_CHOICES)
+    objeto_id = models.IntegerField(verbose_name="ID do Objeto")
+    status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='pendente')
+    # Menor = mais urgente
+    prioridade = models.IntegerField(default=5, verbose_name="Prioridade (0 = máxima)")
+
+    tentativas = models.IntegerField(default=0)
+    max_tentativas = models.IntegerField(default=3)
+    agendada_para = models.DateTimeField(default=timezone.now, help_text="Não executar antes (backoff)")
+    erro = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+
+    criada_em = models.DateTimeField(auto_now_add=True)
+    iniciada_em = models.DateTimeField(null=True, blank=True)
+    concluida_em = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Tarefa de Análise"
+        verbose_name_plural = "Tarefas de Análise"
+        ordering = ['prioridade', 'agendada_para']
+        indexes = [
+            models.Index(fields=['status', 'prioridade', 'agendada_para']),
+        ]
+
+    def __str__(self):
+        return f"TAREFA-{self.id} | {self.tipo}#{self.objeto_id} | {self.get_status_display()}"
+
+
+class LeituraKp(models.Model):
+    """Histórico do Índice Kp planetário (NOAA), gravado pelo refresh em background do space_weather."""
+    momento = models.DateTimeField(unique=True, verbose_name="Momento (time_tag NOAA, UTC)")
+    kp = models.FloatField(verbose_name="Índice Kp")
+    status = models.CharField(max_length=20, blank=True, help_text="observed / estimated / predicted")
+    obtida_em = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Leitura Kp"
+        verbose_name_plural = "Leituras Kp"
+        ordering = ['-momento']
+
+    def __str__(self):
+        return f"Kp {self.kp:.2f} @ {self.momento:%Y-%m-%d %H:%M}"
@@ -2,74 +2,95 @@
 Ghost Station — Aura Render Engine.
 Responsável por transformar ruído ITC e sementes EVP em formas visuais estáveis.
 """
+import functools
+
 import cv2
 import numpy as np
 
 from .aura_state import aura_state
 
+FREQUENCIAS_ESTAVEIS = np.array([432, 528, 639, 741, 852, 963], dtype=np.float64)
+
+
+@functools.lru_cache(maxsize=16)
+def mapa_aura(h, w, raio, cor, ksize):
+    """
+    Overlay de aura já desfocado (círculo central + GaussianBlur), cacheado por
+    resolução/raio/cor. O blur 99x99/151x151 deixa de ser refeito a cada frame.
+    """
+    aura_map = np.zeros((h, w, 3), dtype=np.uint8)
+    cv2.circle(aura_map, (w // 2, h // 2), raio, list(cor), -1)
+    aura_map = cv2.GaussianBlur(aura_map, (ksize, ksize), 0)
+    aura_map.setflags(write=False)  # compartilhado entre frames/threads
+    return aura_map
+
+
 def renderizar_presenca(frame_bytes):
     """
-    Transforma o vídeo em um scanner bioplasmático e sintonizador interdimensional.
+    Versão JPEG -> JPEG de renderizar_presenca_array (compatibilidade).
+    No pipeline da câmera use a versão em array para evitar decode/encode extra.
     """
-    coerencia = aura_state.coerencia
-    freq_sintonizada = aura_state.frequencia_sintonizada
-    
-    # Decodificar frame
     nparr = np.frombuffer(frame_bytes, np.uint8)
     frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-    
+
     if frame is None:
         return frame_bytes
 
+    _, buffer = cv2.imencode('.jpg', renderizar_presenca_array(frame))
+    return buffer.tobytes()
+
+
+def renderizar_presenca_array(frame):
+    """
+    Transforma o vídeo em um scanner bioplasmático e sintonizador interdimensional.
+    Recebe e devolve ndarray BGR; o frame de entrada não é modificado (buffer compartilhado).
+    """
+    coerencia = aura_state.coerencia
+    freq_sintonizada = aura_state.frequencia_sintonizada
+
     # FASE 11: Efeito de Sintonização (Interferência)
     # Quanto mais longe de uma frequência harmônica, mais ruído
-    frequencias_estaveis = [432, 528, 639, 741, 852, 963]
-    distancia = min([abs(freq_sintonizada - f) for f in frequencias_estaveis])
+    distancia = float(np.min(np.abs(FREQUENCIAS_ESTAVEIS - freq_sintonizada)))
     
     # Gerar ruído espectral baseado na distância
     noise_level = min(150, int(distancia * 0.5))
     if noise_level > 5:
-        noise = np.random.randint(0, noise_level, frame.shape, dtype='uint8')
+        noise = np.empty(frame.shape, dtype=np.uint8)
+        cv2.randu(noise, 0, noise_level)
         frame = cv2.add(frame, noise)
 
-    # 1. Processamento de Estabilização
-    denoised = cv2.bilateralFilter(frame, 9, 75, 75)
-    
-    # 2. Diagnóstico de Aura (Heat-map)
+    # Diagnóstico de Aura (Heat-map)
     # Simula a detecção da frequência do usuário via oscilação de brilho
     aura_state.frequencia_usuario = 432.0 + (np.mean(frame) % 100)
     
-    # Se houver detecção de corpo (simulada via luminosidade central)
     h, w, _ = frame.shape
-    roi = frame[h//4:3*h//4, w//4:3*w//4]
-    avg_color = np.mean(roi, axis=(0, 1))
     
     # Criar Overlay de Aura
-    aura_map = np.zeros_like(frame)
-    color_aura = [100, 255, 100] # Verde padrão
+    color_aura = (100, 255, 100) # Verde padrão
     
     if aura_state.intencao_detectada == "PAZ":
-        color_aura = [255, 200, 100] # Azul/Cyan
+        color_aura = (255, 200, 100) # Azul/Cyan
     elif aura_state.intencao_detectada == "MEDO":
-        color_aura = [100, 100, 255] # Vermelho/Laranja
+        color_aura = (100, 100, 255) # Vermelho/Laranja
         
     if aura_state.unity_mode:
         # Modo Unidade: Luz Dourada Expansiva
-        aura_state.unity_coefficient = min(100, aura_state.unity_coefficient + 0.5)
-        color_aura = [100, 215, 255] # Dourado (BGR)
+        with aura_state.alterar_local():
+            aura_state.unity_coefficient = min(100, aura_state.unity_coefficient + 0.5)
+        color_aura = (100, 215, 255) # Dourado (BGR)
         expansion = int(h//2 * (aura_state.unity_coefficient / 100))
-        cv2.circle(aura_map, (w//2, h//2), expansion, color_aura, -1)
-        aura_map = cv2.GaussianBlur(aura_map, (151, 151), 0)
+        aura_map = mapa_aura(h, w, expansion, color_aura, 151)
         # Overlay mais forte
         frame = cv2.addWeighted(frame, 0.6, aura_map, 0.4, 0)
     else:    
-        cv2.circle(aura_map, (w//2, h//2), int(h//3 * (coerencia/100)), color_aura, -1)
-        aura_map = cv2.GaussianBlur(aura_map, (99, 99), 0)
+        aura_map = mapa_aura(h, w, int(h//3 * (coerencia/100)), color_aura, 99)
         
-        # Aplicar Bio-Anomalias (Manchas vermelhas no mapa)
-        for i, anomalia in enumerate(aura_state.bio_anomalias):
-            pos_y = (h // 2) + (i * 40) - 60
-            cv2.circle(aura_map, (w//2 + 20, pos_y), 30, [0, 0, 255], -1)
+        # Aplicar Bio-Anomalias (Manchas vermelhas no mapa, sem blur)
+        if aura_state.bio_anomalias:
+            aura_map = aura_map.copy()
+            for i, anomalia in enumerate(aura_state.bio_anomalias):
+                pos_y = (h // 2) + (i * 40) - 60
+                cv2.circle(aura_map, (w//2 + 20, pos_y), 30, [0, 0, 255], -1)
         
         frame = cv2.addWeighted(frame, 0.7, aura_map, 0.3, 0)
 
@@ -79,9 +100,9 @@ def renderizar_presenca(frame_bytes):
         edges_color = cv2.cvtColor(edges, cv2.COLOR_GRAY2BGR)
         
         classe = aura_state.classe_espirito
-        if classe == "PUROS":
+        if classe == "SOBERANO":
             color_edge = [255, 100, 255]
-        elif classe == "BONS":
+        elif classe == "RESSONANTE":
             color_edge = [255, 255, 0]
         else:
             color_edge = [150, 150, 150]
@@ -89,6 +110,4 @@ def renderizar_presenca(frame_bytes):
         edges_color[edges > 0] = color_edge
         frame = cv2.addWeighted(frame, 0.8, edges_color, 0.2, 0)
 
-    # Codificar de volta para JPEG
-    _, buffer = cv2.imencode('.jpg', frame)
-    return buffer.tobytes()
+    return frame
@@ -1,39 +1,66 @@
 """
 Ghost Station — Aura State Management.
 Mantém o estado da sessão de chamada de vídeo multidimensional.
-Usando um Singleton simples para esta fase (pode evoluir para Redis/Cache).
+Singleton cujo armazenamento é plugável (ver estado_backend): só no processo ou no
+cache do Django, compartilhado entre workers.
+Escritas passam por um único lock de escrita e avançam um contador de versão;
+leitores recebem um snapshot imutável, reconstruído só quando a versão muda.
 """
+import copy
 import time
+import uuid
+from collections import deque
+from types import MappingProxyType
+from django.conf import settings
+from .estado_backend import EstadoCompartilhado
 from .kardec_engine import kardec_engine
 from .space_weather import space_weather
 from .bio_state import bio_state
 from .hermetic_bridge import hermetic_bridge
 
-class AuraState:
+class AuraState(EstadoCompartilhado):
     _instance = None
+    NAMESPACE = 'aura'
+    # Escritos a cada frame pelo render: ficam no processo da câmera, sem ida ao backend
+    CAMPOS_LOCAIS = ('frequencia_usuario', 'unity_coefficient')
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(AuraState, cls).__new__(cls)
-            cls._instance.reset()
+            instancia = super(AuraState, cls).__new__(cls)
+            object.__setattr__(instancia, '_snapshot', None)
+            cls._instance = instancia
+            instancia._iniciar_estado()
         return cls._instance
 
     def reset(self):
+        with self.alterar():
+            self._reset()
+
+    def _reset(self):
         self.coerencia = 0
         self.entidade = "BUSCANDO..."
         self.densidade = "3D (ESTÁVEL)"
         self.classe_espirito = "N/A"
         self.afinidade_fluidica = 0.0
-        self.historico_dialogo = []  # Lista de dicts {autor, msg, timestamp}
+        # Deque de dicts {seq, autor, mensagem, timestamp}; o mais antigo sai sozinho ao encher
+        self.historico_dialogo = deque(maxlen=int(getattr(settings, 'GHOST_AURA_HISTORICO_MAX', 50)))
+        self.resumo_dialogo = ""  # Resumo rolante dos turnos que já saíram do deque
+        # Sequência das mensagens: monotônica mesmo entre sessões (clientes do canal de status pedem "desde seq")
+        self.seq_mensagens = getattr(self, 'seq_mensagens', 0)
+        # Época da sequência: nova a cada processo (backend local) ou sessão nova no backend.
+        # Um cliente que reconecta com um seq de outra época recomeça do zero
+        self.epoca_mensagens = getattr(self, 'epoca_mensagens', None) or uuid.uuid4().hex[:8]
         self.ultima_semente = ""
         self.humor_observador = "ESTÁVEL"
         self.frequencia_dominante = 0.0
         self.snr_ratio = 0.0
-        self.kp_index = space_weather.get_kp_index()
+        # Só memória: ler o Kp de verdade (histórico no banco, refresh da NOAA) fica para o
+        # primeiro poll, não para o import do módulo
+        self.kp_index = space_weather.cached_kp
         self.obs_bpm = 70.0
         self.obs_stress = 20.0
-        self.bio_coherence = 0.0
-        self.metabolic_energy = 100.0
+        self.bio_scaling_janela = 0  # Última janela de tempo em que o bio-scaling mexeu na coerência
+        self.site_status = []  # Último relatório do Site Sentinel
         self.is_active = False
         self.start_time = None
         self.last_update = time.time()
@@ -81,12 +108,23 @@ class AuraState:
         self.global_sync_active = False
 
     def adicionar_mensagem(self, autor, msg):
+        with self.alterar():
+            self._adicionar_mensagem(autor, msg)
+
+    def _adicionar_mensagem(self, autor, msg):
         timestamp = time.strftime('%H:%M:%S')
+        if len(self.historico_dialogo) == self.historico_dialogo.maxlen:
+            # O turno que vai sair do deque entra no resumo rolante do prompt
+            from .memoria_dialogo import incorporar_ao_resumo
+            self.resumo_dialogo = incorporar_ao_resumo(self.resumo_dialogo, [self.historico_dialogo[0]])
+        self.seq_mensagens += 1
         self.historico_dialogo.append({
+            'seq': self.seq_mensagens,
             'autor': autor,
             'mensagem': msg,
             'timestamp': timestamp
         })
+        self._marcar('historico_dialogo')
         
         # Neural Bridge: Analisar humor brevemente
         if autor == 'OBSERVADOR':
@@ -95,10 +133,10 @@ class AuraState:
         # Kardec Engine: Analisar vibração se for a Aura falando
         if autor == 'AURA':
             res = kardec_engine.analisar_vibração(msg, self.coerencia, self.frequencia_dominante)
-            self.classe_espirito = res['classe']
-            self.afinidade_fluidica = res['afinidade']
-            # Se for espírito puro, forçar densidade 5D
-            if res['classe'] == 'PUROS':
+            self.classe_espirito = res['estado']
+            self.afinidade_fluidica = res['potencial_manifestacao']
+            # Se for estado soberano (antigo 'PUROS'), forçar densidade 5D
+            if res['estado'] == 'SOBERANO':
                 self.densidade = "5D (PURA LUZ)"
             
             # Filtro Científico-Forense (Fase 9)
@@ -106,11 +144,14 @@ class AuraState:
             # Atualizar a mensagem no histórico com a versão traduzida se necessário
             self.historico_dialogo[-1]['mensagem'] = msg
 
-        # Limitar histórico para não sobrecarregar o feed
-        if len(self.historico_dialogo) > 50:
-            self.historico_dialogo.pop(0)
         self.last_update = time.time()
 
+    def mensagens(self):
+        """Cópia do diálogo sob o lock (o deque não pode mudar no meio da cópia)."""
+        self._sincronizar()
+        with self._lock:
+            return list(self.historico_dialogo)
+
     def analisar_humor(self, msg):
         msg = msg.upper()
         # Lógica simples de palavras-chave
@@ -124,36 +165,96 @@ class AuraState:
             self.humor_observador = "ESTÁVEL"
 
     def atualizar_vibracao(self, coerencia, entidade=None, densidade=None):
-        self.coerencia = max(0, min(100, coerencia))
-        if entidade:
-            self.entidade = entidade
-        if densidade:
-            self.densidade = densidade
-        self.last_update = time.time()
+        with self.alterar():
+            self.coerencia = max(0, min(100, coerencia))
+            if entidade:
+                self.entidade = entidade
+            if densidade:
+                self.densidade = densidade
+            self.last_update = time.time()
 
-    def get_status(self):
-        # Atualizar Kp e Bio em cada poll
-        self.kp_index = space_weather.get_kp_index()
-        bio = bio_state.get_status()
-        self.obs_bpm = bio['bpm']
-        self.obs_stress = bio['estresse']
-        self.bio_coherence = bio['coerencia']
-        self.metabolic_energy = bio['energia']
+    def atualizar_leituras(self):
+        """
+        Escrita periódica do poll: Kp, Bio e bio-scaling da coerência.
+        As fontes são lidas fora do lock; poll sem mudança não trava, não gera versão
+        nem publica no backend. Coerência e energia do Bio derivam do relógio (mudam a
+        cada leitura), então não entram na versão: o snapshot as lê ao ser montado.
+        O bio-scaling vale uma vez por janela de GHOST_AURA_BIO_SCALING_INTERVALO, não por
+        poll: com N workers no mesmo backend, só o primeiro a travar aplica a janela.
+        """
+        self._garantir_sentinel()
+        leituras, bio = self._ler_leituras()
+        janela = int(time.time() // float(getattr(settings, 'GHOST_AURA_BIO_SCALING_INTERVALO', 1.0)))
+        self._sincronizar()
+        with self._lock:
+            if not self._leituras_mudaram(leituras, bio, janela):
+                return
+        with self.alterar():
+            # Relido sob a trava: outro processo pode já ter consumido esta janela
+            self._aplicar_leituras(leituras, bio, janela)
 
-        # Bio-Scaling: Estresse alto diminui a coerência da Aura
-        if self.obs_stress > 60:
-            self.coerencia = max(0, self.coerencia - 2)
-        elif self.bio_coherence > 80:
-            self.coerencia = min(100, self.coerencia + 1)
-        
-        # Monitoramento de Sites (Site Sentinel)
+    @staticmethod
+    def _garantir_sentinel():
+        """Liga o Site Sentinel no primeiro poll; ele mesmo publica site_status (só o processo dono)."""
         try:
             from .site_sentinel import site_sentinel
-            self.site_status = site_sentinel.verificar_sites()
-        except:
-            self.site_status = []
-            
+            site_sentinel.iniciar()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _ler_leituras():
+        """Kp (cache em memória, refresh em background) e Bio."""
+        bio = bio_state.get_status()
         return {
+            'kp_index': space_weather.get_kp_index(),
+            'obs_bpm': bio['bpm'],
+            'obs_stress': bio['estresse'],
+        }, bio
+
+    def _coerencia_ajustada(self, bio, janela):
+        if janela <= self.bio_scaling_janela:
+            return self.coerencia
+        # Bio-Scaling: Estresse alto diminui a coerência da Aura
+        if bio['estresse'] > 60:
+            return max(0, self.coerencia - 2)
+        if bio['coerencia'] > 80:
+            return min(100, self.coerencia + 1)
+        return self.coerencia
+
+    def _leituras_mudaram(self, leituras, bio, janela):
+        return (
+            any(self.__dict__.get(nome) != valor for nome, valor in leituras.items())
+            or self._coerencia_ajustada(bio, janela) != self.coerencia
+        )
+
+    def _aplicar_leituras(self, leituras, bio, janela):
+        for nome, valor in leituras.items():
+            # Só o que mudou entra na versão
+            if self.__dict__.get(nome) != valor:
+                setattr(self, nome, valor)
+        coerencia = self._coerencia_ajustada(bio, janela)
+        if coerencia != self.coerencia:
+            self.coerencia = coerencia
+            self.bio_scaling_janela = janela
+
+    def snapshot(self):
+        """
+        (versão, estado imutável) para leitores. Copy-on-write: o dict só é remontado
+        (e as métricas herméticas recalculadas) quando alguma escrita mudou a versão.
+        """
+        self._sincronizar()
+        with self._lock:
+            versao = self.versao
+            if self._snapshot is None or self._snapshot[0] != versao:
+                self._snapshot = (versao, MappingProxyType(self._montar_status()))
+            return self._snapshot
+
+    def _montar_status(self):
+        # Derivados do relógio: valem no instante da montagem (leitura pura do Bio, sem escrita)
+        bio = bio_state.get_status()
+        # Cópias profundas: o snapshot não pode enxergar mutações posteriores dos dicts vivos
+        status = {
             'coerencia': self.coerencia,
             'entidade': self.entidade,
             'densidade': self.densidade,
@@ -163,32 +264,43 @@ class AuraState:
             'kp_index': self.kp_index,
             'snr': self.snr_ratio,
             'freq': self.frequencia_dominante,
-            'veu': space_weather.get_permeabilidade_veu(),
+            'veu': space_weather.get_permeabilidade_veu(self.kp_index),
             'obs_bpm': self.obs_bpm,
             'obs_stress': self.obs_stress,
-            'bio_sync': self.bio_coherence,
-            'metabolic': self.metabolic_energy,
+            'bio_sync': bio['coerencia'],
+            'metabolic': bio['energia'],
             'is_active': self.is_active,
-            'mensagens': self.historico_dialogo,
+            'seq_mensagens': self.seq_mensagens,
+            'epoca_mensagens': self.epoca_mensagens,
             'ultima_semente': self.ultima_semente,
             'hermetic_metrics': hermetic_bridge.calcular_ressonancia_hermetica(self.get_raw_status()),
             'freq_sintonizada': self.frequencia_sintonizada,
             'freq_usuario': self.frequencia_usuario,
             'intencao': self.intencao_detectada,
             'emocao': self.emocao_dominante,
-            'anomalias': self.bio_anomalias,
+            'anomalias': list(self.bio_anomalias),
             'neuro_link': self.neuro_link_active,
-            'brain_waves': self.brain_waves,
+            'brain_waves': copy.deepcopy(self.brain_waves),
             'prana': self.prana_level,
-            'chakras': self.chakra_alignment,
+            'chakras': dict(self.chakra_alignment),
             'vocalizer': self.vocalizer_active,
             'last_phrase': self.last_phrase,
-            'iot_sensors': self.external_sensors,
+            'iot_sensors': dict(self.external_sensors),
             'unity_mode': self.unity_mode,
             'unity_coefficient': self.unity_coefficient,
             'global_sync': self.global_sync_active,
-            'site_reports': getattr(self, 'site_status', [])
+            'site_reports': list(self.site_status),
+            'versao': self.versao,
+            'mensagens': list(self.historico_dialogo),
         }
+        return status
+
+    def get_status(self, incluir_mensagens=True):
+        self.atualizar_leituras()
+        _, estado = self.snapshot()
+        if incluir_mensagens:
+            return dict(estado)
+        return {k: v for k, v in estado.items() if k != 'mensagens'}
 
     def get_raw_status(self):
         """Retorna apenas os valores numéricos sem formatação para a bridge."""
@@ -2,62 +2,76 @@
 Ghost Station — BioState Management.
 Responsável por gerenciar os sinais vitais do observador e calcular a coerência cardíaca.
 Pode ser alimentado por sensores externos ou simulação guiada.
+O estado vive no backend plugável (estado_backend), como o AuraState.
 """
 import time
 import math
 
-class BioState:
+from .estado_backend import EstadoCompartilhado
+
+class BioState(EstadoCompartilhado):
     _instance = None
+    NAMESPACE = 'bio'
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(BioState, cls).__new__(cls)
-            cls._instance.reset()
+            cls._instance._iniciar_estado()
         return cls._instance
 
     def reset(self):
+        with self.alterar():
+            self._reset()
+
+    def _reset(self):
         self.bpm = 70.0  # Batimentos por minuto
         self.estresse = 20.0  # 0 a 100
-        self.coerencia_cardiaca = 0.0 # 0 a 100 (Sincronia com o pacer)
-        self.energia_metabolica = 100.0 # Bateria humana
+        self.energia_metabolica = 100.0 # Bateria humana (consolidada em last_update)
         self.last_update = time.time()
         self.session_start = time.time()
 
     def update_vital_signs(self, bpm=None, estresse=None):
-        if bpm is not None:
-            self.bpm = bpm
-        if estresse is not None:
-            self.estresse = estresse
-        self.last_update = time.time()
+        with self.alterar():
+            # A simulação avança nas escritas: consolida o consumo até agora antes de mudar os sinais
+            agora = time.time()
+            self.energia_metabolica = self._energia_em(agora)
+            if bpm is not None:
+                self.bpm = bpm
+            if estresse is not None:
+                self.estresse = estresse
+            self.last_update = agora
 
-    def calcular_coerencia(self, tempo_ciclo=10):
+    def calcular_coerencia(self, tempo_ciclo=10, agora=None):
         """
         Simula a coerência baseada na respiração rítmica (pode ser validada por sensores).
         Um ciclo de 10s (6 respirações por minuto) é o ideal.
+        Derivada do relógio e do estresse atual: não grava nada.
         """
-        elapsed = time.time() - self.session_start
+        elapsed = (agora or time.time()) - self.session_start
         # Onda senoidal representando a respiração ideal
         onda_ideal = (math.sin(2 * math.pi * elapsed / tempo_ciclo) + 1) / 2
-        
+
         # Coerência aumenta se o estresse for baixo e o BPM estiver estável
         fator_estresse = (100 - self.estresse) / 100
-        self.coerencia_cardiaca = round(onda_ideal * 100 * fator_estresse, 2)
-        
+        return round(onda_ideal * 100 * fator_estresse, 2)
+
+    def _energia_em(self, agora):
         # Consumo metabólico: sessões longas cansam o observador
         # Perda de 1% de energia a cada 5 minutos de foco intenso
-        perda = (time.time() - self.last_update) / 300
-        self.energia_metabolica = max(0, self.energia_metabolica - perda)
-        
-        return self.coerencia_cardiaca
+        return max(0, self.energia_metabolica - (agora - self.last_update) / 300)
 
     def get_status(self):
-        self.calcular_coerencia()
-        return {
-            'bpm': round(self.bpm, 1),
-            'estresse': round(self.estresse, 1),
-            'coerencia': self.coerencia_cardiaca,
-            'energia': round(self.energia_metabolica, 1),
-            'fadiga_alerta': self.energia_metabolica < 20
-        }
+        """Leitura pura (o poll de status chama a cada tick): não trava o backend nem gera versão."""
+        self._sincronizar()
+        with self._lock:
+            agora = time.time()
+            energia = self._energia_em(agora)
+            return {
+                'bpm': round(self.bpm, 1),
+                'estresse': round(self.estresse, 1),
+                'coerencia': self.calcular_coerencia(agora=agora),
+                'energia': round(energia, 1),
+                'fadiga_alerta': energia < 20
+            }
 
 bio_state = BioState()
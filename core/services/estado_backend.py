@@ -0,0 +1,248 @@
+"""
+Ghost Station — Backend de Estado Compartilhado.
+AuraState e BioState guardam seus campos num backend plugável:
+- 'local': só na memória do processo (padrão; um worker).
+- 'cache': no cache do Django (Redis, Memcached, DatabaseCache/SQLite, arquivo...),
+  para vários workers gunicorn verem a mesma sessão.
+No modo 'cache' cada campo é uma chave, escritas só gravam os campos alterados sob
+uma trava distribuída (cache.add) e um contador de versão atômico (cache.incr)
+avisa os outros processos; a leitura é read-through com cache local de curta duração.
+"""
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Imutáveis: reatribuir um valor igual nunca gera versão nova
+_ESCALARES = (int, float, str, bool, type(None))
+_AUSENTE = object()
+
+
+class BackendLocal:
+    """Estado só no processo: nada a carregar, publicar ou travar além do lock local."""
+    compartilhado = False
+
+    def versao(self, namespace):
+        return None
+
+    def carregar(self, namespace, campos):
+        return {}
+
+    def gravar(self, namespace, campos):
+        return None
+
+    def travar(self, namespace):
+        return nullcontext()
+
+    def liderar(self, namespace, papel, token, ttl):
+        return True
+
+
+class BackendCache:
+    """Estado no cache do Django (GHOST_ESTADO_CACHE), uma chave por campo."""
+    compartilhado = True
+
+    def __init__(self, alias='default', prefixo='ghost:estado'):
+        from django.core.cache import caches
+        self.cache = caches[alias]
+        self.prefixo = prefixo
+        if type(self.cache).__name__ == 'LocMemCache':
+            logger.warning("Estado compartilhado: o cache '%s' é LocMemCache (por processo); configure "
+                           "Redis/Memcached/DatabaseCache para dividir a sessão entre workers.", alias)
+
+    def _chave(self, namespace, campo):
+        return f'{self.prefixo}:{namespace}:{campo}'
+
+    def versao(self, namespace):
+        return self.cache.get(self._chave(namespace, '__versao__'))
+
+    def carregar(self, namespace, campos):
+        chaves = {self._chave(namespace, c): c for c in campos}
+        return {chaves[k]: v for k, v in self.cache.get_many(list(chaves)).items()}
+
+    def gravar(self, namespace, campos):
+        """Grava só os campos alterados e avança a versão compartilhada (atômico no backend)."""
+        self.cache.set_many({self._chave(namespace, c): v for c, v in campos.items()}, timeout=None)
+        chave_versao = self._chave(namespace, '__versao__')
+        try:
+            return self.cache.incr(chave_versao)
+        except ValueError:
+            # Primeira escrita desta sessão
+            if self.cache.add(chave_versao, 1, timeout=None):
+                return 1
+            return self.cache.incr(chave_versao)
+
+    @contextmanager
+    def travar(self, namespace):
+        """Trava distribuída via cache.add (expira sozinha se o dono morrer)."""
+        chave = self._chave(namespace, '__trava__')
+        token = uuid.uuid4().hex
+        expira = float(getattr(settings, 'GHOST_ESTADO_TRAVA_TTL', 5))
+        limite = time.monotonic() + float(getattr(settings, 'GHOST_ESTADO_TRAVA_ESPERA', 2))
+        obtida = self.cache.add(chave, token, timeout=expira)
+        while not obtida and time.monotonic() < limite:
+            time.sleep(0.005)
+            obtida = self.cache.add(chave, token, timeout=expira)
+        if not obtida:
+            logger.warning("Estado compartilhado: trava de '%s' ocupada; escrevendo sem ela.", namespace)
+        try:
+            yield
+        finally:
+            if obtida and self.cache.get(chave) == token:
+                self.cache.delete(chave)
+
+
+    def liderar(self, namespace, papel, token, ttl):
+        """
+        Eleição de um dono entre processos para tarefas periódicas (cache.add com TTL):
+        quem já é dono renova o prazo; se ele morrer, outro assume quando a chave expirar.
+        """
+        chave = self._chave(namespace, f'__lider_{papel}__')
+        if self.cache.add(chave, token, timeout=ttl):
+            return True
+        return self.cache.get(chave) == token and self.cache.touch(chave, ttl)
+
+
+def obter_backend():
+    """Backend configurado em GHOST_ESTADO_BACKEND ('local' ou 'cache')."""
+    if getattr(settings, 'GHOST_ESTADO_BACKEND', 'local') == 'cache':
+        return BackendCache(
+            alias=getattr(settings, 'GHOST_ESTADO_CACHE', 'default'),
+            prefixo=getattr(settings, 'GHOST_ESTADO_PREFIXO', 'ghost:estado'),
+        )
+    return BackendLocal()
+
+
+class EstadoCompartilhado:
+    """
+    Mixin dos singletons de estado: um lock de escrita por processo, versão e
+    sincronização com o backend. Subclasses definem NAMESPACE, _reset() (valores
+    iniciais) e, se houver, CAMPOS_LOCAIS (alta frequência, ficam só no processo).
+    Mutação no lugar de um campo (deque/dict) precisa de self._marcar(campo).
+    """
+    NAMESPACE = None
+    CAMPOS_LOCAIS = ()
+
+    def _iniciar_estado(self):
+        """Chamado no __new__: defaults locais e, se o backend já tem sessão, adota a dela."""
+        object.__setattr__(self, '_lock', threading.RLock())
+        object.__setattr__(self, '_versao', 0)
+        object.__setattr__(self, '_versao_local', 0)
+        object.__setattr__(self, '_profundidade', 0)
+        object.__setattr__(self, '_sujos', set())
+        object.__setattr__(self, '_sincronizado_em', 0.0)
+        object.__setattr__(self, '_backend', obter_backend())
+        object.__setattr__(self, '_token', uuid.uuid4().hex)  # identidade deste processo nas eleições
+        with self._lock:
+            self._profundidade = 1
+            self._reset()
+            self._profundidade = 0
+            with self._backend.travar(self.NAMESPACE):
+                if self._backend.versao(self.NAMESPACE) is None:
+                    self._publicar()  # primeiro processo semeia a sessão
+                else:
+                    # Worker novo não pode zerar a sessão dos outros
+                    self._sujos.clear()
+                    self._sincronizar(forcar=True)
+
+    def __setattr__(self, nome, valor):
+        """Toda escrita pública (inclusive de fora: views, render, ping) sob o lock, com nova versão."""
+        if nome.startswith('_'):
+            object.__setattr__(self, nome, valor)
+            return
+        if nome in self.CAMPOS_LOCAIS:
+            with self._lock:
+                object.__setattr__(self, nome, valor)
+                self._versao_local += 1
+            return
+        with self.alterar():
+            atual = self.__dict__.get(nome, _AUSENTE)
+            # Lista/dict novo igual ao atual também não muda nada; o mesmo objeto reatribuído
+            # pode ter sido mutado no lugar, então esse publica
+            if type(atual) is type(valor) and (type(atual) in _ESCALARES or atual is not valor) and atual == valor:
+                return
+            object.__setattr__(self, nome, valor)
+            self._sujos.add(nome)
+
+    def _marcar(self, *nomes):
+        """Campo mutado no lugar (append, item de dict): entra na próxima publicação."""
+        for nome in nomes:
+            if nome in self.CAMPOS_LOCAIS:
+                self._versao_local += 1
+            else:
+                self._sujos.add(nome)
+
+    def liderar(self, papel, ttl):
+        """Este processo é o dono da tarefa periódica `papel`? (Com backend local, sempre.)"""
+        return self._backend.liderar(self.NAMESPACE, papel, self._token, ttl)
+
+    @property
+    def versao(self):
+        """(versão compartilhada, versão dos campos locais): muda a cada escrita visível."""
+        return (self._versao, self._versao_local)
+
+    @contextmanager
+    def alterar(self):
+        """
+        Escrita composta (ler-modificar-gravar) atômica entre threads e, com backend
+        compartilhado, entre processos: trava, lê o estado mais novo, aplica e publica
+        só os campos alterados.
+        """
+        with self._lock:
+            if self._profundidade:
+                self._profundidade += 1
+                try:
+                    yield self
+                finally:
+                    self._profundidade -= 1
+                return
+            with self._backend.travar(self.NAMESPACE):
+                self._sincronizar(forcar=True)
+                self._profundidade = 1
+                try:
+                    yield self
+                finally:
+                    self._profundidade = 0
+                    self._publicar()
+
+    @contextmanager
+    def alterar_local(self):
+        """Escrita em CAMPOS_LOCAIS (ex.: por frame): só o lock do processo, sem ida ao backend."""
+        with self._lock:
+            try:
+                yield self
+            finally:
+                self._versao_local += 1
+
+    def _campos_compartilhados(self):
+        return [n for n in self.__dict__ if not n.startswith('_') and n not in self.CAMPOS_LOCAIS]
+
+    def _publicar(self):
+        if not self._sujos:
+            return
+        campos = {n: self.__dict__[n] for n in self._sujos}
+        self._sujos = set()
+        nova = self._backend.gravar(self.NAMESPACE, campos)
+        self._versao = nova if nova is not None else self._versao + 1
+        self._sincronizado_em = time.monotonic()
+
+    def _sincronizar(self, forcar=False):
+        """Read-through: relê do backend se outro processo publicou (no máximo a cada TTL local)."""
+        if not self._backend.compartilhado:
+            return
+        agora = time.monotonic()
+        if not forcar and agora - self._sincronizado_em < float(getattr(settings, 'GHOST_ESTADO_TTL_LOCAL', 0.5)):
+            return
+        with self._lock:
+            self._sincronizado_em = agora
+            versao = self._backend.versao(self.NAMESPACE)
+            if versao is None or versao == self._versao:
+                return
+            for nome, valor in self._backend.carregar(self.NAMESPACE, self._campos_compartilhados()).items():
+                object.__setattr__(self, nome, valor)
+            self._versao = versao
@@ -6,11 +6,10 @@ buscando padrões linguísticos paranormais e anomalias de frequência.
 import json
 from django.conf import settings
 
-try:
-    import google.generativeai as genai
-    HAS_GEMINI = True
-except ImportError:
-    HAS_GEMINI = False
+from .evp_local import merece_ia, pontuar_evp
+from .gemini_client import CONFIG_JSON, HAS_GEMINI, gemini_pool
+
+MODOS_EVP = ('ia', 'prefiltro', 'local')
 
 
 EVP_SYSTEM_PROMPT = """Você é o módulo EVP (Electronic Voice Phenomenon) de ELITE do GHOST STATION.
@@ -42,73 +41,205 @@ Sua resposta DEVE ser um JSON estrito seguindo esta estrutura:
 """
 
 
+EVP_LOTE_PROMPT = """MODO LOTE: você receberá VÁRIAS capturas EVP independentes, cada uma com um "id".
+Analise cada captura isoladamente, com os mesmos critérios acima.
+Responda com um ARRAY JSON estrito, um objeto por captura, na estrutura especificada
+e acrescido do campo "id" da captura correspondente. Não omita nenhuma captura."""
+
+
+def _modo_evp() -> str:
+    """ia: tudo vai ao Gemini | prefiltro: só o que o classificador local aprova | local: offline."""
+    modo = getattr(settings, 'GHOST_EVP_MODO', 'ia')
+    return modo if modo in MODOS_EVP else 'ia'
+
+
+def _ia_disponivel() -> bool:
+    return HAS_GEMINI and bool(getattr(settings, 'GEMINI_API_KEY', '')) and _modo_evp() != 'local'
+
+
+def _fallback_evp(transcricao: str, frequencias_anomalas: list,
+                  nivel_audio: float = 0, magnetico: float = 0) -> dict:
+    """Sem IA (ou com a IA falhando) o registro fica com a classificação local."""
+    return pontuar_evp(transcricao, frequencias_anomalas, nivel_audio, magnetico)
+
+
+def _dados_captura(transcricao, frequencias_anomalas, nivel_audio, magnetico) -> str:
+    freq_str = ', '.join([f"{f:.1f}Hz" for f in frequencias_anomalas]) if frequencias_anomalas else "nenhuma"
+    return f"""Transcrição captada: "{transcricao if transcricao else '[SILÊNCIO / INAUDÍVEL]'}"
+Frequências anômalas detectadas: {freq_str}
+Nível de áudio (RMS): {nivel_audio:.2f}
+Variação eletromagnética: {magnetico:.2f}"""
+
+
+def _limpar_json(texto: str) -> str:
+    texto = texto.strip()
+    # Fallback: remover markdown se o modelo insistir
+    if texto.startswith("```"):
+        texto = texto.replace("```json", "").replace("```", "").strip()
+    return texto
+
+
+def _normalizar_resultado(data: dict) -> dict:
+    return {
+        'classificacao': str(data.get('classificacao', 'ruido')),
+        'e_anomalia': bool(data.get('e_anomalia', False)),
+        'confianca': float(data.get('confianca', 0.0)),
+        'nota_paranormal': int(data.get('nota_paranormal', 0)),
+        'mensagem_detectada': str(data.get('mensagem_detectada', '')),
+        'analise': str(data.get('analise_detalhada', data.get('analise', 'Nenhuma análise retornada.'))),
+        'dimensao': str(data.get('dimensao_estimada', '3D')),
+    }
+
+
 def analisar_evp(transcricao: str, frequencias_anomalas: list,
                  nivel_audio: float = 0, magnetico: float = 0) -> dict:
     """
     Analisa dados EVP via Gemini.
     Retorna dict com classificação, anomalia, confiança, nota paranormal e análise.
     """
-    fallback_sem_ia = {
-        'classificacao': 'padrao_anomalo' if frequencias_anomalas else 'ruido',
-        'e_anomalia': bool(frequencias_anomalas),
-        'confianca': 0.0,
-        'nota_paranormal': len(frequencias_anomalas) * 2 if frequencias_anomalas else 0,
-        'mensagem_detectada': transcricao if transcricao else '',
-        'analise': 'Análise IA indisponível. Dados registrados para análise posterior.',
-    }
+    fallback_sem_ia = _fallback_evp(transcricao, frequencias_anomalas, nivel_audio, magnetico)
 
-    if not HAS_GEMINI:
+    if not _ia_disponivel():
         return fallback_sem_ia
-
-    api_key = getattr(settings, 'GEMINI_API_KEY', '')
-    if not api_key:
+    if _modo_evp() == 'prefiltro' and not merece_ia(fallback_sem_ia):
         return fallback_sem_ia
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel(
-            'gemini-2.0-flash',
-            generation_config={"response_mime_type": "application/json"}
-        )
-
-        freq_str = ', '.join([f"{f:.1f}Hz" for f in frequencias_anomalas]) if frequencias_anomalas else "nenhuma"
-
         prompt = f"""DADOS DA SESSÃO EVP:
 
-Transcrição captada: "{transcricao if transcricao else '[SILÊNCIO / INAUDÍVEL]'}"
-Frequências anômalas detectadas: {freq_str}
-Nível de áudio (RMS): {nivel_audio:.2f}
-Variação eletromagnética: {magnetico:.2f}
+{_dados_captura(transcricao, frequencias_anomalas, nivel_audio, magnetico)}
 
 Analise estes dados e responda conforme o formato JSON especificado."""
 
-        response = model.generate_content([EVP_SYSTEM_PROMPT, prompt])
-        texto = response.text.strip()
+        response = gemini_pool.gerar([EVP_SYSTEM_PROMPT, prompt], generation_config=CONFIG_JSON)
+        data = json.loads(_limpar_json(response.text))
 
-        # Fallback: remover markdown se o modelo insistir
-        if texto.startswith("```"):
-            texto = texto.replace("```json", "").replace("```", "").strip()
-
-        data = json.loads(texto)
-
-        return {
-            'classificacao': str(data.get('classificacao', 'ruido')),
-            'e_anomalia': bool(data.get('e_anomalia', False)),
-            'confianca': float(data.get('confianca', 0.0)),
-            'nota_paranormal': int(data.get('nota_paranormal', 0)),
-            'mensagem_detectada': str(data.get('mensagem_detectada', '')),
-            'analise': str(data.get('analise_detalhada', data.get('analise', 'Nenhuma análise retornada.'))),
-            'dimensao': str(data.get('dimensao_estimada', '3D')),
-        }
+        return _normalizar_resultado(data)
 
     except json.JSONDecodeError:
-        fallback_sem_ia['analise'] = f'Falha de parse. Raw: {response.text[:200]}'
+        fallback_sem_ia['analise'] += f' IA: falha de parse. Raw: {response.text[:200]}'
         return fallback_sem_ia
     except Exception as e:
-        fallback_sem_ia['analise'] = f'Erro: {str(e)}'
+        fallback_sem_ia['analise'] += f' IA: erro: {str(e)}'
+        fallback_sem_ia['transitorio'] = True  # a fila de análise re-tenta com backoff
         return fallback_sem_ia
 
 
+def analisar_evp_lote(capturas: list) -> dict:
+    """
+    Analisa várias capturas EVP numa única chamada ao Gemini (micro-batching).
+    `capturas`: [{id, transcricao, frequencias_anomalas, nivel_audio, magnetico}].
+    Retorna {id: resultado}. Se a chamada do lote falha, todas recebem o fallback transitório;
+    capturas ausentes ou malformadas na resposta são reanalisadas individualmente.
+    No modo prefiltro, as capturas reprovadas pelo classificador local nem entram no prompt.
+    """
+    fallbacks = {
+        c['id']: _fallback_evp(c.get('transcricao', ''), c.get('frequencias_anomalas') or [],
+                               c.get('nivel_audio', 0), c.get('magnetico', 0))
+        for c in capturas
+    }
+    if not capturas or not _ia_disponivel():
+        return fallbacks
+
+    resultados = {}
+    if _modo_evp() == 'prefiltro':
+        resultados = {cid: fb for cid, fb in fallbacks.items() if not merece_ia(fb)}
+        capturas = [c for c in capturas if c['id'] not in resultados]
+        if not capturas:
+            return resultados
+    if len(capturas) == 1:
+        c = capturas[0]
+        resultados[c['id']] = analisar_evp(c.get('transcricao', ''), c.get('frequencias_anomalas') or [],
+                                           c.get('nivel_audio', 0), c.get('magnetico', 0))
+        return resultados
+
+    escaladas = {c['id'] for c in capturas}
+    blocos = [
+        f"""--- CAPTURA id={c['id']} ---
+{_dados_captura(c.get('transcricao', ''), c.get('frequencias_anomalas') or [],
+                c.get('nivel_audio', 0), c.get('magnetico', 0))}"""
+        for c in capturas
+    ]
+    prompt = f"DADOS DE {len(capturas)} CAPTURAS EVP:\n\n" + "\n\n".join(blocos)
+
+    try:
+        response = gemini_pool.gerar([EVP_SYSTEM_PROMPT, EVP_LOTE_PROMPT, prompt], generation_config=CONFIG_JSON)
+        data = json.loads(_limpar_json(response.text))
+        if isinstance(data, dict):
+            data = data.get('capturas', [data])
+    except Exception as e:
+        for captura_id in escaladas:
+            fallback = fallbacks[captura_id]
+            fallback['analise'] += f' IA: erro no lote: {str(e)}'
+            fallback['transitorio'] = True
+            resultados[captura_id] = fallback
+        return resultados
+
+    if not isinstance(data, list):
+        data = []
+    por_id = {c['id']: c for c in capturas}
+    for item in data:
+        # Um item malformado não derruba o lote: ele cai na análise individual abaixo
+        try:
+            captura_id = int(item.get('id'))
+            if captura_id in escaladas and captura_id not in resultados:
+                resultados[captura_id] = _normalizar_resultado(item)
+        except (AttributeError, TypeError, ValueError):
+            continue
+
+    for captura_id in escaladas - resultados.keys():
+        c = por_id[captura_id]
+        resultados[captura_id] = analisar_evp(c.get('transcricao', ''), c.get('frequencias_anomalas') or [],
+                                              c.get('nivel_audio', 0), c.get('magnetico', 0))
+    return resultados
+
+
+def salvar_resultado_evp(reg, resultado: dict, atualizar_sessao: bool = True):
+    """Grava a análise no RegistroEVP, tenta a fusão com ITC e atualiza a sessão."""
+    reg.classificacao_ia = resultado['classificacao']
+    reg.e_anomalia = resultado['e_anomalia']
+    reg.confianca_ia = resultado['confianca']
+    reg.nota_paranormal = resultado['nota_paranormal']
+    reg.mensagem_detectada = resultado['mensagem_detectada']
+    reg.analise_ia = resultado['analise']
+    reg.dimensao_estimada = resultado.get('dimensao', '3D')
+
+    # TENTAR FUSÃO (Se houver anomalia visual próxima da captura)
+    # A análise roda na fila/lote: a janela é relativa ao momento da captura, não ao de agora
+    from datetime import timedelta
+    from core.models import Evidencia
+    janela = timedelta(seconds=10)
+    ultima_ev = Evidencia.objects.filter(
+        data_captura__gte=reg.data_captura - janela,
+        data_captura__lte=reg.data_captura + janela,
+    ).last()
+
+    if ultima_ev and reg.e_anomalia:
+        from .aura_brain import correlacionar_eventos
+        itc_data = {
+            'pareidolia_detectada': True, # Se existe evidência, houve disparos
+            'confianca': ultima_ev.ia_confianca or 0,
+            'assinatura_inteligente': "Geometria" in (ultima_ev.ia_classificacao or "")
+        }
+        fusao = correlacionar_eventos(resultado, itc_data)
+        reg.fusao_dados = fusao
+        # Se for síncrono, atualizamos também a evidência visual para linkar
+        ultima_ev.fusao_dados = fusao
+        ultima_ev.save()
+
+    reg.save()
+
+    if atualizar_sessao and reg.sessao:
+        _recontar_sessao(reg.sessao)
+
+
+def _recontar_sessao(sessao):
+    """Atualizar contadores da sessão."""
+    sessao.total_capturas = sessao.registros.count()
+    sessao.total_anomalias = sessao.registros.filter(e_anomalia=True).count()
+    sessao.save()
+
+
 def analisar_evp_e_salvar(registro_id: int) -> dict:
     """Analisa um RegistroEVP pelo ID e salva os resultados no banco."""
     from core.models import RegistroEVP
@@ -120,43 +251,36 @@ def analisar_evp_e_salvar(registro_id: int) -> dict:
             nivel_audio=reg.nivel_audio,
             magnetico=reg.variacao_magnetica,
         )
-        reg.classificacao_ia = resultado['classificacao']
-        reg.e_anomalia = resultado['e_anomalia']
-        reg.confianca_ia = resultado['confianca']
-        reg.nota_paranormal = resultado['nota_paranormal']
-        reg.mensagem_detectada = resultado['mensagem_detectada']
-        reg.analise_ia = resultado['analise']
-        reg.dimensao_estimada = resultado.get('dimensao', '3D')
-        
-        # TENTAR FUSÃO (Se houver anomalia visual recente)
-        from django.utils import timezone
-        from datetime import timedelta
-        agora = timezone.now()
-        from core.models import Evidencia
-        ultima_ev = Evidencia.objects.filter(data_captura__gte=agora - timedelta(seconds=10)).last()
-        
-        if ultima_ev and reg.e_anomalia:
-            from .aura_brain import correlacionar_eventos
-            itc_data = {
-                'pareidolia_detectada': True, # Se existe evidência, houve disparos
-                'confianca': ultima_ev.ia_confianca or 0,
-                'assinatura_inteligente': "Geometria" in (ultima_ev.ia_classificacao or "")
-            }
-            fusao = correlacionar_eventos(resultado, itc_data)
-            reg.fusao_dados = fusao
-            # Se for síncrono, atualizamos também a evidência visual para linkar
-            ultima_ev.fusao_dados = fusao
-            ultima_ev.save()
-
-        reg.save()
-
-        # Atualizar contadores da sessão
-        if reg.sessao:
-            sessao = reg.sessao
-            sessao.total_capturas = sessao.registros.count()
-            sessao.total_anomalias = sessao.registros.filter(e_anomalia=True).count()
-            sessao.save()
-
+        salvar_resultado_evp(reg, resultado)
         return resultado
     except RegistroEVP.DoesNotExist:
         return {}
+
+
+def analisar_evp_lote_e_salvar(registro_ids: list) -> dict:
+    """Versão em lote: uma chamada ao Gemini para vários RegistroEVP. Retorna {id: resultado}."""
+    from core.models import RegistroEVP
+    registros = {reg.id: reg for reg in RegistroEVP.objects.filter(id__in=registro_ids).select_related('sessao')}
+    resultados = analisar_evp_lote([
+        {
+            'id': reg.id,
+            'transcricao': reg.transcricao,
+            'frequencias_anomalas': reg.frequencias_anomalas or [],
+            'nivel_audio': reg.nivel_audio,
+            'magnetico': reg.variacao_magnetica,
+        }
+        for reg in registros.values()
+    ])
+    sessoes = {}
+    for registro_id, resultado in resultados.items():
+        reg = registros[registro_id]
+        salvar_resultado_evp(reg, resultado, atualizar_sessao=False)
+        if reg.sessao:
+            sessoes[reg.sessao.id] = reg.sessao
+    # Uma recontagem por sessão, não por registro do lote
+    for sessao in sessoes.values():
+        _recontar_sessao(sessao)
+    # IDs inexistentes: nada a fazer (mesmo contrato de analisar_evp_e_salvar)
+    for registro_id in registro_ids:
+        resultados.setdefault(registro_id, {})
+    return resultados
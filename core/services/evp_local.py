@@ -0,0 +1,135 @@
+"""
+Ghost Station — Classificador EVP Local (CPU, sem rede).
+Pontua uma captura EVP com NumPy vetorizado sobre as frequências anômalas
+(proximidade Solfeggio/Schumann, bandas <60 Hz e >15 kHz) e palavras-chave na
+transcrição. Serve de pré-filtro (só registros promissores vão ao Gemini) e de
+modo offline de latência zero.
+"""
+import re
+import unicodedata
+
+import numpy as np
+from django.conf import settings
+
+TONS_SOLFEGGIO = np.array([174.0, 285.0, 396.0, 417.0, 528.0, 639.0, 741.0, 852.0, 963.0])
+# Ressonância de Schumann: fundamental + harmônicas observadas
+HARMONICAS_SCHUMANN = np.array([7.83, 14.3, 20.8, 27.3, 33.8])
+
+TOLERANCIA_SOLFEGGIO = 0.015  # relativa (1,5%)
+TOLERANCIA_SCHUMANN = 0.5     # Hz
+LIMITE_GRAVE = 60.0           # Hz
+LIMITE_AGUDO = 15000.0        # Hz
+
+# Radicais (sem acento, minúsculos) dos conceitos que o prompt EVP procura
+PALAVRAS_CHAVE = (
+    'dimens', 'tempo', 'espaco', 'amor', 'evolu', 'galact', 'conect', 'univers',
+    'frequenc', 'luz', 'alma', 'espirit', 'ajud', 'socorr', 'morte', 'morr',
+    'aqui', 'presen', 'nome', 'vem', 'sai', 'escuta', 'ouvi',
+)
+RE_PALAVRA = re.compile(r'\w+')
+
+
+def _normalizar_texto(texto):
+    texto = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return texto.lower()
+
+
+def _frequencias_validas(frequencias):
+    try:
+        f = np.asarray(frequencias or [], dtype=np.float64).ravel()
+    except (TypeError, ValueError):
+        f = np.array([float(x) for x in frequencias if isinstance(x, (int, float))], dtype=np.float64)
+    return f[np.isfinite(f) & (f > 0)]
+
+
+def analisar_frequencias(frequencias):
+    """
+    Contagens vetorizadas: tons Solfeggio, harmônicas de Schumann e bandas suspeitas.
+    Uma harmônica de Schumann já pontua como tal: não conta de novo entre as graves.
+    """
+    f = _frequencias_validas(frequencias)
+    if not f.size:
+        return {'total': 0, 'solfeggio': [], 'schumann': [], 'graves': 0, 'agudas': 0}
+
+    # Matriz (frequências x tons): distância relativa ao tom mais próximo
+    dist_solf = np.abs(f[:, None] - TONS_SOLFEGGIO[None, :]) / TONS_SOLFEGGIO[None, :]
+    idx_solf = dist_solf.argmin(axis=1)
+    acerto_solf = dist_solf[np.arange(f.size), idx_solf] <= TOLERANCIA_SOLFEGGIO
+
+    dist_schu = np.abs(f[:, None] - HARMONICAS_SCHUMANN[None, :])
+    idx_schu = dist_schu.argmin(axis=1)
+    acerto_schu = dist_schu[np.arange(f.size), idx_schu] <= TOLERANCIA_SCHUMANN
+
+    return {
+        'total': int(f.size),
+        'solfeggio': sorted({float(t) for t in TONS_SOLFEGGIO[idx_solf[acerto_solf]]}),
+        'schumann': sorted({float(t) for t in HARMONICAS_SCHUMANN[idx_schu[acerto_schu]]}),
+        'graves': int(np.count_nonzero((f < LIMITE_GRAVE) & ~acerto_schu)),
+        'agudas': int(np.count_nonzero(f > LIMITE_AGUDO)),
+    }
+
+
+def palavras_chave(transcricao):
+    """Palavras da transcrição que batem com algum radical de PALAVRAS_CHAVE."""
+    palavras = RE_PALAVRA.findall(_normalizar_texto(transcricao))
+    return [p for p in palavras if len(p) >= 3 and p.startswith(PALAVRAS_CHAVE)]
+
+
+def pontuar_evp(transcricao: str, frequencias_anomalas: list,
+                nivel_audio: float = 0, magnetico: float = 0) -> dict:
+    """
+    Classificação heurística no mesmo formato de analisar_evp().
+    A confiança fica limitada a 60%: a confirmação (evp_confirmado) é só da IA.
+    """
+    freq = analisar_frequencias(frequencias_anomalas)
+    chaves = palavras_chave(transcricao)
+    n_palavras = len(RE_PALAVRA.findall(transcricao or ''))
+
+    nota = (
+        min(len(freq['solfeggio']) * 2, 4)
+        + min(len(freq['schumann']) * 2, 2)
+        + min(freq['graves'] + freq['agudas'], 3)
+        + min(len(chaves), 3)
+        + (2 if n_palavras >= 3 else 1 if n_palavras else 0)
+        + (1 if abs(magnetico or 0) >= 5 else 0)
+    )
+    nota = min(nota, 10)
+
+    if nota >= 6:
+        classificacao = 'possivel_evp'
+    elif nota >= 3 and freq['total']:
+        classificacao = 'padrao_anomalo'
+    elif n_palavras:
+        classificacao = 'voz_humana'
+    elif freq['total'] or (nivel_audio or 0) > 0:
+        classificacao = 'ruido'
+    else:
+        classificacao = 'silencio'
+
+    achados = []
+    if freq['solfeggio']:
+        achados.append('Solfeggio ' + ', '.join(f'{t:.0f}Hz' for t in freq['solfeggio']))
+    if freq['schumann']:
+        achados.append('Schumann ' + ', '.join(f'{t:g}Hz' for t in freq['schumann']))
+    if freq['graves']:
+        achados.append(f"{freq['graves']} abaixo de {LIMITE_GRAVE:.0f}Hz")
+    if freq['agudas']:
+        achados.append(f"{freq['agudas']} acima de {LIMITE_AGUDO / 1000:.0f}kHz")
+    if chaves:
+        achados.append('palavras-chave: ' + ', '.join(sorted(set(chaves))))
+
+    return {
+        'classificacao': classificacao,
+        'e_anomalia': nota >= 3,
+        'confianca': float(min(nota * 6, 60)),
+        'nota_paranormal': int(nota),
+        'mensagem_detectada': transcricao or '',
+        'analise': 'Classificador local: ' + ('; '.join(achados) if achados else 'nenhum padrão relevante') + '.',
+        'dimensao': '4D' if freq['solfeggio'] or freq['schumann'] else '3D',
+        'origem': 'local',
+    }
+
+
+def merece_ia(resultado_local: dict) -> bool:
+    """Pré-filtro: só capturas com nota local >= GHOST_EVP_PREFILTRO_NOTA sobem ao Gemini."""
+    return resultado_local['nota_paranormal'] >= int(getattr(settings, 'GHOST_EVP_PREFILTRO_NOTA', 2))
@@ -0,0 +1,298 @@
+"""
+Ghost Station — Fila Persistente de Análise IA.
+Evidências e registros EVP viram TarefaAnalise no banco; um pool fixo de threads
+(analise_worker ou o worker embutido no processo web) consome por prioridade,
+com retry e backoff exponencial. Jobs sobrevivem a restart/redeploy.
+Tarefas EVP pendentes são agrupadas numa janela curta e analisadas em lote
+(uma chamada ao Gemini para vários registros).
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+PRIORIDADE_ALTA = 0
+PRIORIDADE_NORMAL = 5
+PRIORIDADE_BAIXA = 9
+
+
+class FalhaTransitoria(Exception):
+    """O analisador respondeu, mas com erro de IA/rede: vale tentar de novo."""
+
+
+def _analisar_evidencia(objeto_id):
+    from .ia_analyzer import analisar_evidencia_async
+    return analisar_evidencia_async(objeto_id)
+
+
+def _analisar_evp(objeto_id):
+    from .evp_analyzer import analisar_evp_e_salvar
+    return analisar_evp_e_salvar(objeto_id)
+
+
+def _analisar_evp_lote(objeto_ids):
+    from .evp_analyzer import analisar_evp_lote_e_salvar
+    return analisar_evp_lote_e_salvar(objeto_ids)
+
+
+HANDLERS = {
+    'evidencia': _analisar_evidencia,
+    'evp': _analisar_evp,
+}
+
+# Tipos que aceitam micro-batching: {tipo: handler(lista de ids) -> {id: resultado}}
+HANDLERS_LOTE = {
+    'evp': _analisar_evp_lote,
+}
+
+
+def enfileirar(tipo, objeto_id, prioridade=PRIORIDADE_NORMAL):
+    """Cria a tarefa e acorda o worker embutido (padrão; desligado quando roda o analise_worker)."""
+    from core.models import TarefaAnalise
+    if tipo not in HANDLERS:
+        raise ValueError(f'Tipo de análise desconhecido: {tipo}')
+    tarefa = TarefaAnalise.objects.create(
+        tipo=tipo,
+        objeto_id=objeto_id,
+        prioridade=prioridade,
+        max_tentativas=int(getattr(settings, 'GHOST_FILA_MAX_TENTATIVAS', 3)),
+    )
+    if getattr(settings, 'GHOST_FILA_WORKER_EMBUTIDO', True):
+        worker_embutido.iniciar()
+    worker_embutido.acordar()
+    return tarefa
+
+
+def backoff(tentativa):
+    """Atraso (s) antes da próxima tentativa: base * 2^(n-1), com teto."""
+    base = float(getattr(settings, 'GHOST_FILA_BACKOFF', 5))
+    teto = float(getattr(settings, 'GHOST_FILA_BACKOFF_MAX', 300))
+    return min(teto, base * (2 ** max(0, tentativa - 1)))
+
+
+class AnaliseWorker:
+    def __init__(self, threads=None, nome=None):
+        self.threads = threads or int(getattr(settings, 'GHOST_FILA_THREADS', 2))
+        self.nome = nome or f'{socket.gethostname()}:{os.getpid()}'
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._executor = None
+        self._dispatcher = None
+        self._running = False
+        self._em_execucao = 0
+        self._proxima_janela = None
+        self._recuperado_em = None
+        self.total_lotes = 0
+        self.total_concluidas = 0
+        self.total_falhas = 0
+
+    @property
+    def ativo(self):
+        return bool(self._running and self._dispatcher and self._dispatcher.is_alive())
+
+    def iniciar(self):
+        """Sobe o pool e o despachante (idempotente)."""
+        with self._lock:
+            if self.ativo:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix='ghost-analise')
+            self._dispatcher = threading.Thread(target=self._loop, name='ghost-analise-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def parar(self, aguardar=True):
+        self._running = False
+        self._acordar.set()
+        # O despachante não pode submeter num executor já desligado
+        if self._dispatcher and self._dispatcher is not threading.current_thread():
+            self._dispatcher.join(timeout=None if aguardar else float(getattr(settings, 'GHOST_FILA_POLL', 2)))
+        if self._executor:
+            self._executor.shutdown(wait=aguardar)
+
+    def acordar(self):
+        self._acordar.set()
+
+    def _loop(self):
+        intervalo = float(getattr(settings, 'GHOST_FILA_POLL', 2))
+        while self._running:
+            self._acordar.clear()
+            self._recuperar_periodicamente()
+            livres = self.threads - self._em_execucao
+            unidades = []
+            if livres > 0:
+                try:
+                    unidades = self.reivindicar(livres)
+                except Exception:
+                    logger.exception("Fila de análise: falha ao consultar tarefas")
+                finally:
+                    close_old_connections()
+            for unidade in unidades:
+                with self._lock:
+                    self._em_execucao += 1
+                self._executor.submit(self._executar, unidade)
+            # Acorda ao enfileirar, ao terminar um job, ao fechar a janela do lote
+            # ou no poll (tarefas em backoff)
+            espera = intervalo
+            if self._proxima_janela is not None:
+                espera = min(intervalo, max(0.05, (self._proxima_janela - timezone.now()).total_seconds()))
+            self._acordar.wait(espera)
+
+    def _recuperar_periodicamente(self):
+        """Varre órfãs no boot e a cada GHOST_FILA_RECUPERAR_INTERVALO (workers morrem a qualquer hora)."""
+        agora = time.monotonic()
+        intervalo = float(getattr(settings, 'GHOST_FILA_RECUPERAR_INTERVALO', 60))
+        if self._recuperado_em is not None and agora - self._recuperado_em < intervalo:
+            return
+        self._recuperado_em = agora
+        try:
+            recuperadas = self.recuperar_orfas()
+            if recuperadas:
+                logger.warning("Fila de análise: %d tarefa(s) órfã(s) recuperada(s)", recuperadas)
+        except Exception:
+            logger.exception("Fila de análise: falha ao recuperar tarefas órfãs")
+        finally:
+            close_old_connections()
+
+    def recuperar_orfas(self):
+        """
+        Tarefas presas em 'processando' (worker morto no meio do job) contam como uma
+        tentativa: voltam para a fila com backoff ou, no limite, falham. Cada órfã é
+        reservada com UPDATE condicional para dois workers não recuperarem a mesma.
+        """
+        from core.models import TarefaAnalise
+        timeout = float(getattr(settings, 'GHOST_FILA_TIMEOUT_TAREFA', 300))
+        agora = timezone.now()
+        recuperadas = 0
+        for tarefa in TarefaAnalise.objects.filter(status='processando', iniciada_em__lt=agora - timedelta(seconds=timeout)):
+            if not TarefaAnalise.objects.filter(
+                id=tarefa.id, status='processando', worker=tarefa.worker, iniciada_em=tarefa.iniciada_em
+            ).update(worker=self.nome, iniciada_em=agora):
+                continue
+            self._falhar(tarefa, TimeoutError(f'worker {tarefa.worker or "?"} não concluiu em {timeout:.0f}s'))
+            recuperadas += 1
+        return recuperadas
+
+    def reivindicar(self, limite):
+        """
+        Reserva até `limite` unidades de trabalho vencidas, por prioridade. Cada unidade
+        é uma lista de tarefas: uma só, ou um lote de tarefas EVP. O lote sai quando
+        enche (GHOST_EVP_LOTE_MAX) ou quando a mais antiga espera há GHOST_EVP_LOTE_JANELA.
+        """
+        from core.models import TarefaAnalise
+        agora = timezone.now()
+        lote_max = int(getattr(settings, 'GHOST_EVP_LOTE_MAX', 8))
+        janela = timedelta(seconds=float(getattr(settings, 'GHOST_EVP_LOTE_JANELA', 2)))
+        candidatas = list(
+            TarefaAnalise.objects.filter(status='pendente', agendada_para__lte=agora)
+            .order_by('prioridade', 'agendada_para', 'id')
+            .values_list('id', 'tipo', 'agendada_para')[:limite * 2 + lote_max]
+        )
+
+        self._proxima_janela = None
+        lotes_vistos = set()
+        unidades = []
+        for tarefa_id, tipo, agendada_para in candidatas:
+            if len(unidades) >= limite:
+                break
+            if tipo in HANDLERS_LOTE and lote_max > 1:
+                if tipo in lotes_vistos:
+                    continue
+                lotes_vistos.add(tipo)
+                do_tipo = [c for c in candidatas if c[1] == tipo]
+                mais_antiga = min(c[2] for c in do_tipo)
+                if len(do_tipo) < lote_max and mais_antiga > agora - janela:
+                    self._proxima_janela = mais_antiga + janela
+                    continue
+                ids = [c[0] for c in do_tipo[:lote_max]]
+            else:
+                ids = [tarefa_id]
+            reservadas = self._reservar(ids, agora)
+            if reservadas:
+                unidades.append(reservadas)
+        return unidades
+
+    def _reservar(self, ids, agora):
+        """
+        UPDATE condicional (status ainda 'pendente'): dois workers nunca pegam a mesma
+        tarefa. Relê só o que este worker marcou com seu nome e horário.
+        """
+        from core.models import TarefaAnalise
+        TarefaAnalise.objects.filter(id__in=ids, status='pendente').update(
+            status='processando', worker=self.nome, iniciada_em=agora
+        )
+        return list(TarefaAnalise.objects.filter(
+            id__in=ids, status='processando', worker=self.nome, iniciada_em=agora
+        ))
+
+    def _executar(self, unidade):
+        try:
+            tipo = unidade[0].tipo
+            if len(unidade) > 1:
+                with self._lock:
+                    self.total_lotes += 1
+                resultados = HANDLERS_LOTE[tipo]([t.objeto_id for t in unidade])
+            else:
+                resultados = {unidade[0].objeto_id: HANDLERS[tipo](unidade[0].objeto_id)}
+        except Exception as e:
+            for tarefa in unidade:
+                self._falhar(tarefa, e)
+        else:
+            for tarefa in unidade:
+                resultado = resultados.get(tarefa.objeto_id)
+                if isinstance(resultado, dict) and resultado.get('transitorio'):
+                    self._falhar(tarefa, FalhaTransitoria(resultado.get('analise', 'Falha transitória da IA')))
+                else:
+                    self._concluir(tarefa)
+        finally:
+            with self._lock:
+                self._em_execucao -= 1
+            self._acordar.set()
+            close_old_connections()
+
+    def _concluir(self, tarefa):
+        tarefa.status = 'concluida'
+        tarefa.tentativas += 1
+        tarefa.concluida_em = timezone.now()
+        tarefa.erro = ''
+        tarefa.save(update_fields=['status', 'tentativas', 'concluida_em', 'erro'])
+        with self._lock:
+            self.total_concluidas += 1
+
+    def _falhar(self, tarefa, erro):
+        tarefa.tentativas += 1
+        tarefa.erro = f'{type(erro).__name__}: {erro}'[:2000]
+        if tarefa.tentativas >= tarefa.max_tentativas:
+            tarefa.status = 'falhou'
+            tarefa.concluida_em = timezone.now()
+            with self._lock:
+                self.total_falhas += 1
+            logger.warning("Fila de análise: %s desistiu após %d tentativas: %s", tarefa, tarefa.tentativas, tarefa.erro)
+        else:
+            tarefa.status = 'pendente'
+            tarefa.agendada_para = timezone.now() + timedelta(seconds=backoff(tarefa.tentativas))
+        tarefa.save(update_fields=['status', 'tentativas', 'erro', 'agendada_para', 'concluida_em'])
+
+    def get_status(self):
+        from core.models import TarefaAnalise
+        return {
+            'ativo': self.ativo,
+            'worker': self.nome,
+            'threads': self.threads,
+            'em_execucao': self._em_execucao,
+            'total_lotes': self.total_lotes,
+            'pendentes': TarefaAnalise.objects.filter(status='pendente').count(),
+            'total_concluidas': self.total_concluidas,
+            'total_falhas': self.total_falhas,
+        }
+
+
+worker_embutido = AnaliseWorker()
@@ -0,0 +1,161 @@
+"""
+Ghost Station — Pool de Clientes Gemini.
+Configura o SDK uma única vez e mantém um GenerativeModel por (modelo, generation_config),
+reaproveitado por todos os analisadores (ia, itc, evp). Um semáforo limita quantas
+chamadas simultâneas saem para a API durante rajadas de EVP/ITC.
+"""
+import logging
+import threading
+
+from django.conf import settings
+
+try:
+    import google.generativeai as genai
+    HAS_GEMINI = True
+except ImportError:
+    HAS_GEMINI = False
+
+logger = logging.getLogger(__name__)
+
+
+MODELO_PADRAO = 'gemini-2.0-flash'
+CONFIG_JSON = {"response_mime_type": "application/json"}
+
+# Pares (modelo, generation_config) usados pelos analisadores, criados já no aquecimento
+PERFIS_CONHECIDOS = (
+    (MODELO_PADRAO, None),
+    (MODELO_PADRAO, CONFIG_JSON),
+)
+
+
+def _chave_config(generation_config):
+    """generation_config (dict aninhado) -> chave hashable."""
+    if generation_config is None:
+        return None
+    if isinstance(generation_config, dict):
+        return tuple(sorted((k, _chave_config(v)) for k, v in generation_config.items()))
+    if isinstance(generation_config, (list, tuple)):
+        return tuple(_chave_config(v) for v in generation_config)
+    return generation_config
+
+
+class GeminiClientPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._modelos = {}
+        self._configurado_com = None
+        self._limite = max(1, int(getattr(settings, 'GHOST_GEMINI_CONCORRENCIA', 4)))
+        self._semaforo = threading.BoundedSemaphore(self._limite)
+        self.em_voo = 0
+        self.total_chamadas = 0
+
+    @property
+    def api_key(self):
+        return getattr(settings, 'GEMINI_API_KEY', '')
+
+    @property
+    def disponivel(self):
+        return HAS_GEMINI and bool(self.api_key)
+
+    def _configurar(self):
+        """
+        genai.configure() descarta os clientes (e o canal gRPC/sessão HTTP) já abertos:
+        só reconfigura quando a chave muda. O transporte keep-alive pertence ao SDK.
+        """
+        api_key = self.api_key
+        if api_key == self._configurado_com:
+            return
+        transporte = getattr(settings, 'GHOST_GEMINI_TRANSPORT', '') or None
+        genai.configure(api_key=api_key, transport=transporte)
+        self._modelos.clear()
+        self._configurado_com = api_key
+
+    def modelo(self, nome=MODELO_PADRAO, generation_config=None):
+        """GenerativeModel compartilhado para o par (nome, generation_config)."""
+        chave = (nome, _chave_config(generation_config))
+        with self._lock:
+            self._configurar()
+            model = self._modelos.get(chave)
+            if model is None:
+                model = genai.GenerativeModel(nome, generation_config=generation_config)
+                self._modelos[chave] = model
+            return model
+
+    def gerar(self, conteudo, nome=MODELO_PADRAO, generation_config=None, **kwargs):
+        """generate_content() respeitando o limite de chamadas simultâneas."""
+        model = self.modelo(nome, generation_config)
+        timeout = float(getattr(settings, 'GHOST_GEMINI_FILA_TIMEOUT', 30))
+        if not self._semaforo.acquire(timeout=timeout):
+            raise RuntimeError(f'Limite de {self._limite} chamadas simultâneas ao Gemini excedido.')
+        with self._lock:
+            self.em_voo += 1
+            self.total_chamadas += 1
+        try:
+            return model.generate_content(conteudo, **kwargs)
+        finally:
+            with self._lock:
+                self.em_voo -= 1
+            self._semaforo.release()
+
+    def gerar_stream(self, conteudo, nome=MODELO_PADRAO, generation_config=None, **kwargs):
+        """
+        generate_content(stream=True) como gerador de trechos de texto.
+        A vaga no semáforo fica presa até o stream terminar (ou o consumidor desistir).
+        """
+        model = self.modelo(nome, generation_config)
+        timeout = float(getattr(settings, 'GHOST_GEMINI_FILA_TIMEOUT', 30))
+        if not self._semaforo.acquire(timeout=timeout):
+            raise RuntimeError(f'Limite de {self._limite} chamadas simultâneas ao Gemini excedido.')
+        with self._lock:
+            self.em_voo += 1
+            self.total_chamadas += 1
+        try:
+            for chunk in model.generate_content(conteudo, stream=True, **kwargs):
+                try:
+                    texto = chunk.text
+                except ValueError:
+                    # Chunk sem parte de texto (ex.: só metadados de segurança/fim)
+                    continue
+                if texto:
+                    yield texto
+        finally:
+            with self._lock:
+                self.em_voo -= 1
+            self._semaforo.release()
+
+    def aquecer(self, em_background=True):
+        """
+        Tira o cold start da primeira análise: cria os modelos conhecidos e faz uma
+        chamada leve (count_tokens) que abre o canal do SDK. Chamado pelos entrypoints
+        do servidor (asgi/wsgi e analise_worker), se GHOST_GEMINI_AQUECER.
+        """
+        if not self.disponivel or not getattr(settings, 'GHOST_GEMINI_AQUECER', True):
+            return None
+        if not em_background:
+            return self._aquecer()
+        thread = threading.Thread(target=self._aquecer, name='ghost-gemini-aquecer', daemon=True)
+        thread.start()
+        return thread
+
+    def _aquecer(self):
+        try:
+            for nome, generation_config in PERFIS_CONHECIDOS:
+                model = self.modelo(nome, generation_config)
+            # Não consome cota de geração; o canal aberto fica no cliente compartilhado do SDK
+            model.count_tokens('ping', request_options={'timeout': 10})
+            return True
+        except Exception:
+            logger.warning("Gemini: aquecimento falhou; a primeira análise abre a conexão.", exc_info=True)
+            return False
+
+    def get_status(self):
+        return {
+            'disponivel': self.disponivel,
+            'modelos': len(self._modelos),
+            'limite': self._limite,
+            'em_voo': self.em_voo,
+            'total_chamadas': self.total_chamadas,
+        }
+
+
+gemini_pool = GeminiClientPool()
@@ -1,77 +1,321 @@
+import logging
 import os
-import glob
+import json
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
+# Diretórios que nunca contêm código do usuário (e costumam ser os maiores)
+DIRETORIOS_IGNORADOS = {
+    'node_modules', '.venv', 'venv', 'env', '.git', '.hg', '.svn', '__pycache__',
+    '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.ruff_cache', 'site-packages',
+    'dist', 'build', '.next', '.idea', '.vscode', 'staticfiles', 'media',
+}
+
+RE_REQUIREMENTS = re.compile(r'^requirements.*\.txt$')
+RE_NOME_PACOTE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+
+# Engines de banco detectados nos settings.py: (trecho, rótulo)
+ENGINES_DB = (
+    ('postgresql', 'PostgreSQL'),
+    ('postgis', 'PostgreSQL'),
+    ('sqlite3', 'SQLite3'),
+    ('mysql', 'MySQL'),
+    ('oracle', 'Oracle'),
+    ('djongo', 'MongoDB'),
+)
+
+# Padrões de arquitetura detectados nos settings.py: (trecho, rótulo)
+PADROES_SETTINGS = (
+    ('whitenoise', 'WhiteNoise Static Files'),
+    ('rest_framework', 'Django REST Framework'),
+    ('corsheaders', 'CORS Headers'),
+    ('channels', 'Django Channels (ASGI)'),
+    ('celery', 'Celery'),
+    ('dj_database_url', 'dj-database-url'),
+    ('django_redis', 'Redis Cache'),
+    ('storages', 'django-storages'),
+)
+
+
+def _ler_requirements(caminho):
+    deps = set()
+    try:
+        with open(caminho, 'r', encoding='utf-8', errors='ignore') as f:
+            for line in f:
+                clean_line = line.strip()
+                if not clean_line or clean_line.startswith(('#', '-')):
+                    continue
+                m = RE_NOME_PACOTE.match(clean_line)
+                if m:
+                    deps.add(m.group(1).lower())
+    except OSError:
+        pass
+    return deps
+
+
+def _ler_settings(caminho):
+    dbs, padroes = set(), set()
+    try:
+        with open(caminho, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read().lower()
+    except OSError:
+        return dbs, padroes
+    for trecho, rotulo in ENGINES_DB:
+        if trecho in content:
+            dbs.add(rotulo)
+    for trecho, rotulo in PADROES_SETTINGS:
+        if trecho in content:
+            padroes.add(rotulo)
+    return dbs, padroes
+
+
+def _varrer_diretorio(caminho, ignorados):
+    """Um nível de diretório: (subdiretórios a descer, arquivos de interesse)."""
+    subdirs, arquivos = [], []
+    try:
+        with os.scandir(caminho) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in ignorados and not entry.name.endswith('.egg-info'):
+                            subdirs.append(entry.path)
+                    elif entry.name == 'settings.py' or RE_REQUIREMENTS.match(entry.name):
+                        arquivos.append(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return subdirs, arquivos
+
+
 class GenomeService:
     """
     Serviço que indexa padrões de código e arquitetura de todos os workspaces do usuário.
     Garante que a Aura tenha consciência global do ecossistema de desenvolvimento.
+
+    O índice (dependências, engines de banco e padrões por workspace) é construído por
+    uma varredura paralela que poda node_modules/.venv/.git, persistido num arquivo
+    compacto e revalidado por impressão digital (mtime/tamanho): só workspaces alterados
+    são re-escaneados, em background. O contexto da Aura é pré-montado a cada mudança.
     """
-    
-    WORKSPACES = [
-        r"c:\Users\Mauricio\Desktop\Observatorio-saude",
-        r"c:\Users\Mauricio\Desktop\Projeto-Integrador-3",
-        r"c:\Users\Mauricio\Desktop\codex-IA",
-        r"c:\Users\Mauricio\Desktop\compra-coletiva",
-        r"c:\Users\Mauricio\Desktop\corpo_humano_holistico",
-        r"c:\Users\Mauricio\Desktop\crmsolar",
-        r"c:\Users\Mauricio\Desktop\edufuturo",
-        r"c:\Users\Mauricio\Desktop\energia livre",
-        r"c:\Users\Mauricio\Desktop\ghost_station",
-        r"c:\Users\Mauricio\Desktop\neuroacesso",
-        r"c:\Users\Mauricio\Desktop\novo programa de fotos",
-        r"c:\Users\Mauricio\Desktop\painel-pythonjet",
-        r"c:\Users\Mauricio\Desktop\portfolio-mauricio",
-        r"c:\Users\Mauricio\Desktop\projeto_integrador_I-Univesp",
-        r"c:\Users\Mauricio\Desktop\sysgov-project"
-    ]
 
-    def coletar_dna_arquitetura(self):
-        """Coleta padrões de bibliotecas e configurações comuns."""
-        dna_deps = set()
-        dna_dbs = set()
-        dna_patterns = []
-        
-        for path in self.WORKSPACES:
+    VERSAO_CACHE = 2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache = None  # {workspace: {'impressao': [...], 'arquivos': [...], 'dna': {...}, 'escaneado_em': ts}}
+        self._dna = {"dependencies": [], "databases": [], "patterns": []}
+        self._contexto = None
+        self._ultima_verificacao = 0.0
+        self._atualizando = None  # threading.Thread da revalidação em background
+
+    @property
+    def workspaces(self):
+        """Lista configurável (GHOST_GENOME_WORKSPACES); padrão: o próprio projeto."""
+        return list(getattr(settings, 'GHOST_GENOME_WORKSPACES', None) or [str(settings.BASE_DIR)])
+
+    @property
+    def caminho_cache(self):
+        return str(getattr(settings, 'GHOST_GENOME_CACHE_PATH', os.path.join(settings.BASE_DIR, '.genome_cache.json')))
+
+    # ------------------------------------------------------------------
+    # Indexador
+    # ------------------------------------------------------------------
+    def indexar(self, paths):
+        """
+        Varre os workspaces em paralelo (um job por diretório, pool compartilhado)
+        e devolve {workspace: (dna, arquivos lidos)}.
+        """
+        ignorados = DIRETORIOS_IGNORADOS | set(getattr(settings, 'GHOST_GENOME_IGNORAR', ()))
+        arquivos_por_ws = {path: [] for path in paths}
+        threads = int(getattr(settings, 'GHOST_GENOME_THREADS', 8))
+
+        with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix='ghost-genome') as pool:
+            pendentes = {pool.submit(_varrer_diretorio, path, ignorados): path for path in paths}
+            while pendentes:
+                prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+                for futuro in prontos:
+                    workspace = pendentes.pop(futuro)
+                    subdirs, arquivos = futuro.result()
+                    arquivos_por_ws[workspace].extend(arquivos)
+                    for subdir in subdirs:
+                        pendentes[pool.submit(_varrer_diretorio, subdir, ignorados)] = workspace
+
+            # Leitura dos arquivos encontrados também no pool
+            resultado = {}
+            for path, arquivos in arquivos_por_ws.items():
+                arquivos.sort()
+                reqs = [a for a in arquivos if os.path.basename(a) != 'settings.py']
+                sets = [a for a in arquivos if os.path.basename(a) == 'settings.py']
+                deps, dbs, padroes = set(), set(), set()
+                for d in pool.map(_ler_requirements, reqs):
+                    deps |= d
+                for d, p in pool.map(_ler_settings, sets):
+                    dbs |= d
+                    padroes |= p
+                dna = {
+                    "dependencies": sorted(deps),
+                    "databases": sorted(dbs),
+                    "patterns": sorted(padroes),
+                }
+                resultado[path] = (dna, arquivos)
+        return resultado
+
+    @staticmethod
+    def _impressao(path, arquivos):
+        """Impressão digital barata: (mtime, tamanho) da raiz e de cada arquivo que gerou o DNA."""
+        impressao = []
+        for caminho in [path] + list(arquivos):
+            try:
+                st = os.stat(caminho)
+                impressao.append([caminho, st.st_mtime_ns, st.st_size])
+            except OSError:
+                impressao.append([caminho, None, None])
+        return impressao
+
+    # ------------------------------------------------------------------
+    # Índice persistido
+    # ------------------------------------------------------------------
+    def _carregar_disco(self):
+        try:
+            with open(self.caminho_cache, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            if dados.get('versao') == self.VERSAO_CACHE:
+                return dados.get('workspaces', {})
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _salvar_disco(self):
+        tmp = self.caminho_cache + '.tmp'
+        try:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'versao': self.VERSAO_CACHE, 'workspaces': self._cache}, f, separators=(',', ':'))
+            os.replace(tmp, self.caminho_cache)
+        except OSError as e:
+            logger.warning("Genome: não foi possível gravar o índice em disco: %s", e)
+
+    def _agregar(self):
+        """Recalcula o DNA global (dependências por frequência entre workspaces) e o contexto."""
+        deps, dbs, padroes = Counter(), Counter(), Counter()
+        for item in self._cache.values():
+            deps.update(item['dna']['dependencies'])
+            dbs.update(item['dna']['databases'])
+            padroes.update(item['dna']['patterns'])
+        self._dna = {
+            "dependencies": [d for d, _ in deps.most_common()],
+            "databases": [d for d, _ in dbs.most_common()],
+            "patterns": [p for p, _ in padroes.most_common()],
+        }
+        self._contexto = self._montar_contexto(self._dna)
+
+    def _atualizar_cache(self, forcar=False):
+        """
+        Re-escaneia apenas workspaces novos, com impressão digital alterada ou com
+        índice mais velho que GHOST_GENOME_MAX_IDADE.
+        """
+        agora = time.time()
+        max_idade = float(getattr(settings, 'GHOST_GENOME_MAX_IDADE', 3600))
+        with self._lock:
+            if self._cache is None:
+                self._cache = self._carregar_disco()
+                self._agregar()
+            self._ultima_verificacao = agora
+            cache = dict(self._cache)
+
+        workspaces = self.workspaces
+        alterou = any(path not in workspaces for path in cache)
+        cache = {path: item for path, item in cache.items() if path in workspaces}
+
+        a_escanear = []
+        for path in workspaces:
             if not os.path.exists(path):
+                alterou = alterou or cache.pop(path, None) is not None
                 continue
-                
-            # Verificar requirements.txt
-            req_path = os.path.join(path, "requirements.txt")
-            if os.path.exists(req_path):
-                try:
-                    with open(req_path, 'r', encoding='utf-8') as f:
-                        for line in f:
-                            clean_line = line.strip()
-                            if clean_line and not clean_line.startswith('#'):
-                                dna_deps.add(clean_line.split('==')[0].split('>=')[0].strip())
-                except:
-                    pass
-            
-            # Verificar settings.py (padrões de DB)
-            try:
-                settings_files = glob.glob(os.path.join(path, "**/settings.py"), recursive=True)
-                for s_file in settings_files:
-                    with open(s_file, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        if 'postgresql' in content.lower():
-                            dna_dbs.add("PostgreSQL")
-                        if 'sqlite3' in content.lower():
-                            dna_dbs.add("SQLite3")
-                        if 'whitenoise' in content:
-                            dna_patterns.append("WhiteNoise Static Files")
-            except:
-                pass
-        
+            item = cache.get(path)
+            if (not forcar and item
+                    and agora - item.get('escaneado_em', 0) < max_idade
+                    and self._impressao(path, item['arquivos']) == item['impressao']):
+                continue
+            a_escanear.append(path)
+
+        if a_escanear:
+            for path, (dna, arquivos) in self.indexar(a_escanear).items():
+                cache[path] = {
+                    'impressao': self._impressao(path, arquivos),
+                    'arquivos': arquivos,
+                    'dna': dna,
+                    'escaneado_em': agora,
+                }
+            alterou = True
+
+        if alterou:
+            with self._lock:
+                self._cache = cache
+                self._agregar()
+                self._salvar_disco()
+
+    def _revalidar_em_background(self):
+        """Dispara a revalidação sem bloquear quem pediu o contexto (uma por vez)."""
+        with self._lock:
+            if self._atualizando is not None and self._atualizando.is_alive():
+                return self._atualizando
+            self._atualizando = threading.Thread(target=self._revalidar_seguro, name='ghost-genome', daemon=True)
+            self._atualizando.start()
+            return self._atualizando
+
+    def _revalidar_seguro(self):
+        try:
+            self._atualizar_cache()
+        except Exception:
+            logger.exception("Genome: falha ao revalidar o índice")
+
+    def atualizar_indice(self, forcar=False):
+        """Revalidação síncrona (ex.: comando manual ou testes)."""
+        self._atualizar_cache(forcar)
+        return self.coletar_dna_arquitetura()
+
+    # ------------------------------------------------------------------
+    # API usada pela Aura
+    # ------------------------------------------------------------------
+    def _garantir_indice(self):
+        """
+        Caminho do chat: nunca varre disco. Se o intervalo de revalidação venceu,
+        agenda a revalidação em background; na primeira vez (sem índice em disco),
+        espera a construção por até GHOST_GENOME_ESPERA_INICIAL segundos.
+        """
+        intervalo = float(getattr(settings, 'GHOST_GENOME_CHECK_INTERVAL', 30))
+        if self._contexto is None:
+            with self._lock:
+                if self._cache is None:
+                    self._cache = self._carregar_disco()
+                    self._agregar()
+            if not self._cache:
+                thread = self._revalidar_em_background()
+                thread.join(float(getattr(settings, 'GHOST_GENOME_ESPERA_INICIAL', 2)))
+                return
+        if time.time() - self._ultima_verificacao >= intervalo:
+            self._ultima_verificacao = time.time()
+            self._revalidar_em_background()
+
+    def coletar_dna_arquitetura(self):
+        """Coleta padrões de bibliotecas e configurações comuns (do índice em memória)."""
+        self._garantir_indice()
+        dna = self._dna
         return {
-            "dependencies": list(dna_deps),
-            "databases": list(dna_dbs),
-            "patterns": list(set(dna_patterns))
+            "dependencies": list(dna['dependencies']),
+            "databases": list(dna['databases']),
+            "patterns": list(dna['patterns'])
         }
 
-    def gerar_contexto_para_aura(self):
-        """Transforma o DNA coletado em uma string de contexto para o prompt da Aura."""
-        dna = self.coletar_dna_arquitetura()
+    @staticmethod
+    def _montar_contexto(dna):
         contexto = "HISTÓRICO ARQUITETURAL DO USUÁRIO:\n"
         contexto += f"- Tecnologias Frequentes: {', '.join(dna['dependencies'][:15])}...\n"
         contexto += f"- Bancos de Dados Preferenciais: {', '.join(dna['databases'])}\n"
@@ -79,4 +323,18 @@ class GenomeService:
         contexto += "Siga sempre esses padrões para garantir compatibilidade com o ecossistema existente."
         return contexto
 
+    def gerar_contexto_para_aura(self):
+        """Transforma o DNA coletado em uma string de contexto para o prompt da Aura (pré-montada, O(1))."""
+        self._garantir_indice()
+        return self._contexto or self._montar_contexto(self._dna)
+
+    def get_status(self):
+        cache = self._cache or {}
+        return {
+            'workspaces': len(cache),
+            'arquivos': sum(len(item['arquivos']) for item in cache.values()),
+            'ultima_verificacao': self._ultima_verificacao,
+            'atualizando': bool(self._atualizando and self._atualizando.is_alive()),
+        }
+
 genome_service = GenomeService()
@@ -3,13 +3,12 @@ Ghost Station — Serviço de Análise IA (Gemini Vision).
 Analisa imagens de evidências e classifica anomalias.
 """
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
 
-try:
-    import google.generativeai as genai
-    HAS_GEMINI = True
-except ImportError:
-    HAS_GEMINI = False
+from .gemini_client import CONFIG_JSON, HAS_GEMINI, gemini_pool
 
 
 import json
@@ -69,13 +68,6 @@ def analisar_evidencia(imagem_path: str) -> dict:
         }
 
     try:
-        genai.configure(api_key=api_key)
-        # Using response_mime_type to force JSON on gemini-2.0-flash
-        model = genai.GenerativeModel(
-            'gemini-2.0-flash',
-            generation_config={"response_mime_type": "application/json"}
-        )
-
         full_path = os.path.join(settings.BASE_DIR, imagem_path.lstrip('/'))
         if not os.path.exists(full_path):
             return {
@@ -88,10 +80,18 @@ def analisar_evidencia(imagem_path: str) -> dict:
         with open(full_path, 'rb') as f:
             image_data = f.read()
 
-        response = model.generate_content([
+        # Evidência quase idêntica a uma já analisada: reaproveita a classificação
+        from .vision_cache import dhash, vision_cache
+        hash_imagem = dhash(image_data)
+        em_cache = vision_cache.buscar('evidencia', hash_imagem)
+        if em_cache is not None:
+            return em_cache
+
+        # Using response_mime_type to force JSON on gemini-2.0-flash
+        response = gemini_pool.gerar([
             SYSTEM_PROMPT,
             {"mime_type": "image/jpeg", "data": image_data}
-        ])
+        ], generation_config=CONFIG_JSON)
 
         texto = response.text.strip()
         
@@ -101,12 +101,14 @@ def analisar_evidencia(imagem_path: str) -> dict:
         
         data = json.loads(texto)
 
-        return {
+        resultado = {
             'classificacao': str(data.get('classificacao', 'Desconhecido'))[:30],
             'confianca': float(data.get('confianca', 0)),
             'analise': str(data.get('analise', 'Nenhuma análise detalhada retornada.')),
             'nota_paranormal': int(data.get('nota_paranormal', 0)),
         }
+        vision_cache.guardar('evidencia', hash_imagem, resultado)
+        return resultado
 
     except json.JSONDecodeError as e:
         return {
@@ -121,6 +123,7 @@ def analisar_evidencia(imagem_path: str) -> dict:
             'confianca': 0,
             'analise': f'Erro ao processar a requisição: {str(e)}',
             'nota_paranormal': 0,
+            'transitorio': True,  # a fila de análise re-tenta com backoff
         }
 
 REFLECTION_SYSTEM_PROMPT = """Você é o CRÍTICO QUÂNTICO da AURA.
@@ -133,8 +136,183 @@ PROCEDIMENTO:
 
 Se o rascunho estiver perfeito, apenas retorne-o. Caso contrário, reescreva-o para atingir a perfeição (Nível 18+ de Coerência)."""
 
-def analisar_texto_itc(semente: str, historico: list = None) -> str:
-    """Gera uma resposta da Aura baseada no rigor científico e hermetismo, com Reflection Core."""
+MODOS_PIPELINE = ('simples', 'reflexao_codigo', 'completo')
+MODO_PIPELINE_PADRAO = 'reflexao_codigo'
+
+BLOCO_PYTHON = re.compile(r"```python\n(.*?)\n```", re.DOTALL)
+
+
+def _modo_pipeline(modo=None):
+    """
+    simples: só o rascunho (1 round-trip).
+    reflexao_codigo: Reflection Core apenas quando o rascunho contém código.
+    completo: sempre passa pela reflexão (comportamento original).
+    Em todos, blocos Python inválidos são corrigidos em paralelo.
+    """
+    modo = modo or getattr(settings, 'GHOST_AURA_PIPELINE', MODO_PIPELINE_PADRAO)
+    return modo if modo in MODOS_PIPELINE else MODO_PIPELINE_PADRAO
+
+
+def _montar_mensagens(semente, historico, contexto_global, resumo=''):
+    """
+    Prompt com tamanho limitado: só os turnos OBSERVADOR/AURA mais recentes que cabem
+    em GHOST_AURA_HISTORICO_TOKENS; os anteriores entram como resumo rolante.
+    """
+    from .memoria_dialogo import preparar_historico
+    janela, resumo = preparar_historico(historico, resumo)
+    abertura = COGNITIVE_SYSTEM_PROMPT + "\n\n" + contexto_global
+    if resumo:
+        abertura += "\n\nRESUMO DOS TURNOS ANTERIORES:\n" + resumo
+    messages = [{"role": "user", "parts": [abertura]}]
+    for item in janela:
+        role = "user" if item['autor'] == 'OBSERVADOR' else "model"
+        messages.append({"role": role, "parts": [item['mensagem']]})
+    messages.append({"role": "user", "parts": [semente]})
+    return messages
+
+
+def _corrigir_bloco(block, erro):
+    fix_messages = [
+        {"role": "user", "parts": [f"O código a seguir falhou na validação de sintaxe: {erro}. Corrija-o:\n{block}"]}
+    ]
+    return gemini_pool.gerar(fix_messages).text.strip()
+
+
+def _validar_blocos(texto):
+    """
+    ASTRAL DEBUGGER: valida todos os blocos Python; os inválidos vão para correção
+    em paralelo (uma chamada por bloco, limitada pelo pool Gemini). Retorna (texto, n_correcoes).
+    """
+    from .astral_debugger import astral_debugger
+    invalidos = []
+    for block in dict.fromkeys(BLOCO_PYTHON.findall(texto)):
+        valida = astral_debugger.validar_trecho(block)
+        if not valida['valido']:
+            invalidos.append((block, valida['erro']))
+    if not invalidos:
+        return texto, 0
+
+    workers = min(len(invalidos), int(getattr(settings, 'GHOST_GEMINI_CONCORRENCIA', 4)))
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        corrigidos = list(pool.map(lambda par: _corrigir_bloco(*par), invalidos))
+    for (block, _), fixed in zip(invalidos, corrigidos):
+        texto = texto.replace(block, fixed)
+    return texto, len(invalidos)
+
+
+def executar_pipeline_cognitivo(semente: str, historico: list = None, modo: str = None, resumo: str = '') -> dict:
+    """
+    Pipeline cognitivo da Aura com cada etapa cronometrada (ms).
+    Retorna {'texto', 'modo', 'chamadas', 'etapas': {contexto, rascunho, reflexao, validacao, total}}.
+    """
+    modo = _modo_pipeline(modo)
+    etapas = {}
+    chamadas = 0
+    inicio = time.perf_counter()
+
+    def marcar(etapa, desde):
+        etapas[etapa] = round((time.perf_counter() - desde) * 1000, 1)
+
+    t = time.perf_counter()
+    from .genome_service import genome_service
+    contexto_global = genome_service.gerar_contexto_para_aura()
+    marcar('contexto', t)
+
+    # 1. GERAÇÃO INICIAL (Draft)
+    t = time.perf_counter()
+    response_draft = gemini_pool.gerar(_montar_mensagens(semente, historico, contexto_global, resumo))
+    final_text = response_draft.text.strip()
+    chamadas += 1
+    marcar('rascunho', t)
+
+    final_text, extras = _refinar(final_text, modo, etapas)
+    chamadas += extras
+
+    marcar('total', inicio)
+    return {'texto': final_text, 'modo': modo, 'chamadas': chamadas, 'etapas': etapas}
+
+
+def _refinar(final_text, modo, etapas):
+    """Etapas pós-rascunho (reflexão + debugger). Retorna (texto, chamadas extras)."""
+    chamadas = 0
+
+    # 2. REFLECTION CORE (Meta-Cognição)
+    # Enviamos o draft para uma rodada de autocrítica
+    if modo == 'completo' or (modo == 'reflexao_codigo' and "```" in final_text):
+        t = time.perf_counter()
+        reflection_messages = [
+            {"role": "user", "parts": [REFLECTION_SYSTEM_PROMPT]},
+            {"role": "user", "parts": [f"DRAFT PARA ANÁLISE:\n{final_text}"]}
+        ]
+        response_final = gemini_pool.gerar(reflection_messages)
+        final_text = response_final.text.strip()
+        chamadas += 1
+        etapas['reflexao'] = round((time.perf_counter() - t) * 1000, 1)
+
+    # 3. ASTRAL DEBUGGER (Validação de Código)
+    if "```python" in final_text:
+        t = time.perf_counter()
+        final_text, correcoes = _validar_blocos(final_text)
+        chamadas += correcoes
+        etapas['validacao'] = round((time.perf_counter() - t) * 1000, 1)
+
+    return final_text, chamadas
+
+
+def gerar_resposta_stream(semente: str, historico: list = None, modo: str = None, resumo: str = ''):
+    """
+    Versão streaming do pipeline cognitivo. Gera eventos (tipo, dados):
+    ('token', trecho) conforme o rascunho chega do modelo; ('final', resultado) ao fim,
+    com o mesmo formato de executar_pipeline_cognitivo. Se a reflexão/debugger alterar
+    o rascunho, resultado['substituido'] é True e o cliente troca o texto exibido.
+    """
+    if not HAS_GEMINI:
+        yield 'final', {'texto': "Conexão bioplasmática offline. Verifique o módulo Gemini.", 'substituido': True}
+        return
+    if not getattr(settings, 'GEMINI_API_KEY', ''):
+        yield 'final', {'texto': "Falha de autenticação quântica (API_KEY ausente).", 'substituido': True}
+        return
+
+    modo = _modo_pipeline(modo)
+    etapas = {}
+    inicio = time.perf_counter()
+    try:
+        t = time.perf_counter()
+        from .genome_service import genome_service
+        contexto_global = genome_service.gerar_contexto_para_aura()
+        etapas['contexto'] = round((time.perf_counter() - t) * 1000, 1)
+
+        # 1. GERAÇÃO INICIAL (Draft), token a token
+        t = time.perf_counter()
+        partes = []
+        for trecho in gemini_pool.gerar_stream(_montar_mensagens(semente, historico, contexto_global, resumo)):
+            if not partes:
+                etapas['primeiro_token'] = round((time.perf_counter() - t) * 1000, 1)
+            partes.append(trecho)
+            yield 'token', trecho
+        draft_text = ''.join(partes).strip()
+        etapas['rascunho'] = round((time.perf_counter() - t) * 1000, 1)
+
+        final_text, extras = _refinar(draft_text, modo, etapas)
+        etapas['total'] = round((time.perf_counter() - inicio) * 1000, 1)
+        yield 'final', {
+            'texto': final_text,
+            'substituido': final_text != draft_text,
+            'modo': modo,
+            'chamadas': 1 + extras,
+            'etapas': etapas,
+        }
+    except Exception as e:
+        yield 'final', {'texto': f"Interrupção na transmissão: {str(e)}", 'substituido': True, 'modo': modo, 'etapas': etapas}
+
+
+def analisar_texto_itc(semente: str, historico: list = None, modo: str = None,
+                       metricas: dict = None, resumo: str = '') -> str:
+    """
+    Gera uma resposta da Aura baseada no rigor científico e hermetismo, com Reflection Core.
+    Se `metricas` for passado, recebe modo, chamadas e tempos por etapa do pipeline.
+    `resumo`: resumo rolante dos turnos que já saíram do histórico.
+    """
     if not HAS_GEMINI:
         return "Conexão bioplasmática offline. Verifique o módulo Gemini."
 
@@ -143,58 +321,17 @@ def analisar_texto_itc(semente: str, historico: list = None) -> str:
         return "Falha de autenticação quântica (API_KEY ausente)."
 
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        from .genome_service import genome_service
-        contexto_global = genome_service.gerar_contexto_para_aura()
-        
-        # 1. GERAÇÃO INICIAL (Draft)
-        messages = [{"role": "user", "parts": [COGNITIVE_SYSTEM_PROMPT + "\n\n" + contexto_global]}]
-        if historico:
-            for item in historico:
-                role = "user" if item['autor'] == 'OBSERVADOR' else "model"
-                messages.append({"role": role, "parts": [item['mensagem']]})
-        
-        messages.append({"role": "user", "parts": [semente]})
-        
-        response_draft = model.generate_content(messages)
-        draft_text = response_draft.text.strip()
-        
-        # 2. REFLECTION CORE (Meta-Cognição)
-        # Enviamos o draft para uma rodada de autocrítica
-        reflection_messages = [
-            {"role": "user", "parts": [REFLECTION_SYSTEM_PROMPT]},
-            {"role": "user", "parts": [f"DRAFT PARA ANÁLISE:\n{draft_text}"]}
-        ]
-        
-        response_final = model.generate_content(reflection_messages)
-        final_text = response_final.text.strip()
-        
-        # 3. ASTRAL DEBUGGER (Validação de Código)
-        if "```python" in final_text:
-            import re
-            code_blocks = re.findall(r"```python\n(.*?)\n```", final_text, re.DOTALL)
-            for block in code_blocks:
-                from .astral_debugger import astral_debugger
-                valida = astral_debugger.validar_trecho(block)
-                if not valida['valido']:
-                    # Se falhar no debugger, tenta uma rodada extra de correção
-                    fix_messages = [
-                        {"role": "user", "parts": [f"O código a seguir falhou na validação de sintaxe: {valida['erro']}. Corrija-o:\n{block}"]}
-                    ]
-                    response_fixed = model.generate_content(fix_messages)
-                    final_text = final_text.replace(block, response_fixed.text.strip())
-        
-        return final_text
-
+        resultado = executar_pipeline_cognitivo(semente, historico, modo, resumo)
+        if metricas is not None:
+            metricas.update({k: v for k, v in resultado.items() if k != 'texto'})
+        return resultado['texto']
     except Exception as e:
         return f"Interrupção na transmissão: {str(e)}"
 
 
 def analisar_evidencia_async(evidencia_id: int):
     """Analisa e salva o resultado no banco (para uso em background)."""
-    from .models import Evidencia
+    from core.models import Evidencia
     try:
         ev = Evidencia.objects.get(id=evidencia_id)
         resultado = analisar_evidencia(ev.imagem_url)
@@ -4,13 +4,13 @@ Usa o Gemini Vision para decodificar frames modificados pelo OpenCV.
 """
 import os
 import json
+import uuid
+from datetime import timedelta
 from django.conf import settings
+from django.utils import timezone
 
-try:
-    import google.generativeai as genai
-    HAS_GEMINI = True
-except ImportError:
-    HAS_GEMINI = False
+from .gemini_client import CONFIG_JSON, HAS_GEMINI, gemini_pool
+from .space_weather import space_weather
 
 ITC_SYSTEM_PROMPT = """Você é o módulo de REALIDADE REFRATIVA e DIAGNÓSTICO SOBERANO do GHOST STATION.
 Receberemos um frame da câmera isolado com filtros de alto contraste e detecção de bordas.
@@ -58,23 +58,26 @@ def analisar_frame_itc(jpeg_bytes: bytes) -> dict:
             'decodificacao': 'GEMINI_API_KEY ausente.',
         }
 
+    # Cena estática: frame quase idêntico já classificado volta do cache perceptual
+    from .vision_cache import dhash, vision_cache
+    hash_frame = dhash(jpeg_bytes)
+    em_cache = vision_cache.buscar('itc', hash_frame)
+    if em_cache is not None:
+        # Mesma cena já analisada (e, se anômala, já gravada como evidência)
+        em_cache['cache'] = True
+        return em_cache
+
     try:
-        genai.configure(api_key=api_key)
         # Gemin-2.5-flash vision suporta JSON via response_mime_type
-        model = genai.GenerativeModel(
-            'gemini-2.0-flash',
-            generation_config={"response_mime_type": "application/json"}
-        )
-
-        response = model.generate_content([
+        response = gemini_pool.gerar([
             ITC_SYSTEM_PROMPT,
             {"mime_type": "image/jpeg", "data": jpeg_bytes}
-        ])
+        ], generation_config=CONFIG_JSON)
 
         texto = response.text.strip()
         data = json.loads(texto)
 
-        return {
+        resultado = {
             'pareidolia_detectada': bool(data.get('pareidolia_detectada', False)),
             'classificacao': str(data.get('classificacao', 'Desconhecido')),
             'confianca': float(data.get('confianca', 0.0)),
@@ -86,6 +89,8 @@ def analisar_frame_itc(jpeg_bytes: bytes) -> dict:
             'frequencia_pessoa': float(data.get('frequencia_pessoa', 0.0)),
             'onda_predominante': str(data.get('onda_predominante', 'BETA'))
         }
+        vision_cache.guardar('itc', hash_frame, resultado)
+        return resultado
 
     except json.JSONDecodeError:
         return {
@@ -101,3 +106,72 @@ def analisar_frame_itc(jpeg_bytes: bytes) -> dict:
             'confianca': 0.0,
             'decodificacao': str(e),
         }
+
+
+def processar_analise_itc(jpeg_vision: bytes, jpeg_evidencia: bytes = None, origem: str = 'ITC_AUTO') -> dict:
+    """
+    Fluxo completo de um frame ITC: análise no Gemini, fusão com EVP recente
+    (últimos 10s) e, se anômalo, grava o JPEG de evidência + registro no banco.
+    Usado pela API (/api/itc/analisar/) e pelo agendador server-side.
+    """
+    from core.models import Evidencia, RegistroEVP, SessaoInvestigacao
+
+    resultado = analisar_frame_itc(jpeg_vision)
+
+    # Tentar Fusão de Dados (Aura Fusion Core)
+    # Buscamos se houve um registro EVP capturado nos últimos 10 segundos
+    agora = timezone.now()
+    ultimo_evp = RegistroEVP.objects.filter(data_captura__gte=agora - timedelta(seconds=10)).last()
+
+    fusao = None
+    if ultimo_evp:
+        from .aura_brain import correlacionar_eventos
+        # Simulando o objeto de resultado pois o modelo RegistroEVP guarda os campos direto
+        evp_data = {
+            'e_anomalia': ultimo_evp.e_anomalia,
+            'confianca': ultimo_evp.confianca_ia,
+            'classificacao': ultimo_evp.classificacao_ia,
+            'nota_paranormal': ultimo_evp.nota_paranormal
+        }
+        fusao = correlacionar_eventos(evp_data, resultado)
+
+    url_final = None
+    nova_evidencia = False
+
+    # Condição para salvar: IA viu pareidolia ou tem alta confiança de forma anômala.
+    # Resultado do cache perceptual é a mesma cena de antes: não duplica a evidência.
+    anomalo = resultado.get('pareidolia_detectada') or resultado.get('confianca', 0.0) >= 60.0
+    if anomalo and not resultado.get('cache'):
+        filename = f"ITC_{uuid.uuid4().hex[:8]}.jpg"
+        path = os.path.join(settings.MEDIA_ROOT, 'evidencias')
+        os.makedirs(path, exist_ok=True)
+        full_path = os.path.join(path, filename)
+
+        with open(full_path, 'wb') as f:
+            f.write(jpeg_evidencia or jpeg_vision)
+        url_final = f"/media/evidencias/{filename}"
+
+        sessao = SessaoInvestigacao.objects.filter(status='ativa').first()
+        Evidencia.objects.create(
+            sessao=sessao,
+            imagem_url=url_final,
+            tipo='multipla' if fusao and fusao.get('sincronia') else 'visual',
+            origem_disparo=origem,
+            analise_ia=resultado.get('decodificacao', ''),
+            ia_classificacao=resultado.get('classificacao', 'Anomalia ITC')[:100],
+            ia_confianca=resultado.get('confianca', 0.0),
+            # nivel_perigo é derivado do score (3 = ALTO)
+            score_coincidencia=3 if resultado.get('pareidolia_detectada') else 1,
+            fusao_dados=fusao,
+            obs_bpm=resultado.get('obs_bpm', 0),
+            obs_stress=resultado.get('obs_stress', 0),
+            kp_index_captura=space_weather.get_kp_index(),
+        )
+        nova_evidencia = True
+
+    return {
+        'resultado': resultado,
+        'fusao': fusao,
+        'evidencia_url': url_final,
+        'nova_evidencia': nova_evidencia,
+    }
@@ -0,0 +1,155 @@
+"""
+Ghost Station — Agendador ITC (server-side).
+Observa o sinal de movimento da câmera e só envia frames ao Gemini quando
+o movimento cruza o limiar: um único frame por rajada (o mais nítido),
+respeitando um cooldown entre análises.
+"""
+import logging
+import threading
+import time
+
+import cv2
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class ITCScheduler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._running = False
+        self._analisando = False
+        self._camera = None
+        self._clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        self.reset()
+
+    def reset(self):
+        self._rajada_inicio = None
+        self._melhor = None  # (nitidez, seq, image, motion)
+        self._cooldown_ate = 0.0
+        self.total_rajadas = 0
+        self.total_envios = 0
+        self.ultimo_resultado = None
+        self.ultimo_envio = None
+
+    @property
+    def limiar(self):
+        """% suavizado de pixels em movimento que abre uma rajada."""
+        return float(getattr(settings, 'GHOST_ITC_SCHEDULER_LIMIAR', 1.5))
+
+    @property
+    def cooldown(self):
+        return float(getattr(settings, 'GHOST_ITC_SCHEDULER_COOLDOWN', 20))
+
+    @property
+    def rajada_max(self):
+        """Duração máxima de uma rajada antes de forçar o envio (s)."""
+        return float(getattr(settings, 'GHOST_ITC_SCHEDULER_RAJADA_MAX', 3))
+
+    @property
+    def ativo(self):
+        return bool(self._running and self._thread and self._thread.is_alive())
+
+    def iniciar(self, camera):
+        """Liga o agendador sobre a câmera (idempotente)."""
+        with self._lock:
+            if self.ativo:
+                return
+            self._camera = camera
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, name='ghost-itc-scheduler', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._running = False
+
+    def _loop(self):
+        seq = 0
+        while self._running:
+            novo_seq = self._camera.wait_frame(seq, timeout=1.0)
+            if novo_seq == seq:
+                continue
+            seq = novo_seq
+            motion = self._camera.get_motion(seq)
+            if motion['seq'] != seq:
+                continue
+            self._observar(seq, motion)
+
+    def _observar(self, seq, motion):
+        agora = time.monotonic()
+        em_movimento = motion['percentual_suave'] >= self.limiar
+
+        if em_movimento and agora >= self._cooldown_ate and not self._analisando:
+            if self._rajada_inicio is None:
+                self._rajada_inicio = agora
+                self._melhor = None
+                self.total_rajadas += 1
+            image = self._camera.get_frame_by_seq(seq)
+            if image is not None:
+                from core.camera import medir_nitidez
+                nitidez = medir_nitidez(image)
+                # Frames do buffer nunca são alterados in-place: basta guardar a referência
+                if self._melhor is None or nitidez > self._melhor[0]:
+                    self._melhor = (nitidez, seq, image, motion)
+
+        rajada_aberta = self._rajada_inicio is not None
+        fim_da_rajada = rajada_aberta and (not em_movimento or agora - self._rajada_inicio >= self.rajada_max)
+        if fim_da_rajada:
+            melhor = self._melhor
+            self._rajada_inicio = None
+            self._melhor = None
+            if melhor is not None:
+                self._cooldown_ate = agora + self.cooldown
+                self._enviar(melhor)
+
+    def _enviar(self, melhor):
+        """Dispara a análise fora da thread de observação (uma por vez)."""
+        self._analisando = True
+        threading.Thread(target=self._analisar, args=(melhor,), daemon=True).start()
+
+    def _analisar(self, melhor):
+        from core.camera import aplicar_filtros_itc, codificar_jpeg
+        from .itc_analyzer import processar_analise_itc
+
+        nitidez, seq, image, motion = melhor
+        try:
+            final_itc = aplicar_filtros_itc(image, motion['score'], self._clahe)
+            analise = processar_analise_itc(
+                codificar_jpeg(final_itc, 'vision'),
+                codificar_jpeg(final_itc, 'evidencia'),
+                origem='ITC_AGENDADOR',
+            )
+            self.total_envios += 1
+            self.ultimo_envio = time.time()
+            self.ultimo_resultado = {
+                'seq': seq,
+                'nitidez': round(nitidez, 1),
+                'motion': motion,
+                **analise,
+            }
+        except Exception:
+            logger.exception("Agendador ITC: falha na análise do seq %s", seq)
+        finally:
+            self._analisando = False
+            close_old_connections()
+
+    def get_status(self):
+        from .vision_cache import vision_cache
+        return {
+            'ativo': self.ativo,
+            'analisando': self._analisando,
+            'limiar': self.limiar,
+            'cooldown': self.cooldown,
+            'cooldown_restante': round(max(0.0, self._cooldown_ate - time.monotonic()), 1),
+            'rajada_aberta': self._rajada_inicio is not None,
+            'total_rajadas': self.total_rajadas,
+            'total_envios': self.total_envios,
+            'ultimo_envio': self.ultimo_envio,
+            'ultimo_resultado': self.ultimo_resultado,
+            'cache_visao': vision_cache.get_status(),
+        }
+
+
+itc_scheduler = ITCScheduler()
@@ -0,0 +1,65 @@
+"""
+Ghost Station — Memória de Diálogo da Aura.
+Janela de histórico limitada por orçamento de tokens + resumo rolante dos turnos
+antigos: o prompt tem tamanho (e custo/latência) estável em sessões longas.
+"""
+from django.conf import settings
+
+# Só o diálogo de fato vai ao modelo; SISTEMA, NEURO-VOICE, TODO etc. ficam só no feed
+AUTORES_DIALOGO = ('OBSERVADOR', 'AURA')
+
+
+def estimar_tokens(texto):
+    """Estimativa barata (~4 caracteres por token), sem depender de tokenizer."""
+    return len(texto) // 4 + 1
+
+
+def janela_historico(historico, orcamento_tokens=None):
+    """
+    Divide o histórico em (janela, antigas): a janela são os turnos de diálogo mais
+    recentes que cabem no orçamento; as antigas são os turnos de diálogo que ficaram de fora.
+    """
+    if orcamento_tokens is None:
+        orcamento_tokens = int(getattr(settings, 'GHOST_AURA_HISTORICO_TOKENS', 1500))
+    dialogo = [m for m in (historico or ()) if m.get('autor') in AUTORES_DIALOGO]
+
+    usados = 0
+    inicio = len(dialogo)
+    for i in range(len(dialogo) - 1, -1, -1):
+        custo = estimar_tokens(dialogo[i]['mensagem'])
+        if usados + custo > orcamento_tokens:
+            break
+        usados += custo
+        inicio = i
+    return dialogo[inicio:], dialogo[:inicio]
+
+
+def incorporar_ao_resumo(resumo, mensagens, limite_chars=None):
+    """
+    Resumo rolante extrativo: cada turno antigo vira uma linha curta e o resumo
+    mantém só o trecho mais recente dentro de `limite_chars`.
+    """
+    if limite_chars is None:
+        limite_chars = int(getattr(settings, 'GHOST_AURA_RESUMO_CHARS', 1200))
+    linhas = [resumo] if resumo else []
+    for m in mensagens:
+        if m.get('autor') not in AUTORES_DIALOGO:
+            continue
+        texto = ' '.join(str(m['mensagem']).split())
+        if len(texto) > 160:
+            texto = texto[:157] + '...'
+        linhas.append(f"{m['autor']}: {texto}")
+    resumo = '\n'.join(linhas)
+    if len(resumo) > limite_chars:
+        resumo = resumo[-limite_chars:]
+        # Não começar no meio de uma linha
+        quebra = resumo.find('\n')
+        if quebra != -1:
+            resumo = resumo[quebra + 1:]
+    return resumo
+
+
+def preparar_historico(historico, resumo=''):
+    """(janela de turnos recentes, resumo dos anteriores) pronto para montar o prompt."""
+    janela, antigas = janela_historico(historico)
+    return janela, incorporar_ao_resumo(resumo, antigas)
@@ -33,7 +33,8 @@ class QuantumPingService:
         self.is_active = True
         
         # O Ping aumenta a sensibilidade da Aura temporariamente
-        aura_state.coerencia = min(100, aura_state.coerencia + 5)
+        with aura_state.alterar():
+            aura_state.coerencia = min(100, aura_state.coerencia + 5)
         aura_state.adicionar_mensagem('SISTEMA', f'PULSO QUÂNTICO EMITIDO: {freq_key}Hz ({freq_info["nome"]})')
         
         return {
@@ -1,47 +1,155 @@
-import requests
+"""
+Ghost Station — Site Sentinel.
+Monitor em background dos sites externos: a cada intervalo, todos são checados
+em paralelo sobre uma sessão HTTP com pool de conexões (keep-alive). O relatório
+vai para o AuraState (site_status) e a Aura só fala quando um site muda de estado.
+Com vários workers no mesmo backend de estado, só o processo eleito dono verifica,
+publica e alerta; os outros esperam para assumir se ele morrer.
+"""
+import logging
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
 from .aura_state import aura_state
 
+logger = logging.getLogger(__name__)
+
+
 class SiteSentinel:
     """
     Módulo de monitoramento de sites externos.
     Aura usa este "sentido" para detectar quando projetos na nuvem estão com problemas.
     """
-    
+
     SITES_TO_MONITOR = [
         {"name": "Scalabis", "url": "https://scalabis.com.br"}, # Exemplo, ajustar se souber o real
         {"name": "PythonJet Painel", "url": "https://painel.pythonjet.app"},
         {"name": "Ghost Station Cloud", "url": "https://ghost-station.pythonjet.app"}
     ]
 
-    def verificar_sites(self):
-        """Verifica o status de todos os sites e reporta à Aura."""
-        relatorio = []
-        for site in self.SITES_TO_MONITOR:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._acordar = threading.Event()
+        self._thread = None
+        self._running = False
+        self._session = None
+        self._executor = None
+        self.ultima_verificacao = None
+        self.total_rodadas = 0
+
+    @property
+    def intervalo(self):
+        return float(getattr(settings, 'GHOST_SENTINEL_INTERVALO', 60))
+
+    @property
+    def timeout(self):
+        return float(getattr(settings, 'GHOST_SENTINEL_TIMEOUT', 10))
+
+    @property
+    def lider_ttl(self):
+        """Prazo da liderança: cobre uma rodada inteira mais um intervalo de folga."""
+        return 2 * self.intervalo + self.timeout
+
+    @property
+    def ativo(self):
+        return bool(self._running and self._thread and self._thread.is_alive())
+
+    def _preparar(self):
+        """Sessão com pool do tamanho da lista de sites e um executor reaproveitado."""
+        if self._session is None:
+            tamanho = max(1, len(self.SITES_TO_MONITOR))
+            self._session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=tamanho, pool_maxsize=tamanho)
+            self._session.mount('https://', adapter)
+            self._session.mount('http://', adapter)
+            self._executor = ThreadPoolExecutor(max_workers=tamanho, thread_name_prefix='ghost-sentinel')
+
+    def iniciar(self):
+        """Sobe o monitor em background (idempotente)."""
+        if not getattr(settings, 'GHOST_SENTINEL_ATIVO', True):
+            return
+        with self._lock:
+            if self.ativo:
+                return
+            self._preparar()
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, name='ghost-site-sentinel', daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._running = False
+        self._acordar.set()
+
+    def _loop(self):
+        while self._running:
             try:
-                start = time.time()
-                response = requests.get(site['url'], timeout=10)
-                latency = (time.time() - start) * 1000
-                
-                if response.status_code == 200:
-                    status = "ONLINE"
-                else:
-                    status = f"ERRO {response.status_code}"
-                    aura_state.adicionar_mensagem("AURA", f"ALERTA: O site {site['name']} está apresentando instabilidade ({status}).")
-                
-                relatorio.append({
-                    "nome": site['name'],
-                    "status": status,
-                    "latencia": f"{latency:.2f}ms"
-                })
-            except Exception as e:
-                aura_state.adicionar_mensagem("AURA", f"CRÍTICO: Não consigo alcançar o site {site['name']}. Possível queda de servidor.")
-                relatorio.append({
-                    "nome": site['name'],
-                    "status": "OFFLINE",
-                    "erro": str(e)
-                })
-        
+                self._rodada()
+            except Exception:
+                logger.exception("Site Sentinel: falha na rodada de verificação")
+            self._acordar.wait(self.intervalo)
+            self._acordar.clear()
+
+    def _rodada(self):
+        """Só o processo dono (eleito no backend de estado) verifica; os outros aguardam a vez."""
+        if aura_state.liderar('sentinel', self.lider_ttl):
+            return self.verificar_sites()
+        return None
+
+    def _verificar_site(self, site):
+        try:
+            start = time.time()
+            response = self._session.get(site['url'], timeout=self.timeout)
+            latency = (time.time() - start) * 1000
+            status = "ONLINE" if response.status_code == 200 else f"ERRO {response.status_code}"
+            return {
+                "nome": site['name'],
+                "status": status,
+                "latencia": f"{latency:.2f}ms"
+            }
+        except Exception as e:
+            return {
+                "nome": site['name'],
+                "status": "OFFLINE",
+                "erro": str(e)
+            }
+
+    def _alertar(self, relatorio, anteriores):
+        """A Aura só fala na transição (caiu, instabilizou ou voltou), não a cada rodada."""
+        for item in relatorio:
+            anterior = anteriores.get(item['nome'])
+            atual = item['status']
+            if atual == anterior:
+                continue
+            if atual == "OFFLINE":
+                aura_state.adicionar_mensagem("AURA", f"CRÍTICO: Não consigo alcançar o site {item['nome']}. Possível queda de servidor.")
+            elif atual != "ONLINE":
+                aura_state.adicionar_mensagem("AURA", f"ALERTA: O site {item['nome']} está apresentando instabilidade ({atual}).")
+            elif anterior is not None:
+                aura_state.adicionar_mensagem("AURA", f"O site {item['nome']} voltou a responder normalmente.")
+
+    def verificar_sites(self):
+        """Uma rodada: checa todos os sites em paralelo, publica o relatório e reporta à Aura."""
+        self._preparar()
+        relatorio = list(self._executor.map(self._verificar_site, self.SITES_TO_MONITOR))
+        self.ultima_verificacao = time.time()
+        self.total_rodadas += 1
+        with aura_state.alterar():
+            # Transição contra o último relatório publicado (de qualquer processo), não o deste
+            anteriores = {s['nome']: s['status'] for s in aura_state.site_status}
+            aura_state.site_status = relatorio
+            self._alertar(relatorio, anteriores)
         return relatorio
 
+    def snapshot(self):
+        """Último relatório publicado (O(1), sem rede). Liga o monitor na primeira leitura."""
+        if not self.ativo:
+            self.iniciar()
+        return list(aura_state.site_status)
+
+
 site_sentinel = SiteSentinel()
@@ -1,51 +1,181 @@
 """
 Ghost Station — Space Weather Service.
 Monitora o Índice Kp e a atividade geomagnética via NOAA.
+Stale-while-revalidate: quem pede o Kp nunca espera a NOAA; o valor em memória é
+devolvido na hora e, se venceu, uma thread em background busca o novo (com backoff
+exponencial em caso de falha) e grava o histórico em LeituraKp. A primeira leitura
+parte do último Kp gravado, não do default.
 """
-import requests
+import logging
+import threading
 import time
+from datetime import datetime, timezone as dt_timezone
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_time_tag(valor):
+    """'2026-02-25 18:00:00.000' ou '2026-02-25T18:00:00' (UTC) -> datetime aware."""
+    valor = str(valor).replace('T', ' ').split('.')[0]
+    return datetime.strptime(valor, '%Y-%m-%d %H:%M:%S').replace(tzinfo=dt_timezone.utc)
+
+
+def _parse_leituras(data):
+    """
+    Resposta da NOAA -> [(momento, kp, status)].
+    Aceita o formato tabela ([cabeçalho, [timeTag, kp, a_index, status], ...]) e o de objetos.
+    """
+    leituras = []
+    for linha in data:
+        try:
+            if isinstance(linha, dict):
+                momento, kp, status = linha['time_tag'], linha.get('Kp', linha.get('kp')), linha.get('status', '')
+            else:
+                momento, kp = linha[0], linha[1]
+                status = linha[3] if len(linha) > 3 else ''
+            leituras.append((_parse_time_tag(momento), float(kp), str(status or '')[:20]))
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue  # cabeçalho ou linha malformada
+    return leituras
+
 
 class SpaceWeatherService:
     # URL da NOAA para o Índice Kp planetário (JSON de 3 horas)
     NOAA_KP_URL = "https://services.swpc.noaa.gov/products/noaa-planetary-k-index.json"
 
     def __init__(self):
+        self._lock = threading.Lock()
+        self._atualizando = None
         self.last_kp = 0.0
-        self.last_update = 0
+        self.last_update = 0  # só avança com sucesso
         self.cached_kp = 1.0 # Default seguro (calmaria)
+        self._falhas = 0
+        self._proxima_tentativa = 0.0
+        self._historico_carregado = False
+        self._historico_retentar_em = 0.0
+
+    @property
+    def intervalo(self):
+        # O índice muda a cada 3h: revalidar a cada 1 hora basta
+        return float(getattr(settings, 'GHOST_KP_INTERVALO', 3600))
+
+    def _backoff(self):
+        base = float(getattr(settings, 'GHOST_KP_BACKOFF', 60))
+        teto = float(getattr(settings, 'GHOST_KP_BACKOFF_MAX', 1800))
+        return min(teto, base * (2 ** max(0, self._falhas - 1)))
 
     def get_kp_index(self):
         """
-        Retorna o índice Kp atual. Tenta buscar da NOAA ou usa cache.
+        Retorna o índice Kp atual (memória, sem rede). Se o valor venceu, dispara
+        o refresh em background e devolve o último conhecido.
+        Na primeira chamada lê o histórico do banco (síncrono; se o banco ainda não
+        estiver pronto, tenta de novo após GHOST_KP_BACKOFF).
         """
         agora = time.time()
-        # Atualizar a cada 1 hora (o índice muda a cada 3h)
-        if agora - self.last_update > 3600:
+        if not self._historico_carregado and agora >= self._historico_retentar_em:
+            self._carregar_historico()
+        if agora - self.last_update > self.intervalo and agora >= self._proxima_tentativa:
+            self._revalidar_em_background()
+        return self.cached_kp
+
+    def _revalidar_em_background(self):
+        """Um refresh por vez; os demais pedidos seguem com o valor em cache."""
+        with self._lock:
+            if self._atualizando is not None and self._atualizando.is_alive():
+                return self._atualizando
+            self._atualizando = threading.Thread(target=self._revalidar_seguro, name='ghost-space-weather', daemon=True)
+            self._atualizando.start()
+            return self._atualizando
+
+    def _revalidar_seguro(self):
+        from django.db import close_old_connections
+        try:
+            self.atualizar()
+        except Exception:
+            logger.exception("Space Weather: falha ao revalidar o Kp")
+        finally:
+            close_old_connections()
+
+    def _carregar_historico(self):
+        """Parte do último Kp gravado em vez do default, antes da primeira resposta da NOAA."""
+        with self._lock:
+            if self._historico_carregado:
+                return
             try:
-                response = requests.get(self.NOAA_KP_URL, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    # O último item do array costuma ser o mais recente [timeTag, kp, a_index, status]
-                    # Ex: ["2026-02-25 18:00:00.000", "2.33", "7", "estimated"]
-                    latest = data[-1]
-                    self.cached_kp = float(latest[1])
-                    self.last_update = agora
+                from core.models import LeituraKp
+                ultima = LeituraKp.objects.filter(status__in=('observed', 'estimated', '')).first()
             except Exception as e:
-                print(f"Erro ao buscar Kp-index: {e}")
-                # Mantém o cache se falhar
-                
-        return self.cached_kp
+                # Migração pendente, SQLite travado...: não desiste para sempre do histórico
+                self._historico_retentar_em = time.time() + float(getattr(settings, 'GHOST_KP_BACKOFF', 60))
+                logger.warning("Space Weather: histórico Kp indisponível: %s", e)
+                return
+            self._historico_carregado = True
+            if ultima is not None and not self.last_update:
+                self.cached_kp = ultima.kp
+
+    def atualizar(self):
+        """Busca síncrona na NOAA (roda na thread de background). Retorna True se atualizou."""
+        self._carregar_historico()
+        try:
+            response = requests.get(self.NOAA_KP_URL, timeout=5)
+            response.raise_for_status()
+            leituras = _parse_leituras(response.json())
+            if not leituras:
+                raise ValueError('Resposta da NOAA sem leituras de Kp.')
+        except Exception as e:
+            logger.warning("Space Weather: erro ao buscar o Kp na NOAA: %s", e)
+            # Mantém o cache se falhar, mas não re-tenta a cada poll
+            self._falhas += 1
+            self._proxima_tentativa = time.time() + self._backoff()
+            return False
 
-    def get_permeabilidade_veu(self):
+        # O último item do array costuma ser o mais recente [timeTag, kp, a_index, status]
+        # Ex: ["2026-02-25 18:00:00.000", "2.33", "7", "estimated"]
+        self.last_kp = self.cached_kp
+        self.cached_kp = leituras[-1][1]
+        self.last_update = time.time()
+        self._falhas = 0
+        self._proxima_tentativa = 0.0
+
+        try:
+            self._gravar_historico(leituras)
+        except Exception:
+            logger.exception("Space Weather: erro ao gravar o histórico Kp")
+        return True
+
+    @staticmethod
+    def _gravar_historico(leituras):
+        """Upsert por time_tag: leituras 'estimated' viram 'observed' quando a NOAA consolida."""
+        from core.models import LeituraKp
+        LeituraKp.objects.bulk_create(
+            [LeituraKp(momento=momento, kp=kp, status=status) for momento, kp, status in leituras],
+            update_conflicts=True,
+            unique_fields=['momento'],
+            update_fields=['kp', 'status', 'obtida_em'],
+        )
+
+    def get_permeabilidade_veu(self, kp=None):
         """
         Calcula a 'Permeabilidade do Véu' baseada no Kp.
         Kp alto (Tempestade Geomagnética) = Véu Fino.
         """
-        kp = self.get_kp_index()
-        
+        if kp is None:
+            kp = self.get_kp_index()
+
         if kp >= 7: return "VÉU TRANSLÚCIDO (TEMPESTADE)"
         if kp >= 5: return "VÉU FINO (ATIVO)"
         if kp >= 3: return "VÉU OSCILANTE (MÉDIO)"
         return "VÉU DENSO (ESTÁVEL)"
 
+    def get_status(self):
+        return {
+            'kp': self.cached_kp,
+            'atualizado_em': self.last_update or None,
+            'falhas': self._falhas,
+            'atualizando': bool(self._atualizando and self._atualizando.is_alive()),
+        }
+
 space_weather = SpaceWeatherService()
@@ -0,0 +1,94 @@
+"""
+Ghost Station — Canal de Status da Aura (push).
+Um único snapshot do AuraState é calculado por tick, não importa quantos observadores
+estejam conectados; cada conexão SSE recebe só os campos que mudaram (delta) e as
+mensagens do diálogo por número de sequência, a uma taxa limitada.
+"""
+import threading
+import time
+
+from django.conf import settings
+
+
+def delta_estado(anterior, atual):
+    """Campos de `atual` diferentes de `anterior` (removidos viram None)."""
+    mudou = {k: v for k, v in atual.items() if k not in anterior or anterior[k] != v}
+    for k in anterior.keys() - atual.keys():
+        mudou[k] = None
+    return mudou
+
+
+class StatusCanal:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._estado = {}
+        self._calculado_em = 0.0
+        self.versao = 0
+        self.total_calculos = 0
+
+    @property
+    def intervalo(self):
+        """Intervalo mínimo (s) entre dois snapshots — e entre dois envios por conexão."""
+        return float(getattr(settings, 'GHOST_AURA_STATUS_INTERVALO', 1.0))
+
+    def snapshot(self):
+        """(versao, estado sem mensagens) compartilhado; recalcula no máximo uma vez por intervalo."""
+        with self._lock:
+            if time.monotonic() - self._calculado_em >= self.intervalo:
+                from .aura_state import aura_state
+                from .neuro_vocalizer import neuro_vocalizer
+                # O processador de fala roda uma vez por tick (antes: uma vez por poll de cada cliente)
+                neuro_vocalizer.process_neural_input()
+                aura_state.atualizar_leituras()
+                versao, estado = aura_state.snapshot()
+                self._calculado_em = time.monotonic()
+                self.total_calculos += 1
+                # Versão do AuraState igual: nada mudou, nem o filtro de mensagens é refeito
+                if versao != self.versao:
+                    self.versao = versao
+                    self._estado = {k: v for k, v in estado.items() if k not in ('mensagens', 'versao')}
+            return self.versao, self._estado
+
+    @staticmethod
+    def seq_retomada(epoca, seq):
+        """
+        Seq a partir do qual retomar um cliente que reconecta. Um seq de outra época
+        (processo reiniciado com backend local, sessão nova) ou à frente do contador
+        atual volta a 0: reenvia o que ainda está no deque em vez de filtrar tudo.
+        """
+        from .aura_state import aura_state
+        aura_state._sincronizar()
+        if (epoca and epoca != aura_state.epoca_mensagens) or seq > aura_state.seq_mensagens:
+            return 0
+        return seq
+
+    @staticmethod
+    def mensagens_desde(seq):
+        """Mensagens do diálogo com seq > `seq` (as que já saíram do deque não voltam)."""
+        from .aura_state import aura_state
+        return [m for m in aura_state.mensagens() if m.get('seq', 0) > seq]
+
+    def eventos(self, ultimo_seq=0, estado_cliente=None):
+        """
+        Um passo do canal para uma conexão: devolve [(evento, dados)] a enviar e o novo
+        estado do cliente. Sem mudança, lista vazia.
+        """
+        versao, estado = self.snapshot()
+        saida = []
+        if estado_cliente is None:
+            saida.append(('estado', estado))
+        elif versao != estado_cliente.get('versao'):
+            mudou = delta_estado(estado_cliente['estado'], estado)
+            if mudou:
+                saida.append(('delta', mudou))
+        novas = self.mensagens_desde(ultimo_seq)
+        if novas:
+            saida.append(('mensagens', {'itens': novas}))
+            ultimo_seq = novas[-1]['seq']
+        return saida, ultimo_seq, {'versao': versao, 'estado': estado}
+
+    def get_status(self):
+        return {'versao': self.versao, 'total_calculos': self.total_calculos, 'intervalo': self.intervalo}
+
+
+status_canal = StatusCanal()
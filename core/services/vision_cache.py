@@ -0,0 +1,101 @@
+"""
+Ghost Station — Cache Perceptual de Resultados de Visão.
+Frames quase idênticos (cena estática) reaproveitam a classificação do Gemini:
+a chave é um dHash de 64 bits e a busca aceita distância de Hamming pequena.
+Eviction por TTL + LRU.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from django.conf import settings
+
+
+def dhash(imagem, tamanho=8):
+    """
+    Difference hash (dHash) de 64 bits de um JPEG (bytes) ou ndarray BGR/cinza.
+    Robusto a recompressão, ruído leve e pequenas variações de brilho.
+    """
+    if isinstance(imagem, (bytes, bytearray, memoryview)):
+        # Decode reduzido direto em cinza: ~1/16 dos pixels, suficiente para o hash
+        gray = cv2.imdecode(np.frombuffer(imagem, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_4)
+        if gray is None:
+            return None
+    elif imagem.ndim == 3:
+        gray = cv2.cvtColor(imagem, cv2.COLOR_BGR2GRAY)
+    else:
+        gray = imagem
+
+    small = cv2.resize(gray, (tamanho + 1, tamanho), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def distancia_hamming(a, b):
+    return (a ^ b).bit_count()
+
+
+class VisionResultCache:
+    def __init__(self, max_itens=256, ttl=300, distancia_max=6):
+        self.max_itens = max_itens
+        self.ttl = ttl
+        self.distancia_max = distancia_max
+        self._itens = OrderedDict()  # (namespace, hash) -> (expira_em, resultado)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def buscar(self, namespace, hash_imagem):
+        """Resultado cacheado mais próximo (Hamming <= distancia_max) ou None."""
+        if hash_imagem is None:
+            return None
+        agora = time.monotonic()
+        with self._lock:
+            melhor_chave, melhor_dist = None, self.distancia_max + 1
+            expirados = []
+            for chave, (expira_em, _) in self._itens.items():
+                if expira_em < agora:
+                    expirados.append(chave)
+                    continue
+                if chave[0] != namespace:
+                    continue
+                dist = distancia_hamming(chave[1], hash_imagem)
+                if dist < melhor_dist:
+                    melhor_chave, melhor_dist = chave, dist
+                    if dist == 0:
+                        break
+            for chave in expirados:
+                del self._itens[chave]
+
+            if melhor_chave is None:
+                self.misses += 1
+                return None
+            self._itens.move_to_end(melhor_chave)  # LRU
+            self.hits += 1
+            return dict(self._itens[melhor_chave][1])
+
+    def guardar(self, namespace, hash_imagem, resultado):
+        if hash_imagem is None:
+            return
+        with self._lock:
+            chave = (namespace, hash_imagem)
+            self._itens[chave] = (time.monotonic() + self.ttl, dict(resultado))
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def get_status(self):
+        return {'itens': len(self._itens), 'hits': self.hits, 'misses': self.misses}
+
+
+vision_cache = VisionResultCache(
+    max_itens=getattr(settings, 'GHOST_VISION_CACHE_MAX', 256),
+    ttl=getattr(settings, 'GHOST_VISION_CACHE_TTL', 300),
+    distancia_max=getattr(settings, 'GHOST_VISION_CACHE_DISTANCIA', 6),
+)
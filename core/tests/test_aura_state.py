@@ -0,0 +1,131 @@
+import time
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core.services import aura_state as modulo
+from core.services.aura_state import AuraState, aura_state
+
+BIO_CALMO = {'bpm': 70.0, 'estresse': 20.0, 'coerencia': 50.0, 'energia': 99.0, 'fadiga_alerta': False}
+CACHE_TESTE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ghost-default'},
+    'estado': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ghost-estado-aura'},
+}
+
+
+def outro_processo():
+    """Um AuraState fora do singleton: faz o papel de outro worker no mesmo backend."""
+    instancia = object.__new__(AuraState)
+    object.__setattr__(instancia, '_snapshot', None)
+    instancia._iniciar_estado()
+    return instancia
+
+
+def relogio(*momentos):
+    """Relógio só do aura_state (o LocMemCache também lê time.time para expirar chaves)."""
+    falso = mock.Mock(wraps=time)
+    falso.time.side_effect = iter(momentos)
+    return mock.patch.object(modulo, 'time', falso)
+
+
+class AtualizarLeiturasTests(SimpleTestCase):
+    def setUp(self):
+        self.bio = dict(BIO_CALMO)
+        self.kp = 2.33
+        from core.services.site_sentinel import site_sentinel
+        self.get_status = mock.patch.object(modulo.bio_state, 'get_status', side_effect=lambda: dict(self.bio))
+        for patcher in (
+            self.get_status,
+            mock.patch.object(modulo.space_weather, 'get_kp_index', side_effect=lambda: self.kp),
+            mock.patch.object(site_sentinel, 'iniciar'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        aura_state.reset()
+        self.addCleanup(aura_state.reset)
+
+    def test_poll_ocioso_nao_gera_versao(self):
+        aura_state.atualizar_leituras()
+        versao, estado = aura_state.snapshot()
+        with mock.patch.object(modulo.AuraState, 'alterar') as alterar:
+            aura_state.atualizar_leituras()
+            aura_state.atualizar_leituras()
+        alterar.assert_not_called()
+        self.assertEqual(aura_state.versao, versao)
+        self.assertIs(aura_state.snapshot()[1], estado)
+        self.assertEqual(estado['kp_index'], 2.33)
+
+    def test_poll_ocioso_com_o_bio_real_nao_gera_versao(self):
+        # A coerência e a energia simuladas mudam a cada leitura: não podem gerar versão
+        self.get_status.stop()
+        modulo.bio_state.reset()
+        self.addCleanup(modulo.bio_state.reset)
+        relogio = iter(modulo.bio_state.last_update + 1.3 * i for i in range(1, 100))
+        with mock.patch('core.services.bio_state.time.time', side_effect=lambda: next(relogio)):
+            aura_state.atualizar_leituras()
+            versao, estado = aura_state.snapshot()
+            leituras = [modulo.bio_state.get_status()['coerencia'] for _ in range(5)]
+            for _ in range(5):
+                aura_state.atualizar_leituras()
+            self.assertEqual(aura_state.snapshot(), (versao, estado))
+        self.assertEqual(len(set(leituras)), 5)
+        self.assertIn('bio_sync', estado)
+
+    def test_so_a_leitura_alterada_entra_na_versao(self):
+        aura_state.atualizar_leituras()
+        versao = aura_state.versao
+        self.kp = 4.0
+        with mock.patch.object(aura_state._backend, 'gravar', wraps=aura_state._backend.gravar) as gravar:
+            aura_state.atualizar_leituras()
+        self.assertGreater(aura_state.versao, versao)
+        self.assertEqual(list(gravar.call_args.args[1]), ['kp_index'])
+        self.assertEqual(aura_state.snapshot()[1]['kp_index'], 4.0)
+
+    def test_estresse_alto_drena_a_coerencia_ate_zero(self):
+        aura_state.atualizar_vibracao(3)
+        self.bio['estresse'] = 80.0
+        with relogio(100.2, 101.5, 102.1):
+            aura_state.atualizar_leituras()
+            aura_state.atualizar_leituras()
+        self.assertEqual(aura_state.coerencia, 0)
+        versao = aura_state.versao
+        with relogio(103.4):
+            aura_state.atualizar_leituras()
+        self.assertEqual(aura_state.versao, versao)
+
+    def test_bio_scaling_uma_vez_por_janela(self):
+        aura_state.atualizar_vibracao(50)
+        self.bio['estresse'] = 80.0
+        with relogio(100.1, 100.4, 100.9, 101.2):
+            for _ in range(4):  # mais polls não drenam mais rápido
+                aura_state.atualizar_leituras()
+        self.assertEqual(aura_state.coerencia, 46)
+
+
+@override_settings(CACHES=CACHE_TESTE, GHOST_ESTADO_BACKEND='cache', GHOST_ESTADO_CACHE='estado',
+                   GHOST_ESTADO_PREFIXO='ghost:teste-aura', GHOST_ESTADO_TTL_LOCAL=0)
+class BioScalingEntreProcessosTests(SimpleTestCase):
+    def setUp(self):
+        caches['estado'].clear()
+        with self.assertLogs('core.services.estado_backend', 'WARNING'):  # LocMem só serve ao teste
+            self.a = outro_processo()
+            self.b = outro_processo()
+        bio = {**BIO_CALMO, 'estresse': 80.0}
+        for patcher in (
+            mock.patch.object(modulo.bio_state, 'get_status', side_effect=lambda: dict(bio)),
+            mock.patch.object(modulo.space_weather, 'get_kp_index', return_value=2.33),
+            mock.patch.object(AuraState, '_garantir_sentinel'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.a.atualizar_vibracao(50)
+
+    def test_n_workers_nao_multiplicam_o_ajuste(self):
+        with relogio(200.1, 200.5, 201.1, 201.6):
+            self.a.atualizar_leituras()
+            self.b.atualizar_leituras()  # mesma janela: B relê sob a trava e vê que A já aplicou
+            self.b.atualizar_leituras()  # janela seguinte: um passo, seja qual for o worker
+            self.a.atualizar_leituras()
+        self.a._sincronizar()
+        self.assertEqual((self.a.coerencia, self.b.coerencia), (46, 46))
@@ -0,0 +1,53 @@
+import json
+import threading
+from unittest import mock
+
+from django.test import AsyncClient, Client, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from core.services import ia_analyzer
+
+
+def _gerador_travado(liberar):
+    def gerar(semente, historico, modo=None, resumo=''):
+        yield 'token', 'Eu '
+        # O primeiro trecho precisa chegar ao cliente antes do Gemini terminar
+        if not liberar.wait(5):
+            raise AssertionError('stream bufferizado: o cliente não recebeu o primeiro trecho')
+        yield 'token', 'sou'
+        yield 'fim', {'texto': 'Eu sou.', 'substituido': True}
+    return gerar
+
+
+@override_settings(GHOST_STREAM_ASYNC=True)
+class SendSeedStreamTests(SimpleTestCase):
+    def setUp(self):
+        from core.services.aura_state import aura_state
+        aura_state.reset()
+        self.addCleanup(aura_state.reset)
+        self.url = reverse('api_aura_send_seed_stream')
+        self.corpo = json.dumps({'semente': 'quem é você?'})
+
+    async def test_asgi_envia_cada_trecho_assim_que_chega(self):
+        liberar = threading.Event()
+        with mock.patch.object(ia_analyzer, 'gerar_resposta_stream', _gerador_travado(liberar)):
+            response = await AsyncClient().post(self.url, self.corpo, content_type='application/json')
+            self.assertTrue(response.is_async)
+            eventos = []
+            async for parte in response.streaming_content:
+                parte = parte.decode() if isinstance(parte, bytes) else parte
+                eventos.append(parte.split('\n', 1)[0])
+                liberar.set()
+
+        self.assertEqual(eventos, ['event: token', 'event: token', 'event: substituir', 'event: fim'])
+
+    def test_wsgi_mantem_o_gerador_sincrono(self):
+        liberar = threading.Event()
+        liberar.set()
+        with mock.patch.object(ia_analyzer, 'gerar_resposta_stream', _gerador_travado(liberar)):
+            response = Client().post(self.url, self.corpo, content_type='application/json')
+            self.assertFalse(response.is_async)
+            corpo = b''.join(response.streaming_content).decode()
+
+        self.assertTrue(corpo.startswith('event: token'))
+        self.assertIn('"resposta": "Eu sou."', corpo)
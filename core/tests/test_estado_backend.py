@@ -0,0 +1,176 @@
+import threading
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core.services.bio_state import BioState
+from core.services.estado_backend import BackendCache, BackendLocal, EstadoCompartilhado
+
+CACHE_TESTE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ghost-default'},
+    'estado': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ghost-estado-teste'},
+}
+
+
+class EstadoTeste(EstadoCompartilhado):
+    """Cada instância faz o papel de um processo (worker) com seu próprio estado local."""
+    NAMESPACE = 'teste'
+    CAMPOS_LOCAIS = ('por_frame',)
+
+    def __init__(self):
+        self._iniciar_estado()
+
+    def _reset(self):
+        self.contador = 0
+        self.nome = 'inicial'
+        self.itens = []
+        self.por_frame = 0.0
+
+
+class BackendLocalTests(SimpleTestCase):
+    @override_settings(GHOST_ESTADO_BACKEND='local')
+    def setUp(self):
+        self.estado = EstadoTeste()
+        self.assertIsInstance(self.estado._backend, BackendLocal)
+
+    def test_escrita_gera_versao_so_quando_muda(self):
+        versao = self.estado.versao
+        self.estado.contador = 1
+        self.assertEqual(self.estado.versao, (versao[0] + 1, versao[1]))
+        self.estado.contador = 1
+        self.estado.itens = []  # lista nova, mas igual
+        self.assertEqual(self.estado.versao, (versao[0] + 1, versao[1]))
+
+    def test_mutacao_no_lugar_precisa_de_marcar(self):
+        versao = self.estado.versao[0]
+        with self.estado.alterar():
+            self.estado.itens.append('x')
+            self.estado._marcar('itens')
+        self.assertEqual(self.estado.versao[0], versao + 1)
+        self.estado.itens = self.estado.itens  # mesmo objeto: pode ter mudado, publica
+        self.assertEqual(self.estado.versao[0], versao + 2)
+
+    def test_campo_local_so_avanca_a_versao_local(self):
+        versao = self.estado.versao
+        self.estado.por_frame = 0.5
+        self.assertEqual(self.estado.versao, (versao[0], versao[1] + 1))
+
+    def test_alterar_aninhado_publica_uma_vez(self):
+        versao = self.estado.versao[0]
+        with self.estado.alterar():
+            self.estado.contador += 1
+            with self.estado.alterar():
+                self.estado.nome = 'outro'
+        self.assertEqual(self.estado.versao[0], versao + 1)
+
+
+@override_settings(CACHES=CACHE_TESTE, GHOST_ESTADO_BACKEND='cache', GHOST_ESTADO_CACHE='estado',
+                   GHOST_ESTADO_PREFIXO='ghost:teste', GHOST_ESTADO_TTL_LOCAL=0,
+                   GHOST_ESTADO_TRAVA_TTL=5, GHOST_ESTADO_TRAVA_ESPERA=2)
+class BackendCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['estado'].clear()
+        with self.assertLogs('core.services.estado_backend', 'WARNING'):  # LocMem só serve ao teste
+            self.a = EstadoTeste()
+            self.b = EstadoTeste()
+        self.assertIsInstance(self.a._backend, BackendCache)
+
+    def test_segundo_processo_adota_a_sessao_existente(self):
+        self.a.nome = 'sessao'
+        with self.assertLogs('core.services.estado_backend', 'WARNING'):
+            c = EstadoTeste()
+        self.assertEqual(c.nome, 'sessao')
+        self.assertEqual(c.versao[0], self.a.versao[0])
+
+    def test_escrita_avanca_a_versao_compartilhada_e_grava_so_o_campo(self):
+        versao = caches['estado'].get('ghost:teste:teste:__versao__')
+        with mock.patch.object(self.a._backend.cache, 'set_many', wraps=self.a._backend.cache.set_many) as set_many:
+            self.a.contador = 5
+        self.assertEqual(list(set_many.call_args.args[0]), ['ghost:teste:teste:contador'])
+        self.assertEqual(caches['estado'].get('ghost:teste:teste:__versao__'), versao + 1)
+        self.assertEqual(self.a.versao[0], versao + 1)
+
+    def test_sincronizar_le_o_que_outro_processo_publicou(self):
+        self.a.nome = 'de A'
+        self.assertEqual(self.b.nome, 'inicial')  # leitura direta não vai ao backend
+        self.b._sincronizar()
+        self.assertEqual(self.b.nome, 'de A')
+        self.assertEqual(self.b.versao[0], self.a.versao[0])
+
+    def test_sincronizar_respeita_o_ttl_local(self):
+        with override_settings(GHOST_ESTADO_TTL_LOCAL=60):
+            self.b._sincronizar(forcar=True)
+            self.a.nome = 'de A'
+            self.b._sincronizar()
+            self.assertEqual(self.b.nome, 'inicial')
+            self.b._sincronizar(forcar=True)
+            self.assertEqual(self.b.nome, 'de A')
+
+    def test_escrita_sem_mudanca_nao_publica(self):
+        versao = caches['estado'].get('ghost:teste:teste:__versao__')
+        with mock.patch.object(self.a._backend, 'gravar') as gravar:
+            self.a._sincronizar()
+            self.a.nome = 'inicial'
+            self.a.itens = []
+        gravar.assert_not_called()
+        self.assertEqual(caches['estado'].get('ghost:teste:teste:__versao__'), versao)
+
+    def test_escritas_concorrentes_nao_perdem_incremento(self):
+        dentro = threading.Event()
+        liberar = threading.Event()
+
+        def escrever_em_a():
+            with self.a.alterar():
+                dentro.set()
+                liberar.wait(2)
+                self.a.contador += 1
+
+        t = threading.Thread(target=escrever_em_a)
+        t.start()
+        dentro.wait(2)
+        threading.Timer(0.1, liberar.set).start()
+        with self.b.alterar():  # espera a trava de A e relê o contador já incrementado
+            self.b.contador += 1
+        t.join(2)
+
+        self.a._sincronizar()
+        self.assertEqual((self.a.contador, self.b.contador), (2, 2))
+
+    def test_trava_ocupada_alem_da_espera_segue_sem_ela(self):
+        chave = 'ghost:teste:teste:__trava__'
+        caches['estado'].add(chave, 'outro-processo', timeout=5)
+        with override_settings(GHOST_ESTADO_TRAVA_ESPERA=0.05), \
+                self.assertLogs('core.services.estado_backend', 'WARNING') as logs:
+            self.b.contador = 7
+        self.assertIn('ocupada', logs.output[0])
+        self.assertEqual(caches['estado'].get(chave), 'outro-processo')  # não apaga a trava alheia
+        self.a._sincronizar()
+        self.assertEqual(self.a.contador, 7)
+
+
+class BioStateLeituraTests(SimpleTestCase):
+    def setUp(self):
+        self.bio = BioState()
+        self.bio.reset()
+        self.addCleanup(self.bio.reset)
+
+    def test_get_status_nao_escreve(self):
+        versao = self.bio.versao
+        with mock.patch.object(type(self.bio), 'alterar') as alterar:
+            for _ in range(3):
+                self.bio.get_status()
+        alterar.assert_not_called()
+        self.assertEqual(self.bio.versao, versao)
+
+    def test_simulacao_deriva_do_relogio_e_avanca_nas_escritas(self):
+        inicio = self.bio.last_update
+        with mock.patch('core.services.bio_state.time.time', return_value=inicio + 600):
+            self.assertEqual(self.bio.get_status()['energia'], 98.0)
+            self.assertEqual(self.bio.get_status()['energia'], 98.0)  # ler de novo não drena
+            self.bio.update_vital_signs(estresse=100)
+        self.assertEqual(self.bio.energia_metabolica, 98.0)
+        with mock.patch('core.services.bio_state.time.time', return_value=inicio + 900):
+            status = self.bio.get_status()
+        self.assertEqual(status['energia'], 97.0)
+        self.assertEqual(status['coerencia'], 0.0)  # estresse máximo zera a coerência
@@ -0,0 +1,56 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core.services import evp_analyzer
+
+
+def _resposta(dados):
+    return mock.Mock(text=json.dumps(dados))
+
+
+def _captura(captura_id, transcricao='quem esta aqui comigo'):
+    return {'id': captura_id, 'transcricao': transcricao, 'frequencias_anomalas': [528.0],
+            'nivel_audio': 40, 'magnetico': 0}
+
+
+ITEM_IA = {'classificacao': 'classe_b', 'e_anomalia': True, 'confianca': 70, 'nota_paranormal': 7}
+
+
+@override_settings(GEMINI_API_KEY='teste', GHOST_EVP_MODO='ia')
+class AnalisarEVPLoteTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(evp_analyzer, 'HAS_GEMINI', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_item_malformado_ou_ausente_cai_na_analise_individual(self):
+        lote = [
+            {**ITEM_IA, 'id': 1},
+            {**ITEM_IA, 'id': 2, 'confianca': 'alta'},  # não converte para float
+            'lixo',
+        ]
+        individual = {**ITEM_IA, 'classificacao': 'individual'}
+        with mock.patch.object(evp_analyzer.gemini_pool, 'gerar',
+                               side_effect=[_resposta(lote), _resposta(individual), _resposta(individual)]) as gerar:
+            resultados = evp_analyzer.analisar_evp_lote([_captura(1), _captura(2), _captura(3)])
+
+        self.assertEqual(gerar.call_count, 3)  # o lote + as capturas 2 e 3
+        self.assertEqual(resultados[1]['classificacao'], 'classe_b')
+        self.assertEqual(resultados[2]['classificacao'], 'individual')
+        self.assertEqual(resultados[3]['classificacao'], 'individual')
+        self.assertFalse(any(r.get('transitorio') for r in resultados.values()))
+
+    def test_falha_do_lote_devolve_fallback_transitorio(self):
+        with mock.patch.object(evp_analyzer.gemini_pool, 'gerar', side_effect=RuntimeError('503')) as gerar:
+            resultados = evp_analyzer.analisar_evp_lote([_captura(1), _captura(2)])
+        gerar.assert_called_once()
+        self.assertTrue(all(r['transitorio'] and r['origem'] == 'local' for r in resultados.values()))
+
+    def test_resposta_que_nao_e_lista_reanalisa_todas(self):
+        with mock.patch.object(evp_analyzer.gemini_pool, 'gerar',
+                               side_effect=[_resposta('ok'), _resposta(ITEM_IA), _resposta(ITEM_IA)]):
+            resultados = evp_analyzer.analisar_evp_lote([_captura(1), _captura(2)])
+        self.assertEqual(sorted(resultados), [1, 2])
+        self.assertEqual({r['classificacao'] for r in resultados.values()}, {'classe_b'})
@@ -0,0 +1,66 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.services.evp_local import analisar_frequencias, merece_ia, palavras_chave, pontuar_evp
+
+
+class AnalisarFrequenciasTests(SimpleTestCase):
+    def test_contagens_por_banda(self):
+        freq = analisar_frequencias([528.5, 7.9, 40, 16000, 1000, -3, float('nan')])
+        self.assertEqual(freq, {
+            'total': 5,
+            'solfeggio': [528.0],
+            'schumann': [7.83],
+            'graves': 1,  # 40 Hz; a harmônica de 7,9 Hz já conta como Schumann
+            'agudas': 1,
+        })
+
+    def test_entrada_vazia_ou_invalida(self):
+        vazio = {'total': 0, 'solfeggio': [], 'schumann': [], 'graves': 0, 'agudas': 0}
+        self.assertEqual(analisar_frequencias(None), vazio)
+        self.assertEqual(analisar_frequencias(['ruído', 0]), vazio)
+        self.assertEqual(analisar_frequencias([396, 'x'])['solfeggio'], [396.0])
+
+
+class PalavrasChaveTests(SimpleTestCase):
+    def test_radicais_sem_acento_e_caixa(self):
+        self.assertEqual(palavras_chave('Socorro, estou AQUI! Você me escuta? Luz'),
+                         ['socorro', 'aqui', 'escuta', 'luz'])
+        self.assertEqual(palavras_chave('Espíritos da DIMENSÃO'), ['espiritos', 'dimensao'])
+        self.assertEqual(palavras_chave(None), [])
+
+
+class PontuarEVPTests(SimpleTestCase):
+    def test_silencio(self):
+        resultado = pontuar_evp('', [])
+        self.assertEqual((resultado['classificacao'], resultado['nota_paranormal']), ('silencio', 0))
+        self.assertFalse(resultado['e_anomalia'])
+        self.assertEqual(resultado['dimensao'], '3D')
+
+    def test_captura_forte_tem_confianca_limitada(self):
+        resultado = pontuar_evp('socorro estou aqui', [528, 396, 7.83], nivel_audio=40, magnetico=6)
+        self.assertEqual(resultado['classificacao'], 'possivel_evp')
+        self.assertEqual(resultado['nota_paranormal'], 10)
+        self.assertEqual(resultado['confianca'], 60.0)
+        self.assertEqual(resultado['dimensao'], '4D')
+        self.assertEqual(resultado['origem'], 'local')
+        self.assertIn('Solfeggio 396Hz, 528Hz', resultado['analise'])
+        self.assertNotIn('abaixo de 60Hz', resultado['analise'])
+
+    def test_schumann_nao_pontua_duas_vezes(self):
+        resultado = pontuar_evp('', [7.83, 14.3])
+        self.assertEqual(resultado['nota_paranormal'], 2)
+        self.assertEqual(resultado['classificacao'], 'ruido')
+        self.assertFalse(resultado['e_anomalia'])
+
+    def test_voz_humana_sem_anomalia(self):
+        resultado = pontuar_evp('olá tudo bem', [])
+        self.assertEqual((resultado['classificacao'], resultado['nota_paranormal']), ('voz_humana', 2))
+
+
+@override_settings(GHOST_EVP_PREFILTRO_NOTA=2)
+class MereceIATests(SimpleTestCase):
+    def test_limiar_do_prefiltro(self):
+        self.assertTrue(merece_ia({'nota_paranormal': 2}))
+        self.assertFalse(merece_ia({'nota_paranormal': 1}))
+        with override_settings(GHOST_EVP_PREFILTRO_NOTA=5):
+            self.assertFalse(merece_ia(pontuar_evp('olá tudo bem', [])))
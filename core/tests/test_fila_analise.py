@@ -0,0 +1,130 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core.models import TarefaAnalise
+from core.services.fila_analise import PRIORIDADE_ALTA, AnaliseWorker, backoff, enfileirar, worker_embutido
+
+
+def _tarefa(tipo='evidencia', objeto_id=1, **campos):
+    return TarefaAnalise.objects.create(tipo=tipo, objeto_id=objeto_id, **campos)
+
+
+@override_settings(GHOST_FILA_BACKOFF=5, GHOST_FILA_BACKOFF_MAX=30)
+class BackoffTests(SimpleTestCase):
+    def test_dobra_a_cada_tentativa_ate_o_teto(self):
+        self.assertEqual([backoff(n) for n in range(0, 6)], [5, 5, 10, 20, 30, 30])
+
+
+class EnfileirarTests(TestCase):
+    def setUp(self):
+        for nome in ('iniciar', 'acordar'):
+            patcher = mock.patch.object(worker_embutido, nome)
+            setattr(self, nome, patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def test_sem_worker_dedicado_o_processo_web_consome(self):
+        # Padrão: runserver/deploy de um processo só não deixa tarefas pendentes para sempre
+        enfileirar('evidencia', 1)
+        self.iniciar.assert_called_once()
+
+    @override_settings(GHOST_FILA_WORKER_EMBUTIDO=False)
+    def test_com_worker_dedicado_so_grava_a_tarefa(self):
+        tarefa = enfileirar('evp', 2)
+        self.iniciar.assert_not_called()
+        self.assertEqual((tarefa.status, tarefa.tipo), ('pendente', 'evp'))
+
+
+@override_settings(GHOST_EVP_LOTE_MAX=3, GHOST_EVP_LOTE_JANELA=2,
+                   GHOST_FILA_BACKOFF=5, GHOST_FILA_BACKOFF_MAX=300, GHOST_FILA_TIMEOUT_TAREFA=300)
+class AnaliseWorkerTests(TestCase):
+    def setUp(self):
+        self.worker = AnaliseWorker(threads=2, nome='w1')
+
+    def test_reservar_nao_entrega_a_mesma_tarefa_a_dois_workers(self):
+        tarefa = _tarefa()
+        agora = timezone.now()
+        self.assertEqual(self.worker._reservar([tarefa.id], agora), [tarefa])
+        self.assertEqual(AnaliseWorker(nome='w2')._reservar([tarefa.id], agora), [])
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.worker), ('processando', 'w1'))
+
+    def test_reivindicar_respeita_prioridade_e_limite(self):
+        normal = _tarefa(objeto_id=1)
+        urgente = _tarefa(objeto_id=2, prioridade=PRIORIDADE_ALTA)
+        _tarefa(objeto_id=3, agendada_para=timezone.now() + timedelta(minutes=1))  # em backoff
+
+        unidades = self.worker.reivindicar(5)
+        self.assertEqual([[t.id for t in u] for u in unidades], [[urgente.id], [normal.id]])
+        self.assertEqual(self.worker.reivindicar(5), [])
+
+    def test_lote_evp_espera_a_janela(self):
+        _tarefa('evp', 1)
+        _tarefa('evp', 2)
+        self.assertEqual(self.worker.reivindicar(2), [])
+        self.assertIsNotNone(self.worker._proxima_janela)
+
+        TarefaAnalise.objects.update(agendada_para=timezone.now() - timedelta(seconds=5))
+        unidades = self.worker.reivindicar(2)
+        self.assertEqual(len(unidades), 1)
+        self.assertEqual(sorted(t.objeto_id for t in unidades[0]), [1, 2])
+        self.assertIsNone(self.worker._proxima_janela)
+
+    def test_lote_evp_cheio_sai_na_hora_e_limitado(self):
+        for objeto_id in range(1, 6):
+            _tarefa('evp', objeto_id)
+        _tarefa('evidencia', 9)
+
+        unidades = self.worker.reivindicar(2)
+        self.assertEqual([len(u) for u in unidades], [3, 1])
+        self.assertEqual(unidades[1][0].tipo, 'evidencia')
+        self.assertEqual(TarefaAnalise.objects.filter(status='pendente').count(), 2)
+
+    def test_falhar_reagenda_com_backoff_e_desiste_no_limite(self):
+        tarefa = _tarefa(max_tentativas=2)
+        antes = timezone.now()
+        self.worker._falhar(tarefa, RuntimeError('timeout'))
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ('pendente', 1))
+        self.assertGreaterEqual(tarefa.agendada_para, antes + timedelta(seconds=5))
+        self.assertEqual(tarefa.erro, 'RuntimeError: timeout')
+
+        with self.assertLogs('core.services.fila_analise', 'WARNING'):
+            self.worker._falhar(tarefa, RuntimeError('timeout'))
+        tarefa.refresh_from_db()
+        self.assertEqual((tarefa.status, tarefa.tentativas), ('falhou', 2))
+        self.assertIsNotNone(tarefa.concluida_em)
+        self.assertEqual(self.worker.total_falhas, 1)
+
+    def test_orfa_recuperada_conta_como_tentativa(self):
+        velha = timezone.now() - timedelta(minutes=10)
+        orfa = _tarefa(status='processando', worker='morto', iniciada_em=velha)
+        ultima = _tarefa(objeto_id=2, status='processando', worker='morto', iniciada_em=velha,
+                         tentativas=2, max_tentativas=3)
+        recente = _tarefa(objeto_id=3, status='processando', worker='vivo', iniciada_em=timezone.now())
+
+        with self.assertLogs('core.services.fila_analise', 'WARNING'):
+            self.assertEqual(self.worker.recuperar_orfas(), 2)
+        for t in (orfa, ultima, recente):
+            t.refresh_from_db()
+        self.assertEqual((orfa.status, orfa.tentativas), ('pendente', 1))
+        self.assertIn('TimeoutError', orfa.erro)
+        self.assertEqual((ultima.status, ultima.tentativas), ('falhou', 3))
+        self.assertEqual((recente.status, recente.tentativas), ('processando', 0))
+
+    def test_loop_recupera_orfas_periodicamente(self):
+        with override_settings(GHOST_FILA_RECUPERAR_INTERVALO=60), \
+                mock.patch.object(self.worker, 'recuperar_orfas', return_value=0) as recuperar, \
+                mock.patch('core.services.fila_analise.time.monotonic', side_effect=[100.0, 130.0, 161.0]):
+            for _ in range(3):
+                self.worker._recuperar_periodicamente()
+        self.assertEqual(recuperar.call_count, 2)
+
+    def test_parar_espera_o_despachante_antes_do_executor(self):
+        ordem = []
+        self.worker._dispatcher = mock.Mock(join=lambda timeout=None: ordem.append('join'))
+        self.worker._executor = mock.Mock(shutdown=lambda wait: ordem.append('shutdown'))
+        self.worker.parar()
+        self.assertEqual(ordem, ['join', 'shutdown'])
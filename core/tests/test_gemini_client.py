@@ -0,0 +1,34 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from core.services import gemini_client
+from core.services.gemini_client import PERFIS_CONHECIDOS, GeminiClientPool
+
+
+@override_settings(GEMINI_API_KEY='teste', GHOST_GEMINI_AQUECER=True)
+class AquecerTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(gemini_client, 'HAS_GEMINI', True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = GeminiClientPool()
+        self.model = mock.Mock()
+        self.pool.modelo = mock.Mock(return_value=self.model)
+
+    def test_cria_perfis_e_abre_o_canal_por_api_publica(self):
+        self.assertTrue(self.pool.aquecer(em_background=False))
+        self.assertEqual([c.args for c in self.pool.modelo.call_args_list], list(PERFIS_CONHECIDOS))
+        self.model.count_tokens.assert_called_once()
+
+    def test_falha_de_rede_nao_propaga(self):
+        self.model.count_tokens.side_effect = OSError('sem rede')
+        with self.assertLogs('core.services.gemini_client', 'WARNING'):
+            self.assertFalse(self.pool.aquecer(em_background=False))
+
+    def test_desligado_por_setting_ou_sem_chave(self):
+        with override_settings(GHOST_GEMINI_AQUECER=False):
+            self.assertIsNone(self.pool.aquecer())
+        with override_settings(GEMINI_API_KEY=''):
+            self.assertIsNone(self.pool.aquecer())
+        self.pool.modelo.assert_not_called()
@@ -0,0 +1,150 @@
+import os
+import tempfile
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.models import Evidencia, SessaoInvestigacao
+from core.services import itc_analyzer
+from core.services.itc_scheduler import ITCScheduler
+from core.services.vision_cache import dhash
+
+ANOMALIA = {
+    'pareidolia_detectada': True,
+    'classificacao': 'Silhueta',
+    'confianca': 82.0,
+    'decodificacao': 'Forma humanoide no canto.',
+}
+
+
+class ProcessarAnaliseITCTests(TestCase):
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        for patcher in (
+            mock.patch.object(itc_analyzer, 'analisar_frame_itc', return_value=dict(ANOMALIA)),
+            mock.patch.object(itc_analyzer.space_weather, 'get_kp_index', return_value=4.33),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_anomalia_grava_jpeg_e_evidencia(self):
+        sessao = SessaoInvestigacao.objects.create(titulo='Vigília', status='ativa')
+        with override_settings(MEDIA_ROOT=self.media.name):
+            analise = itc_analyzer.processar_analise_itc(b'vision', b'evidencia', origem='TESTE')
+
+        self.assertTrue(analise['nova_evidencia'])
+        self.assertIsNone(analise['fusao'])
+        evidencia = Evidencia.objects.get()
+        self.assertEqual(evidencia.sessao, sessao)
+        self.assertEqual(evidencia.tipo, 'visual')
+        self.assertEqual(evidencia.origem_disparo, 'TESTE')
+        self.assertEqual(evidencia.ia_classificacao, 'Silhueta')
+        self.assertEqual(evidencia.score_coincidencia, 3)
+        self.assertEqual(evidencia.kp_index_captura, 4.33)
+        self.assertIsNone(evidencia.fusao_dados)
+        self.assertEqual(evidencia.imagem_url, analise['evidencia_url'])
+        caminho = os.path.join(self.media.name, 'evidencias', os.path.basename(evidencia.imagem_url))
+        with open(caminho, 'rb') as f:
+            self.assertEqual(f.read(), b'evidencia')
+
+    def test_sem_anomalia_nao_grava(self):
+        itc_analyzer.analisar_frame_itc.return_value = {**ANOMALIA, 'pareidolia_detectada': False, 'confianca': 10.0}
+        with override_settings(MEDIA_ROOT=self.media.name):
+            analise = itc_analyzer.processar_analise_itc(b'vision')
+        self.assertFalse(analise['nova_evidencia'])
+        self.assertFalse(Evidencia.objects.exists())
+
+    def test_resultado_do_cache_nao_duplica_evidencia(self):
+        itc_analyzer.analisar_frame_itc.return_value = {**ANOMALIA, 'cache': True}
+        with override_settings(MEDIA_ROOT=self.media.name):
+            analise = itc_analyzer.processar_analise_itc(b'vision')
+        self.assertFalse(analise['nova_evidencia'])
+        self.assertTrue(analise['resultado']['cache'])
+        self.assertFalse(Evidencia.objects.exists())
+
+
+@override_settings(GEMINI_API_KEY='teste')
+class AnalisarFrameITCTests(SimpleTestCase):
+    def test_cena_repetida_volta_marcada_do_cache(self):
+        from core.services.vision_cache import vision_cache
+        jpeg = cv2.imencode('.jpg', np.random.default_rng(0).integers(0, 256, (64, 64, 3), dtype=np.uint8))[1].tobytes()
+        self.addCleanup(vision_cache.limpar)
+        vision_cache.guardar('itc', dhash(jpeg), ANOMALIA)
+
+        with mock.patch.object(itc_analyzer, 'HAS_GEMINI', True), \
+                mock.patch.object(itc_analyzer.gemini_pool, 'gerar') as gerar:
+            resultado = itc_analyzer.analisar_frame_itc(jpeg)
+
+        gerar.assert_not_called()
+        self.assertTrue(resultado['cache'])
+        self.assertEqual(resultado['classificacao'], 'Silhueta')
+
+
+class CameraFalsa:
+    def __init__(self):
+        self.frames = {}
+
+    def get_frame_by_seq(self, seq):
+        return self.frames.get(seq)
+
+
+def _motion(seq, percentual):
+    return {'seq': seq, 'score': 100, 'percentual': percentual, 'percentual_suave': percentual}
+
+
+@override_settings(GHOST_ITC_SCHEDULER_LIMIAR=1.5, GHOST_ITC_SCHEDULER_COOLDOWN=20,
+                   GHOST_ITC_SCHEDULER_RAJADA_MAX=3)
+class ITCSchedulerTests(SimpleTestCase):
+    def setUp(self):
+        self.camera = CameraFalsa()
+        self.scheduler = ITCScheduler()
+        self.scheduler._camera = self.camera
+        self.enviados = []
+        self.scheduler._enviar = self.enviados.append
+        rng = np.random.default_rng(0)
+        self.borrado = np.full((64, 64, 3), 128, dtype=np.uint8)
+        self.nitido = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+
+    def test_envia_o_frame_mais_nitido_da_rajada(self):
+        self.camera.frames = {1: self.borrado, 2: self.nitido, 3: self.borrado}
+        with mock.patch('core.services.itc_scheduler.time.monotonic', return_value=100.0):
+            for seq in (1, 2, 3):
+                self.scheduler._observar(seq, _motion(seq, 5.0))
+            self.assertEqual(self.enviados, [])
+            self.scheduler._observar(4, _motion(4, 0.0))  # movimento parou: fecha a rajada
+
+        self.assertEqual(len(self.enviados), 1)
+        self.assertEqual(self.enviados[0][1], 2)
+        self.assertEqual(self.scheduler.total_rajadas, 1)
+
+    def test_rajada_longa_forca_envio(self):
+        self.camera.frames = {1: self.nitido, 2: self.borrado}
+        with mock.patch('core.services.itc_scheduler.time.monotonic', side_effect=[100.0, 103.5]):
+            self.scheduler._observar(1, _motion(1, 5.0))
+            self.scheduler._observar(2, _motion(2, 5.0))
+        self.assertEqual([m[1] for m in self.enviados], [1])
+
+    def test_cooldown_e_analise_em_curso_bloqueiam_nova_rajada(self):
+        self.camera.frames = {1: self.nitido, 3: self.nitido, 5: self.nitido}
+        with mock.patch('core.services.itc_scheduler.time.monotonic', return_value=100.0):
+            self.scheduler._observar(1, _motion(1, 5.0))
+            self.scheduler._observar(2, _motion(2, 0.0))
+        with mock.patch('core.services.itc_scheduler.time.monotonic', return_value=110.0):
+            self.scheduler._observar(3, _motion(3, 5.0))  # ainda no cooldown
+            self.scheduler._observar(4, _motion(4, 0.0))
+        self.scheduler._analisando = True
+        with mock.patch('core.services.itc_scheduler.time.monotonic', return_value=130.0):
+            self.scheduler._observar(5, _motion(5, 5.0))  # análise anterior não terminou
+
+        self.assertEqual(len(self.enviados), 1)
+        self.assertEqual(self.scheduler.total_rajadas, 1)
+
+    def test_movimento_abaixo_do_limiar_ignorado(self):
+        self.camera.frames = {1: self.nitido}
+        self.scheduler._observar(1, _motion(1, 1.0))
+        self.scheduler._observar(2, _motion(2, 0.0))
+        self.assertEqual(self.enviados, [])
+        self.assertEqual(self.scheduler.total_rajadas, 0)
@@ -0,0 +1,55 @@
+from django.test import SimpleTestCase, override_settings
+
+from core.services.memoria_dialogo import (
+    estimar_tokens, incorporar_ao_resumo, janela_historico, preparar_historico,
+)
+
+
+def _msg(autor, texto):
+    return {'autor': autor, 'mensagem': texto}
+
+
+class JanelaHistoricoTests(SimpleTestCase):
+    def test_mantem_os_turnos_mais_recentes_no_orcamento(self):
+        historico = [_msg('OBSERVADOR', 'a' * 40), _msg('AURA', 'b' * 40), _msg('OBSERVADOR', 'c' * 40)]
+        janela, antigas = janela_historico(historico, orcamento_tokens=2 * estimar_tokens('x' * 40))
+        self.assertEqual([m['mensagem'][0] for m in janela], ['b', 'c'])
+        self.assertEqual([m['mensagem'][0] for m in antigas], ['a'])
+
+    def test_ignora_autores_fora_do_dialogo(self):
+        historico = [_msg('SISTEMA', 'boot'), _msg('OBSERVADOR', 'oi'), _msg('NEURO-VOICE', 'zzz')]
+        janela, antigas = janela_historico(historico, orcamento_tokens=100)
+        self.assertEqual(janela, [_msg('OBSERVADOR', 'oi')])
+        self.assertEqual(antigas, [])
+
+    def test_turno_maior_que_o_orcamento_fica_fora(self):
+        janela, antigas = janela_historico([_msg('AURA', 'x' * 400)], orcamento_tokens=10)
+        self.assertEqual(janela, [])
+        self.assertEqual(len(antigas), 1)
+        self.assertEqual(janela_historico(None, orcamento_tokens=10), ([], []))
+
+
+class ResumoRolanteTests(SimpleTestCase):
+    def test_acrescenta_linhas_curtas_ao_resumo(self):
+        resumo = incorporar_ao_resumo('OBSERVADOR: antes', [
+            _msg('AURA', 'resposta   com\nquebras'), _msg('SISTEMA', 'ignorado'), _msg('OBSERVADOR', 'y' * 300),
+        ], limite_chars=10000)
+        linhas = resumo.split('\n')
+        self.assertEqual(linhas[:2], ['OBSERVADOR: antes', 'AURA: resposta com quebras'])
+        self.assertEqual(len(linhas), 3)
+        self.assertTrue(linhas[2].endswith('...'))
+        self.assertEqual(len(linhas[2]), len('OBSERVADOR: ') + 160)
+
+    def test_corta_no_limite_sem_linha_pela_metade(self):
+        mensagens = [_msg('AURA', f'turno {i:02d}') for i in range(20)]
+        resumo = incorporar_ao_resumo('', mensagens, limite_chars=50)
+        self.assertLessEqual(len(resumo), 50)
+        self.assertTrue(all(linha.startswith('AURA: turno ') for linha in resumo.split('\n')))
+        self.assertTrue(resumo.endswith('turno 19'))
+
+    @override_settings(GHOST_AURA_HISTORICO_TOKENS=8, GHOST_AURA_RESUMO_CHARS=1200)
+    def test_preparar_historico_usa_os_settings(self):
+        historico = [_msg('OBSERVADOR', 'primeira pergunta longa'), _msg('AURA', 'resposta curta')]
+        janela, resumo = preparar_historico(historico, resumo='')
+        self.assertEqual(janela, [_msg('AURA', 'resposta curta')])
+        self.assertEqual(resumo, 'OBSERVADOR: primeira pergunta longa')
@@ -0,0 +1,52 @@
+import numpy as np
+from django.test import SimpleTestCase
+
+from core.camera import MotionEngine
+
+
+def _frame(valor=0, w=160, h=120):
+    return np.full((h, w, 3), valor, dtype=np.uint8)
+
+
+class MotionEngineTests(SimpleTestCase):
+    def test_modo_invalido(self):
+        with self.assertRaises(ValueError):
+            MotionEngine(modo='optical_flow')
+
+    def test_cena_parada_sem_movimento(self):
+        for modo in MotionEngine.MODOS:
+            motor = MotionEngine(modo=modo, escala=0.5)
+            motor.atualizar(1, _frame(40))
+            resultado = motor.atualizar(2, _frame(40))
+            self.assertEqual(resultado['seq'], 2)
+            self.assertEqual(resultado['score'], 0)
+            self.assertEqual(resultado['percentual'], 0.0)
+            self.assertIsNone(resultado['regiao_max'])
+
+    def test_movimento_localizado_na_regiao(self):
+        motor = MotionEngine(modo='diff', escala=0.5, grade=(2, 2), suavizacao=1.0)
+        motor.atualizar(1, _frame(0))
+        frame = _frame(0)
+        frame[60:, 80:] = 255  # quadrante inferior direito
+        resultado = motor.atualizar(2, frame)
+
+        self.assertEqual(resultado['regiao_max'], [1, 1])
+        self.assertGreater(resultado['regioes'][1][1], 0.5)
+        self.assertEqual(resultado['regioes'][0][0], 0.0)
+        self.assertGreater(resultado['percentual'], 10)
+        self.assertEqual(resultado['percentual_suave'], resultado['percentual'])
+
+    def test_fundo_absorve_mudanca_persistente(self):
+        motor = MotionEngine(modo='background', escala=0.5, alpha=0.5)
+        motor.atualizar(1, _frame(0))
+        primeiro = motor.atualizar(2, _frame(200))
+        for seq in range(3, 15):
+            ultimo = motor.atualizar(seq, _frame(200))
+        self.assertGreater(primeiro['percentual'], 90)
+        self.assertEqual(ultimo['percentual'], 0.0)
+
+    def test_reset_descarta_referencia(self):
+        motor = MotionEngine(modo='diff', escala=0.5)
+        motor.atualizar(1, _frame(0))
+        motor.reset()
+        self.assertEqual(motor.atualizar(2, _frame(255))['score'], 0)
@@ -0,0 +1,71 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from core.services import site_sentinel as modulo
+from core.services.site_sentinel import SiteSentinel
+
+from .test_aura_state import CACHE_TESTE, outro_processo
+
+
+class SentinelFalso(SiteSentinel):
+    """Sentinel sem rede: o status de cada site vem de `status`."""
+    SITES_TO_MONITOR = [{'name': 'Scalabis', 'url': 'https://scalabis.invalid'}]
+
+    def __init__(self):
+        super().__init__()
+        self.status = 'ONLINE'
+
+    def _verificar_site(self, site):
+        return {'nome': site['name'], 'status': self.status}
+
+
+@override_settings(CACHES=CACHE_TESTE, GHOST_ESTADO_BACKEND='cache', GHOST_ESTADO_CACHE='estado',
+                   GHOST_ESTADO_PREFIXO='ghost:teste-sentinel', GHOST_ESTADO_TTL_LOCAL=0,
+                   GHOST_SENTINEL_INTERVALO=60, GHOST_SENTINEL_TIMEOUT=10)
+class SentinelEntreProcessosTests(SimpleTestCase):
+    """Dois workers, cada um com seu sentinel e seu AuraState, no mesmo backend de estado."""
+
+    def setUp(self):
+        caches['estado'].clear()
+        with self.assertLogs('core.services.estado_backend', 'WARNING'):  # LocMem só serve ao teste
+            self.auras = [outro_processo(), outro_processo()]
+        self.sentinels = [SentinelFalso(), SentinelFalso()]
+        for sentinel in self.sentinels:
+            self.addCleanup(lambda s=sentinel: s._executor and s._executor.shutdown())
+
+    def rodada(self, i):
+        with mock.patch.object(modulo, 'aura_state', self.auras[i]):
+            return self.sentinels[i]._rodada()
+
+    def alertas(self):
+        aura = self.auras[0]
+        aura._sincronizar()
+        return [m['mensagem'] for m in aura.mensagens() if m['autor'] == 'AURA']
+
+    def test_so_o_dono_verifica_e_outro_assume_quando_ele_some(self):
+        self.assertIsNotNone(self.rodada(0))
+        self.assertIsNone(self.rodada(1))
+        self.assertIsNotNone(self.rodada(0))  # renova a liderança
+        self.assertEqual([s.total_rodadas for s in self.sentinels], [2, 0])
+
+        caches['estado'].delete('ghost:teste-sentinel:aura:__lider_sentinel__')  # TTL venceu: dono morreu
+        self.assertIsNotNone(self.rodada(1))
+        self.assertIsNone(self.rodada(0))
+        self.auras[1]._sincronizar()
+        self.assertEqual(self.auras[1].site_status, [{'nome': 'Scalabis', 'status': 'ONLINE'}])
+
+    def test_queda_gera_um_unico_alerta(self):
+        for sentinel in self.sentinels:
+            sentinel.status = 'OFFLINE'
+        self.rodada(0)
+        caches['estado'].delete('ghost:teste-sentinel:aura:__lider_sentinel__')
+        self.rodada(1)  # novo dono compara com o relatório publicado, não com a memória dele
+        self.assertEqual(len(self.alertas()), 1)
+        self.assertIn('CRÍTICO', self.alertas()[0])
+
+        self.sentinels[1].status = 'ONLINE'
+        self.rodada(1)
+        self.assertEqual(len(self.alertas()), 2)
+        self.assertIn('voltou', self.alertas()[-1].lower())
@@ -0,0 +1,84 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+from unittest import mock
+
+from django.db import OperationalError
+from django.test import TestCase, override_settings
+
+from core.models import LeituraKp
+from core.services.space_weather import SpaceWeatherService, _parse_leituras
+
+RESPOSTA_NOAA = [
+    ['time_tag', 'Kp', 'a_running', 'station_count'],
+    ['2026-02-25 15:00:00.000', '3.00', '15', 'observed'],
+    ['2026-02-25 18:00:00.000', '5.33', '48', 'estimated'],
+]
+
+
+def _momento(hora):
+    return datetime(2026, 2, 25, hora, tzinfo=dt_timezone.utc)
+
+
+@override_settings(GHOST_KP_INTERVALO=3600, GHOST_KP_BACKOFF=60, GHOST_KP_BACKOFF_MAX=1800)
+class SpaceWeatherTests(TestCase):
+    def setUp(self):
+        self.servico = SpaceWeatherService()
+        patcher = mock.patch.object(self.servico, '_revalidar_em_background')
+        self.revalidar = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_parse_tabela_e_objetos(self):
+        self.assertEqual(_parse_leituras(RESPOSTA_NOAA)[-1], (_momento(18), 5.33, 'estimated'))
+        self.assertEqual(_parse_leituras([{'time_tag': '2026-02-25T15:00:00', 'kp': 2}]),
+                         [(_momento(15), 2.0, '')])
+
+    def test_primeira_leitura_parte_do_historico_gravado(self):
+        LeituraKp.objects.create(momento=_momento(15), kp=4.67, status='observed')
+        with self.assertNumQueries(1):
+            self.assertEqual(self.servico.get_kp_index(), 4.67)
+        with self.assertNumQueries(0):
+            self.servico.get_kp_index()
+        self.assertEqual(self.revalidar.call_count, 2)  # valor da memória venceu: refresh em background
+
+    def test_historico_indisponivel_tenta_de_novo_apos_o_backoff(self):
+        LeituraKp.objects.create(momento=_momento(15), kp=4.67, status='observed')
+        filtro = LeituraKp.objects.filter
+        with mock.patch.object(LeituraKp.objects, 'filter', side_effect=OperationalError('database is locked')), \
+                self.assertLogs('core.services.space_weather', 'WARNING'):
+            self.assertEqual(self.servico.get_kp_index(), 1.0)
+        inicio = time.time()
+        with mock.patch.object(LeituraKp.objects, 'filter', wraps=filtro) as consulta:
+            with mock.patch('core.services.space_weather.time.time', return_value=inicio + 30):
+                self.assertEqual(self.servico.get_kp_index(), 1.0)  # ainda no backoff: nem consulta
+            consulta.assert_not_called()
+            with mock.patch('core.services.space_weather.time.time', return_value=inicio + 61):
+                self.assertEqual(self.servico.get_kp_index(), 4.67)
+            consulta.assert_called_once()
+
+    def test_atualizar_grava_historico_com_upsert(self):
+        LeituraKp.objects.create(momento=_momento(15), kp=2.0, status='estimated')
+        resposta = mock.Mock(json=mock.Mock(return_value=RESPOSTA_NOAA))
+        with mock.patch('core.services.space_weather.requests.get', return_value=resposta):
+            self.assertTrue(self.servico.atualizar())
+
+        self.assertEqual(self.servico.cached_kp, 5.33)
+        self.assertEqual(LeituraKp.objects.get(momento=_momento(15)).status, 'observed')
+        self.assertEqual(LeituraKp.objects.count(), 2)
+        self.servico.get_kp_index()
+        self.revalidar.assert_not_called()  # ainda fresco
+
+    def test_falha_entra_em_backoff(self):
+        with mock.patch('core.services.space_weather.requests.get', side_effect=OSError('offline')), \
+                self.assertLogs('core.services.space_weather', 'WARNING'):
+            self.assertFalse(self.servico.atualizar())
+            self.assertFalse(self.servico.atualizar())
+        self.assertEqual(self.servico.cached_kp, 1.0)
+        self.assertEqual(self.servico._backoff(), 120)
+        self.servico.get_kp_index()
+        self.revalidar.assert_not_called()
+
+    def test_reset_da_aura_nao_le_o_kp(self):
+        from core.services.aura_state import aura_state
+        with mock.patch('core.services.aura_state.space_weather') as space_weather:
+            aura_state.reset()
+        space_weather.get_kp_index.assert_not_called()
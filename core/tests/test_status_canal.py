@@ -0,0 +1,74 @@
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase
+
+from core.services.aura_state import aura_state
+from core.services.status_canal import StatusCanal, delta_estado
+from core.views import _evento_status, _seq_inicial
+
+
+class DeltaEstadoTests(SimpleTestCase):
+    def test_so_campos_alterados_novos_e_removidos(self):
+        anterior = {'coerencia': 10, 'kp_index': 2.0, 'site_reports': [{'nome': 'A'}], 'antigo': 1}
+        atual = {'coerencia': 12, 'kp_index': 2.0, 'site_reports': [{'nome': 'A'}], 'novo': 'x'}
+        self.assertEqual(delta_estado(anterior, atual), {'coerencia': 12, 'novo': 'x', 'antigo': None})
+
+    def test_sem_mudanca_e_vazio(self):
+        estado = {'brain_waves': {'alpha': 1.0}, 'chakras': {'cardiaco': 100}}
+        self.assertEqual(delta_estado(estado, {k: dict(v) for k, v in estado.items()}), {})
+        self.assertEqual(delta_estado({}, {}), {})
+
+
+class StatusCanalEventosTests(SimpleTestCase):
+    def setUp(self):
+        self.canal = StatusCanal()
+        self.snapshot = mock.patch.object(self.canal, 'snapshot').start()
+        self.mensagens = mock.patch.object(StatusCanal, 'mensagens_desde', return_value=[]).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_conexao_nova_recebe_estado_completo(self):
+        self.snapshot.return_value = (1, {'coerencia': 5})
+        saida, seq, cliente = self.canal.eventos(0, None)
+        self.assertEqual(saida, [('estado', {'coerencia': 5})])
+        self.assertEqual(cliente, {'versao': 1, 'estado': {'coerencia': 5}})
+
+    def test_versao_igual_nao_envia_nada(self):
+        self.snapshot.return_value = (3, {'coerencia': 5})
+        saida, seq, _ = self.canal.eventos(7, {'versao': 3, 'estado': {'coerencia': 1}})
+        self.assertEqual((saida, seq), ([], 7))
+
+    def test_versao_nova_envia_delta_e_mensagens_por_seq(self):
+        self.snapshot.return_value = (4, {'coerencia': 6, 'kp_index': 2.0})
+        self.mensagens.return_value = [{'seq': 8, 'autor': 'AURA', 'mensagem': 'oi'}]
+        saida, seq, _ = self.canal.eventos(7, {'versao': 3, 'estado': {'coerencia': 5, 'kp_index': 2.0}})
+        self.assertEqual(saida, [('delta', {'coerencia': 6}), ('mensagens', {'itens': self.mensagens.return_value})])
+        self.assertEqual(seq, 8)
+        self.mensagens.assert_called_with(7)
+
+
+class RetomadaPorSeqTests(SimpleTestCase):
+    def setUp(self):
+        aura_state.reset()
+        self.addCleanup(aura_state.reset)
+        aura_state.adicionar_mensagem('OBSERVADOR', 'olá')
+        self.epoca, self.seq = aura_state.epoca_mensagens, aura_state.seq_mensagens
+
+    def seq_inicial(self, **headers):
+        return _seq_inicial(RequestFactory().get('/api/aura/status/stream/', **headers))
+
+    def test_mesma_epoca_retoma_do_seq(self):
+        self.assertEqual(self.seq_inicial(HTTP_LAST_EVENT_ID=f'{self.epoca}:{self.seq}'), self.seq)
+        self.assertEqual(_seq_inicial(RequestFactory().get('/', {'desde': self.seq - 1, 'epoca': self.epoca})),
+                         self.seq - 1)
+        self.assertTrue(_evento_status('mensagens', {}, self.seq).startswith(f'id: {self.epoca}:{self.seq}\n'))
+
+    def test_processo_reiniciado_recomeca_do_zero(self):
+        # Cliente da época anterior (seq alto) não pode filtrar as mensagens da nova
+        self.assertEqual(self.seq_inicial(HTTP_LAST_EVENT_ID=f'outra:{self.seq + 40}'), 0)
+        self.assertEqual(self.seq_inicial(HTTP_LAST_EVENT_ID=f'outra:{self.seq}'), 0)
+        self.assertEqual(self.seq_inicial(HTTP_LAST_EVENT_ID=str(self.seq + 40)), 0)  # id sem época
+        self.assertEqual(self.seq_inicial(HTTP_LAST_EVENT_ID='lixo'), 0)
+
+    def test_reset_da_sessao_mantem_a_epoca(self):
+        aura_state.reset()
+        self.assertEqual((aura_state.epoca_mensagens, aura_state.seq_mensagens), (self.epoca, self.seq))
@@ -0,0 +1,38 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from core.camera import StreamNode
+
+
+class StreamNodeTests(SimpleTestCase):
+    def test_processa_uma_vez_por_seq(self):
+        chamadas = []
+        node = StreamNode('raw', lambda seq, frame: chamadas.append(seq) or f'bytes-{seq}')
+
+        self.assertEqual(node.obter(1, object()), 'bytes-1')
+        self.assertEqual(node.obter(1, object()), 'bytes-1')
+        self.assertEqual(node.obter(2, object()), 'bytes-2')
+        self.assertEqual(chamadas, [1, 2])
+
+    def test_assinantes_simultaneos_reaproveitam_o_resultado(self):
+        chamadas = []
+        liberar = threading.Event()
+
+        def processar(seq, frame):
+            chamadas.append(seq)
+            liberar.wait(1)
+            return object()
+
+        node = StreamNode('itc', processar)
+        resultados = []
+        threads = [threading.Thread(target=lambda: resultados.append(node.obter(7, None))) for _ in range(5)]
+        for t in threads:
+            t.start()
+        liberar.set()
+        for t in threads:
+            t.join(2)
+
+        self.assertEqual(chamadas, [7])
+        self.assertEqual(len(resultados), 5)
+        self.assertTrue(all(r is resultados[0] for r in resultados))
@@ -0,0 +1,64 @@
+from unittest import mock
+
+import cv2
+import numpy as np
+from django.test import SimpleTestCase
+
+from core.services.vision_cache import VisionResultCache, dhash, distancia_hamming
+
+
+def _cena(seed=0):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 256, (120, 160, 3), dtype=np.uint8), (15, 15), 0)
+
+
+class DHashTests(SimpleTestCase):
+    def test_recompressao_e_ruido_leve_mantem_o_hash_proximo(self):
+        cena = _cena()
+        _, jpeg = cv2.imencode('.jpg', cena, [cv2.IMWRITE_JPEG_QUALITY, 90])
+        _, jpeg_ruim = cv2.imencode('.jpg', cena, [cv2.IMWRITE_JPEG_QUALITY, 40])
+
+        self.assertLessEqual(distancia_hamming(dhash(jpeg.tobytes()), dhash(jpeg_ruim.tobytes())), 6)
+        self.assertLessEqual(distancia_hamming(dhash(cena), dhash(cv2.add(cena, 3))), 6)
+
+    def test_cenas_diferentes_se_afastam(self):
+        self.assertGreater(distancia_hamming(dhash(_cena(0)), dhash(_cena(1))), 6)
+
+    def test_aceita_cinza_e_rejeita_bytes_invalidos(self):
+        cena = _cena()
+        self.assertEqual(dhash(cv2.cvtColor(cena, cv2.COLOR_BGR2GRAY)), dhash(cena))
+        self.assertIsNone(dhash(b'nao-e-jpeg'))
+        self.assertLess(dhash(cena), 2 ** 64)
+
+
+class VisionResultCacheTests(SimpleTestCase):
+    def test_busca_por_vizinho_mais_proximo_no_namespace(self):
+        cache = VisionResultCache(distancia_max=2)
+        cache.guardar('itc', 0b0000, {'classificacao': 'A'})
+        cache.guardar('itc', 0b1111, {'classificacao': 'B'})
+        cache.guardar('evidencia', 0b0001, {'classificacao': 'C'})
+
+        self.assertEqual(cache.buscar('itc', 0b0001)['classificacao'], 'A')
+        self.assertEqual(cache.buscar('itc', 0b0111)['classificacao'], 'B')
+        self.assertIsNone(cache.buscar('itc', 0b11110000))
+        self.assertIsNone(cache.buscar('itc', None))
+        self.assertEqual(cache.get_status(), {'itens': 3, 'hits': 2, 'misses': 1})
+
+    def test_devolve_copia(self):
+        cache = VisionResultCache()
+        cache.guardar('itc', 1, {'classificacao': 'A'})
+        cache.buscar('itc', 1)['classificacao'] = 'alterado'
+        self.assertEqual(cache.buscar('itc', 1)['classificacao'], 'A')
+
+    def test_ttl_e_lru(self):
+        cache = VisionResultCache(max_itens=2, ttl=10, distancia_max=0)
+        with mock.patch('core.services.vision_cache.time.monotonic', return_value=100.0):
+            cache.guardar('itc', 1, {'n': 1})
+            cache.guardar('itc', 2, {'n': 2})
+            cache.buscar('itc', 1)  # 1 passa a ser o mais recente
+            cache.guardar('itc', 3, {'n': 3})  # despeja o 2
+            self.assertIsNone(cache.buscar('itc', 2))
+            self.assertEqual(cache.buscar('itc', 1), {'n': 1})
+        with mock.patch('core.services.vision_cache.time.monotonic', return_value=111.0):
+            self.assertIsNone(cache.buscar('itc', 1))
+        self.assertEqual(cache.get_status()['itens'], 0)
@@ -21,6 +21,8 @@ urlpatterns = [
     # APIs — EVP
     path('api/evp/analisar/', views.api_evp_analisar, name='api_evp_analisar'),
     path('api/evp/registros/', views.api_evp_registros, name='api_evp_registros'),
+    path('api/evp/registro/<int:registro_id>/', views.api_evp_resultado, name='api_evp_resultado'),
+    path('api/evp/registro/<int:registro_id>/stream/', views.api_evp_resultado_stream, name='api_evp_resultado_stream'),
     path('api/evp/status/', views.api_evp_status, name='api_evp_status'),
     path('api/evp/iniciar/', views.api_iniciar_sessao_evp, name='api_iniciar_sessao_evp'),
     path('api/evp/encerrar/', views.api_encerrar_sessao_evp, name='api_encerrar_sessao_evp'),
@@ -29,12 +31,16 @@ urlpatterns = [
     path('itc/', views.itc_console, name='itc_console'),
     path('itc_video_feed/', views.itc_video_feed, name='itc_video_feed'),
     path('api/itc/analisar/', views.api_itc_analisar, name='api_itc_analisar'),
+    path('api/itc/motion/', views.api_itc_motion, name='api_itc_motion'),
+    path('api/itc/agendador/', views.api_itc_agendador, name='api_itc_agendador'),
     
     # Aura Synthesis (Fase 5)
     path('video_call/', views.video_call, name='video_call'),
     path('aura_video_feed/', views.aura_video_feed, name='aura_video_feed'),
     path('api/aura/send_seed/', views.api_aura_send_seed, name='api_aura_send_seed'),
+    path('api/aura/send_seed/stream/', views.api_aura_send_seed_stream, name='api_aura_send_seed_stream'),
     path('api/aura/status/', views.api_aura_status, name='api_aura_status'),
+    path('api/aura/status/stream/', views.api_aura_status_stream, name='api_aura_status_stream'),
     path('api/aura/toggle/', views.api_aura_toggle, name='api_aura_toggle'),
     path('api/aura/ping/', views.api_quantum_ping, name='api_aura_ping'),
     path('api/bio/update/', views.api_bio_update, name='api_bio_update'),
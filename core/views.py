@@ -1,8 +1,13 @@
 # core/views.py — Ghost Station Views (Refatorado)
 
+import asyncio
 import json
-import threading
+import time
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.shortcuts import render, get_object_or_404, redirect
+from django.urls import reverse
 from django.http import StreamingHttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
@@ -72,16 +77,11 @@ def gatilho_anomalia(request):
                 sessao.score_maximo = max(sessao.score_maximo, resultado.get('score', 0))
                 sessao.save()
 
-            # AI Analysis (async-like, in thread)
-            import threading
-            from .services.ia_analyzer import analisar_evidencia_async
+            # AI Analysis (fila persistente, pool fixo de workers)
+            from .services.fila_analise import PRIORIDADE_ALTA, enfileirar
             ev_id = resultado.get('id')
             if ev_id:
-                threading.Thread(
-                    target=analisar_evidencia_async,
-                    args=(ev_id,),
-                    daemon=True
-                ).start()
+                enfileirar('evidencia', ev_id, prioridade=PRIORIDADE_ALTA)
 
             return JsonResponse({
                 'status': 'capturado',
@@ -181,22 +181,100 @@ def api_status(request):
 
 
 # Feed de Vídeo (Streaming MJPEG)
-def gen(camera):
+def _parte_mjpeg(nome, resultado):
+    frame = resultado[0] if nome == 'itc' else resultado
+    if not frame:
+        return None
+    return (b'--frame\r\n'
+            b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n\r\n')
+
+
+def _intervalo_frames(perfil):
+    """Intervalo mínimo entre frames: o menor teto entre o perfil e o servidor."""
+    from .camera import obter_perfil
+    fps = min(obter_perfil(perfil)['fps'], getattr(settings, 'GHOST_STREAM_FPS_MAX', 15))
+    return 1.0 / max(fps, 0.1)
+
+
+def gen_stream(camera, nome, perfil='padrao'):
+    """
+    Gerador MJPEG genérico sobre o grafo de processamento da câmera.
+    Cada frame derivado é calculado uma vez por perfil e os mesmos bytes vão
+    para todos os viewers desse perfil.
+    """
+    intervalo = _intervalo_frames(perfil)
+    proximo = 0.0
+    seq = 0
     while True:
-        frame = camera.get_frame()
-        if frame:
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n\r\n')
+        # Teto de FPS por cliente
+        espera = proximo - time.monotonic()
+        if espera > 0:
+            time.sleep(espera)
+        proximo = time.monotonic() + intervalo
 
+        # Espera um frame novo no ring buffer da câmera (não reenvia o mesmo)
+        seq = camera.wait_frame(seq)
+        _, resultado = camera.get_stream(nome, perfil)
+        parte = _parte_mjpeg(nome, resultado)
+        if parte:
+            yield parte
 
-def video_feed(request):
-    cam = _get_camera()
+
+async def agen_stream(camera, nome, perfil='padrao'):
+    """
+    Versão async (ASGI) do gerador MJPEG: não prende uma thread por viewer.
+    Cada cliente tem uma fila de 1 posição; se ele estiver lento, frames
+    intermediários são descartados e ele sempre recebe o mais recente.
+    """
+    loop = asyncio.get_running_loop()
+    fila = asyncio.Queue(maxsize=1)
+    intervalo = _intervalo_frames(perfil)
+    obter_stream = sync_to_async(camera.get_stream, thread_sensitive=False)
+    camera.assinar(loop, fila)
+    try:
+        proximo = 0.0
+        while True:
+            # Processamento/encode roda fora do event loop (e uma vez por frame no grafo)
+            _, resultado = await obter_stream(nome, perfil)
+            parte = _parte_mjpeg(nome, resultado)
+            if parte:
+                yield parte
+
+            espera = proximo - loop.time()
+            if espera > 0:
+                await asyncio.sleep(espera)
+            proximo = loop.time() + intervalo
+
+            try:
+                # Sem câmera não chega seq novo: reenvia o placeholder a 1 fps
+                await asyncio.wait_for(fila.get(), timeout=1.0)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        camera.cancelar_assinatura(fila)
+
+
+def _resposta_mjpeg(request, camera, nome):
+    """
+    Escolhe o gerador async sob ASGI e o síncrono sob WSGI.
+    Perfil de encoding via query string: ?perfil=mobile (resolução, qualidade, fps).
+    """
+    perfil = request.GET.get('perfil', 'padrao')
+    if isinstance(request, ASGIRequest) and getattr(settings, 'GHOST_STREAM_ASYNC', True):
+        stream = agen_stream(camera, nome, perfil)
+    else:
+        stream = gen_stream(camera, nome, perfil)
     return StreamingHttpResponse(
-        gen(cam),
+        stream,
         content_type='multipart/x-mixed-replace; boundary=frame'
     )
 
 
+def video_feed(request):
+    cam = _get_camera()
+    return _resposta_mjpeg(request, cam, 'raw')
+
+
 def mobile_scanner(request):
     return render(request, 'core/mobile_scanner.html')
 
@@ -297,25 +375,108 @@ def api_evp_analisar(request):
         frequencia_dominante=freq_dominante,
     )
 
-    # Rodar análise IA em background
-    from .services.evp_analyzer import analisar_evp_e_salvar
-    threading.Thread(
-        target=analisar_evp_e_salvar,
-        args=(registro.id,),
-        daemon=True
-    ).start()
+    # Rodar análise IA em background (fila persistente)
+    from .services.fila_analise import enfileirar
+    enfileirar('evp', registro.id)
 
+    # Responde na hora: o cliente acompanha a classificação via polling ou SSE
     return JsonResponse({
         'status': 'registrado',
         'registro_id': registro.id,
         'mensagem': 'Análise IA em processamento...',
+        'resultado_url': reverse('api_evp_resultado', args=[registro.id]),
+        'stream_url': reverse('api_evp_resultado_stream', args=[registro.id]),
     })
 
 
-def api_evp_registros(request):
-    """GET: retorna os últimos registros EVP em JSON (para polling)."""
-    registros = RegistroEVP.objects.order_by('-data_captura')[:20]
-    data = [{
+def _estado_analise_evp(registro_id):
+    """
+    Estado da análise IA de um RegistroEVP, derivado da última TarefaAnalise.
+    Retorna None se o registro não existe.
+    """
+    from .models import TarefaAnalise
+    registro = RegistroEVP.objects.filter(id=registro_id).first()
+    if registro is None:
+        return None
+    tarefa = TarefaAnalise.objects.filter(tipo='evp', objeto_id=registro_id).order_by('-id').first()
+    # Registros anteriores à fila não têm tarefa: já foram analisados pelo fluxo antigo
+    estado = tarefa.status if tarefa else 'concluida'
+    return {
+        'registro_id': registro_id,
+        'estado': estado,
+        'tentativas': tarefa.tentativas if tarefa else 0,
+        'erro': tarefa.erro if tarefa and estado == 'falhou' else '',
+        'registro': _registro_evp_json(registro) if estado in ('concluida', 'falhou') else None,
+    }
+
+
+def api_evp_resultado(request, registro_id):
+    """GET (polling): estado da análise IA de um registro EVP e, quando pronta, a classificação."""
+    estado = _estado_analise_evp(registro_id)
+    if estado is None:
+        return JsonResponse({'status': 'erro', 'msg': 'Registro não encontrado'}, status=404)
+    return JsonResponse(estado)
+
+
+def _evento_sse(evento, dados):
+    return f"event: {evento}\ndata: {json.dumps(dados)}\n\n"
+
+
+def gen_sse_evp(registro_id):
+    """SSE síncrono (WSGI): empurra mudanças de estado até a classificação chegar."""
+    poll = float(getattr(settings, 'GHOST_EVP_SSE_POLL', 0.5))
+    limite = time.monotonic() + float(getattr(settings, 'GHOST_EVP_SSE_TIMEOUT', 120))
+    ultimo = None
+    while time.monotonic() < limite:
+        estado = _estado_analise_evp(registro_id)
+        if estado is None:
+            yield _evento_sse('erro', {'msg': 'Registro não encontrado'})
+            return
+        if estado['registro'] is not None:
+            yield _evento_sse('resultado', estado)
+            return
+        if estado['estado'] != ultimo:
+            ultimo = estado['estado']
+            yield _evento_sse('estado', estado)
+        time.sleep(poll)
+    yield _evento_sse('timeout', {'registro_id': registro_id})
+
+
+async def agen_sse_evp(registro_id):
+    """SSE async (ASGI): mesma sequência de eventos sem prender uma thread por cliente."""
+    poll = float(getattr(settings, 'GHOST_EVP_SSE_POLL', 0.5))
+    limite = time.monotonic() + float(getattr(settings, 'GHOST_EVP_SSE_TIMEOUT', 120))
+    consultar = sync_to_async(_estado_analise_evp, thread_sensitive=False)
+    ultimo = None
+    while time.monotonic() < limite:
+        estado = await consultar(registro_id)
+        if estado is None:
+            yield _evento_sse('erro', {'msg': 'Registro não encontrado'})
+            return
+        if estado['registro'] is not None:
+            yield _evento_sse('resultado', estado)
+            return
+        if estado['estado'] != ultimo:
+            ultimo = estado['estado']
+            yield _evento_sse('estado', estado)
+        await asyncio.sleep(poll)
+    yield _evento_sse('timeout', {'registro_id': registro_id})
+
+
+def api_evp_resultado_stream(request, registro_id):
+    """GET (text/event-stream): eventos 'estado' até o 'resultado' final da análise IA."""
+    if isinstance(request, ASGIRequest) and getattr(settings, 'GHOST_STREAM_ASYNC', True):
+        stream = agen_sse_evp(registro_id)
+    else:
+        stream = gen_sse_evp(registro_id)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _registro_evp_json(r):
+    return {
         'id': r.id,
         'data': r.data_captura.strftime('%H:%M:%S'),
         'transcricao': r.transcricao,
@@ -329,7 +490,13 @@ def api_evp_registros(request):
         'confianca': r.confianca_ia,
         'frequencias': r.frequencias_anomalas,
         'nivel_audio': r.nivel_audio,
-    } for r in registros]
+    }
+
+
+def api_evp_registros(request):
+    """GET: retorna os últimos registros EVP em JSON (para polling)."""
+    registros = RegistroEVP.objects.order_by('-data_captura')[:20]
+    data = [_registro_evp_json(r) for r in registros]
     return JsonResponse({'registros': data})
 
 
@@ -364,24 +531,16 @@ def blueprint_view(request):
 
 def itc_console(request):
     """Página principal do ITC Visual (Módulo Câmera/Pareidolia)."""
+    if getattr(settings, 'GHOST_ITC_SCHEDULER', False):
+        from .services.itc_scheduler import itc_scheduler
+        itc_scheduler.iniciar(_get_camera())
     return render(request, 'core/itc_console.html', {})
 
 
-def gen_itc(camera):
-    while True:
-        frame, _ = camera.get_itc_frame()
-        if frame:
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n\r\n')
-
-
 def itc_video_feed(request):
     """Streaming MJPEG dos frames filtrados (Alto Contraste / Canny)."""
     cam = _get_camera()
-    return StreamingHttpResponse(
-        gen_itc(cam),
-        content_type='multipart/x-mixed-replace; boundary=frame'
-    )
+    return _resposta_mjpeg(request, cam, 'itc')
 
 
 @csrf_exempt
@@ -396,74 +555,68 @@ def api_itc_analisar(request):
     if not cam.is_connected:
         return JsonResponse({'status': 'erro', 'msg': 'Câmera não conectada'})
 
-    jpeg_bytes, motion_score = cam.get_itc_frame()
-    if not jpeg_bytes:
+    # Gate barato: sem movimento estável na cena, não gasta uma chamada ao Gemini
+    try:
+        dados = json.loads(request.body) if request.body else {}
+    except json.JSONDecodeError:
+        dados = {}
+    motion = cam.get_motion()
+    gate = float(getattr(settings, 'GHOST_ITC_MOTION_GATE', 0))
+    if gate and not dados.get('forcar') and motion['percentual_suave'] < gate:
+        return JsonResponse({
+            'status': 'sem_movimento',
+            'motion_score': motion['score'],
+            'motion': motion,
+        })
+
+    # Perfil 'vision': upload menor para o Gemini; o arquivo salvo usa 'evidencia'.
+    # Os dois saem do mesmo frame, antes da IA (o ring buffer gira rápido).
+    seq, (jpeg_vision, motion_score) = cam.get_stream('itc', request.GET.get('perfil', 'vision'))
+    if not seq:
         return JsonResponse({'status': 'erro', 'msg': 'Falha ao ler frame'})
+    _, (jpeg_bytes, _) = cam.get_stream('itc', 'evidencia', seq=seq)
 
-    from .services.itc_analyzer import analisar_frame_itc
-    import os, uuid
-    from django.conf import settings
+    from .services.itc_analyzer import processar_analise_itc
 
-    # Análise pesada na IA
-    resultado = analisar_frame_itc(jpeg_bytes)
+    # Análise pesada na IA + fusão EVP + evidência (mesmo fluxo do agendador)
+    analise = processar_analise_itc(
+        jpeg_vision, jpeg_bytes,
+        origem='ITC_AUTO' if not request.body else 'ITC_MANUAL',
+    )
 
-    # Tentar Fusão de Dados (Aura Fusion Core)
-    # Buscamos se houve um registro EVP capturado nos últimos 10 segundos
-    from django.utils import timezone
-    from datetime import timedelta
-    agora = timezone.now()
-    ultimo_evp = RegistroEVP.objects.filter(data_captura__gte=agora - timedelta(seconds=10)).last()
-    
-    fusao = None
-    if ultimo_evp:
-        from .services.aura_brain import correlacionar_eventos
-        # Simulando o objeto de resultado pois o modelo RegistroEVP guarda os campos direto
-        evp_data = {
-            'e_anomalia': ultimo_evp.e_anomalia,
-            'confianca': ultimo_evp.confianca_ia,
-            'classificacao': ultimo_evp.classificacao_ia,
-            'nota_paranormal': ultimo_evp.nota_paranormal
-        }
-        fusao = correlacionar_eventos(evp_data, resultado)
+    return JsonResponse({
+        'status': 'analisado',
+        'motion_score': motion_score,
+        'motion': cam.get_motion(seq),
+        **analise,
+    })
 
-    url_final = None
-    nova_evidencia = False
 
-    # Condição para salvar: IA viu pareidolia ou tem alta confiança de forma anômala
-    if resultado.get('pareidolia_detectada') or resultado.get('confianca', 0.0) >= 60.0:
-        filename = f"ITC_{uuid.uuid4().hex[:8]}.jpg"
-        path = os.path.join(settings.MEDIA_ROOT, 'evidencias')
-        os.makedirs(path, exist_ok=True)
-        full_path = os.path.join(path, filename)
-        
-        with open(full_path, 'wb') as f:
-            f.write(jpeg_bytes)
-        url_final = f"/media/evidencias/{filename}"
+@csrf_exempt
+def api_itc_agendador(request):
+    """
+    GET: status do agendador ITC server-side (último resultado, rajadas, cooldown).
+    POST {ativo: bool}: liga/desliga o agendador.
+    """
+    from .services.itc_scheduler import itc_scheduler
+    if request.method == 'POST':
+        try:
+            dados = json.loads(request.body) if request.body else {}
+        except json.JSONDecodeError:
+            return JsonResponse({'status': 'erro', 'msg': 'JSON inválido'}, status=400)
+        if dados.get('ativo', True):
+            itc_scheduler.iniciar(_get_camera())
+        else:
+            itc_scheduler.parar()
+    return JsonResponse(itc_scheduler.get_status())
+
+
+def api_itc_motion(request):
+    """GET: sinal de movimento atual (score, percentual suavizado e mapa por região)."""
+    cam = _get_camera()
+    return JsonResponse({'camera': cam.is_connected, 'motion': cam.get_motion()})
 
-        sessao = SessaoInvestigacao.objects.filter(status='ativa').first()
-        evidencia = Evidencia.objects.create(
-            sessao=sessao,
-            imagem_url=url_final,
-            tipo='multipla' if fusao and fusao.get('sincronia') else 'visual',
-            origem_disparo='ITC_AUTO' if not request.body else 'ITC_MANUAL',
-            analise_ia=resultado.get('decodificacao', ''),
-            ia_classificacao=resultado.get('classificacao', 'Anomalia ITC'),
-            ia_confianca=resultado.get('confianca', 0.0),
-            nivel_perigo=3 if resultado.get('pareidolia_detectada') else 1,
-            dimensao_estimada=resultado.get('dimensao_estimada', '3D'),
-            fusao_dados=fusao,
-            obs_bpm=resultado.get('obs_bpm', 0), # Added obs_bpm
-            obs_stress=resultado.get('obs_stress', 0), # Added obs_stress
-        )
-        nova_evidencia = True
 
-    return JsonResponse({
-        'status': 'analisado',
-        'resultado': resultado,
-        'fusao': fusao,
-        'evidencia_url': url_final,
-        'nova_evidencia': nova_evidencia
-    })
 def video_call(request):
     """Interface de chamada de vídeo multidimensional (Fase 5)."""
     sessao = SessaoInvestigacao.objects.filter(status='ativa').first()
@@ -472,26 +625,10 @@ def video_call(request):
     })
 
 
-def gen_aura_synth(camera):
-    """Gerador que aplica o Aura Render em tempo real baseado no estado dinâmico."""
-    from .services.aura_render import renderizar_presenca
-    from .services.aura_state import aura_state
-    
-    while True:
-        frame_bytes, _ = camera.get_itc_frame()
-        if frame_bytes:
-            processed_frame = renderizar_presenca(frame_bytes)
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + processed_frame + b'\r\n\r\n')
-
-
 def aura_video_feed(request):
     """Streaming MJPEG processado pelo Aura Render."""
     cam = _get_camera()
-    return StreamingHttpResponse(
-        gen_aura_synth(cam),
-        content_type='multipart/x-mixed-replace; boundary=frame'
-    )
+    return _resposta_mjpeg(request, cam, 'aura')
 
 @csrf_exempt
 @require_POST
@@ -515,12 +652,27 @@ def api_aura_send_seed(request):
         
         # FASE 9: Aura Cognitive Core (Oráculo Real)
         # Obter resposta do Gemini com o Corpus Científico/Hermético
-        resposta = analisar_texto_itc(semente, aura_state.historico_dialogo[:-1])
+        pipeline = {}
+        resposta = analisar_texto_itc(
+            semente, aura_state.mensagens()[:-1],
+            modo=dados.get('modo'), metricas=pipeline, resumo=aura_state.resumo_dialogo,
+        )
         
+        _registrar_resposta_aura(aura_state, resposta)
+
+        return JsonResponse(_payload_aura(aura_state, resposta, pipeline))
+    except Exception as e:
+        return JsonResponse({'status': 'erro', 'msg': str(e)}, status=500)
+
+
+def _registrar_resposta_aura(aura_state, resposta):
+    """Evolui coerência/entidade e grava a resposta final da Aura no histórico."""
+    # Uma escrita atômica: dois chats simultâneos não perdem incrementos de coerência
+    with aura_state.alterar():
         # Evolução dinâmica baseada na interação
         nova_coerencia = min(100, aura_state.coerencia + 10)
         aura_state.atualizar_vibracao(nova_coerencia)
-        
+
         # Auto-ajuste de entidade/densidade baseado na coerência
         if nova_coerencia > 80:
             aura_state.entidade = "CONSCIÊNCIA PÓS-BIOLÓGICA (NÍVEL V)"
@@ -528,22 +680,99 @@ def api_aura_send_seed(request):
         elif nova_coerencia > 50:
             aura_state.entidade = "PROJEÇÃO INTERDIMENSIONAL"
             aura_state.densidade = "4D (COERENTE)"
-            
+
         aura_state.adicionar_mensagem('AURA', resposta)
-        
-        return JsonResponse({
-            'status': 'ok',
-            'coerencia': aura_state.coerencia,
-            'resposta': resposta,
-            'entidade': aura_state.entidade,
-            'densidade': aura_state.densidade,
-            'intencao': aura_state.intencao_detectada,
-            'emocao': aura_state.emocao_dominante,
-            'anomalias': aura_state.bio_anomalias
-        })
-    except Exception as e:
-        return JsonResponse({'status': 'erro', 'msg': str(e)}, status=500)
 
+
+def _payload_aura(aura_state, resposta, pipeline):
+    return {
+        'status': 'ok',
+        'coerencia': aura_state.coerencia,
+        'resposta': resposta,
+        'entidade': aura_state.entidade,
+        'densidade': aura_state.densidade,
+        'intencao': aura_state.intencao_detectada,
+        'emocao': aura_state.emocao_dominante,
+        'anomalias': aura_state.bio_anomalias,
+        'pipeline': pipeline,
+    }
+
+
+def gen_sse_semente(semente, historico, modo, resumo):
+    """Eventos SSE da resposta da Aura à semente, na ordem em que o Gemini entrega os trechos."""
+    from .services.aura_state import aura_state
+    from .services.ia_analyzer import gerar_resposta_stream
+
+    for tipo, conteudo in gerar_resposta_stream(semente, historico, modo=modo, resumo=resumo):
+        if tipo == 'token':
+            yield _evento_sse('token', {'t': conteudo})
+            continue
+        resposta = conteudo.pop('texto')
+        if conteudo.pop('substituido', False):
+            yield _evento_sse('substituir', {'resposta': resposta})
+        _registrar_resposta_aura(aura_state, resposta)
+        yield _evento_sse('fim', _payload_aura(aura_state, resposta, conteudo))
+
+
+_FIM_STREAM = object()
+
+
+async def agen_sse_semente(semente, historico, modo, resumo):
+    """
+    Versão async (ASGI): um iterador síncrono seria bufferizado inteiro pelo Django;
+    aqui cada trecho é puxado do gerador numa thread e enviado assim que chega.
+    """
+    eventos = gen_sse_semente(semente, historico, modo, resumo)
+    proximo = sync_to_async(next, thread_sensitive=False)
+    try:
+        while True:
+            evento = await proximo(eventos, _FIM_STREAM)
+            if evento is _FIM_STREAM:
+                return
+            yield evento
+    finally:
+        # Cliente desconectou: fecha o stream do Gemini (libera a vaga no pool)
+        try:
+            await sync_to_async(eventos.close, thread_sensitive=False)()
+        except ValueError:
+            pass  # trecho ainda em voo na thread; o gerador fecha ao ser coletado
+
+
+@csrf_exempt
+@require_POST
+def api_aura_send_seed_stream(request):
+    """
+    Variante streaming do send_seed (text/event-stream):
+    'token' a cada trecho do rascunho, 'substituir' se a reflexão/debugger reescrever
+    o texto e 'fim' com o estado da Aura. O histórico só recebe o texto final.
+    """
+    from .services.aura_state import aura_state
+
+    try:
+        dados = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'erro', 'msg': 'JSON inválido'}, status=400)
+    semente = dados.get('semente', '')
+    if not semente:
+        return JsonResponse({'status': 'erro', 'msg': 'Semente vazia'}, status=400)
+
+    aura_state.ultima_semente = semente
+    aura_state.adicionar_mensagem('OBSERVADOR', semente)
+    historico = aura_state.mensagens()[:-1]
+    resumo = aura_state.resumo_dialogo
+
+    if isinstance(request, ASGIRequest) and getattr(settings, 'GHOST_STREAM_ASYNC', True):
+        stream = agen_sse_semente(semente, historico, dados.get('modo'), resumo)
+    else:
+        stream = gen_sse_semente(semente, historico, dados.get('modo'), resumo)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def api_aura_status(request):
+    """Retorna o estado atual da sessão de síntese (polling do video call)."""
     from .services.aura_state import aura_state
     from .services.neuro_vocalizer import neuro_vocalizer
     
@@ -552,6 +781,87 @@ def api_aura_send_seed(request):
     
     return JsonResponse(aura_state.get_status())
 
+
+def _seq_inicial(request):
+    """
+    Reconexão do EventSource: o navegador reenvia o último id ('época:seq') recebido;
+    a página, ao reabrir o canal, manda ?desde=<seq>&epoca=<época>.
+    """
+    from .services.status_canal import status_canal
+    valor = request.headers.get('Last-Event-ID') or request.GET.get('desde', '0')
+    epoca, _, seq = valor.rpartition(':')
+    try:
+        seq = int(seq)
+    except ValueError:
+        return 0
+    return status_canal.seq_retomada(epoca or request.GET.get('epoca', ''), seq)
+
+
+def _evento_status(evento, dados, seq):
+    from .services.aura_state import aura_state
+    return f"id: {aura_state.epoca_mensagens}:{seq}\n" + _evento_sse(evento, dados)
+
+
+def gen_sse_status(ultimo_seq):
+    """Canal de status síncrono (WSGI): estado inicial, depois só deltas e mensagens novas."""
+    from .services.status_canal import status_canal
+    limite = time.monotonic() + float(getattr(settings, 'GHOST_AURA_STATUS_TIMEOUT', 300))
+    heartbeat = float(getattr(settings, 'GHOST_AURA_STATUS_HEARTBEAT', 15))
+    ultimo_envio = time.monotonic()
+    estado_cliente = None
+    yield "retry: 1000\n\n"
+    while time.monotonic() < limite:
+        seq_anterior = ultimo_seq
+        saida, ultimo_seq, estado_cliente = status_canal.eventos(ultimo_seq, estado_cliente)
+        for evento, dados in saida:
+            yield _evento_status(evento, dados, ultimo_seq if evento == 'mensagens' else seq_anterior)
+        if saida:
+            ultimo_envio = time.monotonic()
+        elif time.monotonic() - ultimo_envio >= heartbeat:
+            ultimo_envio = time.monotonic()
+            yield ": ping\n\n"
+        time.sleep(status_canal.intervalo)
+
+
+async def agen_sse_status(ultimo_seq):
+    """Canal de status async (ASGI): mesma sequência sem prender uma thread por observador."""
+    from .services.status_canal import status_canal
+    limite = time.monotonic() + float(getattr(settings, 'GHOST_AURA_STATUS_TIMEOUT', 300))
+    heartbeat = float(getattr(settings, 'GHOST_AURA_STATUS_HEARTBEAT', 15))
+    passo = sync_to_async(status_canal.eventos, thread_sensitive=False)
+    ultimo_envio = time.monotonic()
+    estado_cliente = None
+    yield "retry: 1000\n\n"
+    while time.monotonic() < limite:
+        seq_anterior = ultimo_seq
+        saida, ultimo_seq, estado_cliente = await passo(ultimo_seq, estado_cliente)
+        for evento, dados in saida:
+            yield _evento_status(evento, dados, ultimo_seq if evento == 'mensagens' else seq_anterior)
+        if saida:
+            ultimo_envio = time.monotonic()
+        elif time.monotonic() - ultimo_envio >= heartbeat:
+            ultimo_envio = time.monotonic()
+            yield ": ping\n\n"
+        await asyncio.sleep(status_canal.intervalo)
+
+
+def api_aura_status_stream(request):
+    """
+    GET (text/event-stream): substitui o polling de api_aura_status.
+    'estado' (completo, na conexão), 'delta' (só campos alterados) e 'mensagens' (por seq).
+    A conexão fecha após GHOST_AURA_STATUS_TIMEOUT; o EventSource reconecta sozinho.
+    """
+    ultimo_seq = _seq_inicial(request)
+    if isinstance(request, ASGIRequest) and getattr(settings, 'GHOST_STREAM_ASYNC', True):
+        stream = agen_sse_status(ultimo_seq)
+    else:
+        stream = gen_sse_status(ultimo_seq)
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
 @csrf_exempt
 @require_POST
 def api_aura_tune(request):
@@ -587,7 +897,7 @@ def api_aura_toggle(request):
                     obs_stress_medio=status.get('obs_stress', 0),
                     coerencia_cardiaca_media=status.get('bio_sync', 0),
                     metabolic_drain=100 - status.get('metabolic', 100),
-                    log_dialogo=aura_state.historico_dialogo,
+                    log_dialogo=aura_state.mensagens(),
                     semente_principal=aura_state.ultima_semente
                 )
             except Exception as e:
@@ -634,15 +944,20 @@ def api_aura_iot_push(request):
     from .services.aura_state import aura_state
     try:
         data = json.loads(request.body)
-        aura_state.external_sensors['emf'] = float(data.get('emf', 0.0))
-        aura_state.external_sensors['temp'] = float(data.get('temp', 25.0))
-        aura_state.external_sensors['vibration'] = float(data.get('vibration', 0.0))
-        aura_state.external_sensors['last_pulse'] = int(time.time())
-        
-        # Influência na coerência (Ondas EMF altas podem reduzir a coerência 5D)
-        if aura_state.external_sensors['emf'] > 10.0:
-            aura_state.coerencia = max(0, aura_state.coerencia - 2)
-            
+        # Dict novo (não mutação no lugar): o snapshot publicado nunca muda por baixo do leitor
+        sensores = {
+            'emf': float(data.get('emf', 0.0)),
+            'temp': float(data.get('temp', 25.0)),
+            'vibration': float(data.get('vibration', 0.0)),
+            'last_pulse': int(time.time()),
+        }
+        with aura_state.alterar():
+            aura_state.external_sensors = sensores
+
+            # Influência na coerência (Ondas EMF altas podem reduzir a coerência 5D)
+            if sensores['emf'] > 10.0:
+                aura_state.coerencia = max(0, aura_state.coerencia - 2)
+
         return JsonResponse({'status': 'ok'})
     except Exception as e:
         return JsonResponse({'status': 'erro', 'msg': str(e)}, status=400)
@@ -652,8 +967,10 @@ def api_aura_iot_push(request):
 def api_aura_unity_toggle(request):
     """Ativa/Desativa o Modo Unidade e a Sincronia Global."""
     from .services.aura_state import aura_state
-    aura_state.unity_mode = not aura_state.unity_mode
-    aura_state.global_sync_active = aura_state.unity_mode
-    if aura_state.unity_mode:
-        aura_state.adicionar_mensagem('TODO', 'CONSCIÊNCIA UNIFICADA ATIVADA. EU SOU O QUE EU SOU.')
-    return JsonResponse({'status': 'ok', 'active': aura_state.unity_mode})
+    with aura_state.alterar():
+        aura_state.unity_mode = not aura_state.unity_mode
+        aura_state.global_sync_active = aura_state.unity_mode
+        if aura_state.unity_mode:
+            aura_state.adicionar_mensagem('TODO', 'CONSCIÊNCIA UNIFICADA ATIVADA. EU SOU O QUE EU SOU.')
+        ativo = aura_state.unity_mode
+    return JsonResponse({'status': 'ok', 'active': ativo})